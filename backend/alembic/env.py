@@ -11,18 +11,14 @@ from alembic import context
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import Base
-from app.models import (
-    Employee, Client, Timesheet, TimesheetDetail, Approval,
-    Calendar, Holiday, Notification, Configuration, AuditLog,
-    EmployeeClientAssignment, BusinessCalendar
-)
+import app.models  # noqa: F401  registers every model on Base.metadata
 from app.config import settings
 
 # this is the Alembic Config object
 config = context.config
 
 # Override sqlalchemy.url with the one from settings
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+config.set_main_option("sqlalchemy.url", settings.database_url)
 
 # Interpret the config file for Python logging.
 if config.config_file_name is not None:
@@ -0,0 +1,49 @@
+"""Content-addressed upload storage
+
+Revision ID: 003_content_addressed_uploads
+Revises: 002_timesheet_uploads
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003_content_addressed_uploads'
+down_revision: Union[str, None] = '002_timesheet_uploads'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create stored_blobs table
+    op.create_table(
+        'stored_blobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('file_path', sa.String(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stored_blobs_id'), 'stored_blobs', ['id'], unique=False)
+    op.create_index(op.f('ix_stored_blobs_digest'), 'stored_blobs', ['digest'], unique=True)
+
+    # Track content hash and size on uploads
+    op.add_column('timesheet_uploads', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('timesheet_uploads', sa.Column('file_size', sa.BigInteger(), nullable=True))
+    op.create_index('ix_timesheet_uploads_employee_hash', 'timesheet_uploads', ['employee_id', 'content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_timesheet_uploads_employee_hash', table_name='timesheet_uploads')
+    op.drop_column('timesheet_uploads', 'file_size')
+    op.drop_column('timesheet_uploads', 'content_hash')
+
+    op.drop_index(op.f('ix_stored_blobs_digest'), table_name='stored_blobs')
+    op.drop_index(op.f('ix_stored_blobs_id'), table_name='stored_blobs')
+    op.drop_table('stored_blobs')
@@ -0,0 +1,44 @@
+"""Hot/cold tiering for stored blobs
+
+Revision ID: 004_tiered_blob_storage
+Revises: 003_content_addressed_uploads
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004_tiered_blob_storage'
+down_revision: Union[str, None] = '003_content_addressed_uploads'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+storage_tier = sa.Enum('hot', 'cold', name='storagetier')
+
+
+def upgrade() -> None:
+    storage_tier.create(op.get_bind(), checkfirst=True)
+
+    op.add_column('stored_blobs', sa.Column('tier', storage_tier, nullable=False, server_default='hot'))
+    op.add_column('stored_blobs', sa.Column('archive_key', sa.String(), nullable=True))
+    op.add_column('stored_blobs', sa.Column('archive_offset', sa.BigInteger(), nullable=True))
+    op.add_column('stored_blobs', sa.Column('archive_length', sa.BigInteger(), nullable=True))
+    op.add_column('stored_blobs', sa.Column('compression', sa.String(length=8), nullable=True))
+    op.add_column('stored_blobs', sa.Column('archived_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_stored_blobs_tier_created', 'stored_blobs', ['tier', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stored_blobs_tier_created', table_name='stored_blobs')
+    op.drop_column('stored_blobs', 'archived_at')
+    op.drop_column('stored_blobs', 'compression')
+    op.drop_column('stored_blobs', 'archive_length')
+    op.drop_column('stored_blobs', 'archive_offset')
+    op.drop_column('stored_blobs', 'archive_key')
+    op.drop_column('stored_blobs', 'tier')
+
+    storage_tier.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,43 @@
+"""Bring migrations in line with the models
+
+Columns that so far only existed in databases created by
+Base.metadata.create_all at startup. Each step is skipped when the column
+is already in the target shape, so databases created either way converge.
+
+Revision ID: 005_schema_drift
+Revises: 004_tiered_blob_storage
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005_schema_drift'
+down_revision: Union[str, None] = '004_tiered_blob_storage'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table: str) -> set:
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    if 'sync_interval_minutes' not in _columns('integration_configs'):
+        op.add_column('integration_configs', sa.Column('sync_interval_minutes', sa.Integer(), nullable=True, server_default='60'))
+
+    upload_columns = _columns('timesheet_uploads')
+    if 'metadata' in upload_columns and 'upload_metadata' not in upload_columns:
+        with op.batch_alter_table('timesheet_uploads') as batch_op:
+            batch_op.alter_column('metadata', new_column_name='upload_metadata')
+    elif 'upload_metadata' not in upload_columns:
+        op.add_column('timesheet_uploads', sa.Column('upload_metadata', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('timesheet_uploads') as batch_op:
+        batch_op.alter_column('upload_metadata', new_column_name='metadata')
+    op.drop_column('integration_configs', 'sync_interval_minutes')
@@ -0,0 +1,30 @@
+"""Index timesheets by employee, client and period
+
+Backs the missing-timesheet anti-join and the duplicate-period check, which
+look up overlapping timesheets for one employee and client.
+
+Revision ID: 006_timesheet_period_index
+Revises: 005_schema_drift
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '006_timesheet_period_index'
+down_revision: Union[str, None] = '005_schema_drift'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_timesheets_employee_client_period', 'timesheets',
+        ['employee_id', 'client_id', 'period_start'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_timesheets_employee_client_period', table_name='timesheets')
@@ -0,0 +1,40 @@
+"""Notification outbox delivery columns
+
+Notifications become an outbox consumed by delivery workers: each row
+records its channel, attempt count, next retry time and the lease of the
+worker currently delivering it.
+
+Revision ID: 007_notification_outbox
+Revises: 006_timesheet_period_index
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007_notification_outbox'
+down_revision: Union[str, None] = '006_timesheet_period_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('notifications', sa.Column('channel', sa.String(), nullable=False, server_default='email'))
+    op.add_column('notifications', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('notifications', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+    op.add_column('notifications', sa.Column('locked_until', sa.DateTime(), nullable=True))
+    op.add_column('notifications', sa.Column('last_error', sa.Text(), nullable=True))
+    op.create_index('ix_notifications_outbox', 'notifications', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_outbox', table_name='notifications')
+    with op.batch_alter_table('notifications') as batch_op:
+        batch_op.drop_column('last_error')
+        batch_op.drop_column('locked_until')
+        batch_op.drop_column('next_attempt_at')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('channel')
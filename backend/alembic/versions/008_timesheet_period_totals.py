@@ -0,0 +1,58 @@
+"""Per-period billing and payroll totals
+
+One row per (employee, client, period) of approved timesheets with hours,
+rates and amounts, kept current by app.services.aggregates. Existing data is
+backfilled with `python -m app.services.aggregates` after upgrading.
+
+Revision ID: 008_timesheet_period_totals
+Revises: 007_notification_outbox
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008_timesheet_period_totals'
+down_revision: Union[str, None] = '007_notification_outbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'timesheet_period_totals',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('employee_id', sa.Integer(), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('period_end', sa.Date(), nullable=False),
+        sa.Column('timesheets', sa.Integer(), nullable=False),
+        sa.Column('regular_hours', sa.Float(), nullable=False),
+        sa.Column('overtime_hours', sa.Float(), nullable=False),
+        sa.Column('pay_rate', sa.Float(), nullable=True),
+        sa.Column('bill_rate', sa.Float(), nullable=True),
+        sa.Column('overtime_multiplier', sa.Float(), nullable=False),
+        sa.Column('regular_pay', sa.Float(), nullable=True),
+        sa.Column('overtime_pay', sa.Float(), nullable=True),
+        sa.Column('billable_amount', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('employee_id', 'client_id', 'period_start', 'period_end', name='uq_timesheet_period_totals_key')
+    )
+    op.create_index(op.f('ix_timesheet_period_totals_id'), 'timesheet_period_totals', ['id'], unique=False)
+    op.create_index(
+        'ix_timesheet_period_totals_client_period', 'timesheet_period_totals',
+        ['client_id', 'period_start'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_timesheet_period_totals_client_period', table_name='timesheet_period_totals')
+    op.drop_index(op.f('ix_timesheet_period_totals_id'), table_name='timesheet_period_totals')
+    op.drop_table('timesheet_period_totals')
@@ -0,0 +1,32 @@
+"""Packed daily hours on timesheets
+
+Each timesheet can carry its daily hours and overtime as packed uint16
+centi-hour arrays indexed by day from period_start, so per-day analytics
+read timesheets without expanding into timesheet_details. Existing rows are
+packed with `python -m app.services.packed_hours` after upgrading.
+
+Revision ID: 009_packed_timesheet_hours
+Revises: 008_timesheet_period_totals
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009_packed_timesheet_hours'
+down_revision: Union[str, None] = '008_timesheet_period_totals'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('timesheets', sa.Column('packed_hours', sa.LargeBinary(), nullable=True))
+    op.add_column('timesheets', sa.Column('packed_overtime', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('timesheets', 'packed_overtime')
+    op.drop_column('timesheets', 'packed_hours')
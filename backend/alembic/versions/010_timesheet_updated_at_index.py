@@ -0,0 +1,27 @@
+"""Index timesheets by updated_at
+
+Backs the max(updated_at) half of the conditional GET version tokens on the
+timesheet list and dashboard, which run on every poll.
+
+Revision ID: 010_timesheet_updated_at_index
+Revises: 009_packed_timesheet_hours
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '010_timesheet_updated_at_index'
+down_revision: Union[str, None] = '009_packed_timesheet_hours'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_timesheets_updated_at', 'timesheets', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_timesheets_updated_at', table_name='timesheets')
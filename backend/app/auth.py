@@ -3,15 +3,18 @@ from typing import Optional
 import hashlib
 import bcrypt
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models import Employee
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def _prehash_password(password: str) -> bytes:
@@ -41,36 +44,45 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 
 def create_refresh_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 
+def create_url_ticket(email: str, path: str) -> str:
+    """
+    Short-lived token valid only for GET requests to path, for URLs the
+    browser opens itself (viewers, new tabs) and so can't send headers to.
+    """
+    expire = datetime.utcnow() + timedelta(seconds=settings.url_ticket_expire_seconds)
+    return jwt.encode(
+        {"sub": email, "type": "ticket", "path": path, "exp": expire},
+        settings.secret_key, algorithm=settings.algorithm
+    )
+
+
 def decode_token(token: str):
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         return payload
     except JWTError:
         return None
 
 
-async def get_current_employee(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Employee:
-    token = credentials.credentials
+def _email_for_token(token: str) -> str:
     payload = decode_token(token)
 
-    if payload is None:
+    # Tickets only open the URL they were issued for
+    if payload is None or payload.get("type") == "ticket":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
@@ -82,8 +94,25 @@ async def get_current_employee(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
+    return email
+
+
+def _email_for_ticket(ticket: str, path: str) -> str:
+    payload = decode_token(ticket)
+    if payload is None or payload.get("type") != "ticket" or payload.get("path") != path or not payload.get("sub"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired ticket"
+        )
+    return payload["sub"]
+
 
-    employee = db.query(Employee).filter(Employee.email == email).first()
+def _employee_query(email: str):
+    # Assignments are loaded up front: lazy loads aren't possible on an AsyncSession
+    return select(Employee).options(selectinload(Employee.client_assignments)).filter(Employee.email == email)
+
+
+def _active_employee(employee: Optional[Employee]) -> Employee:
     if employee is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -99,12 +128,94 @@ async def get_current_employee(
     return employee
 
 
+async def _employee_for_token(token: str, db: AsyncSession) -> Employee:
+    return _active_employee(await db.scalar(_employee_query(_email_for_token(token))))
+
+
+def get_current_employee(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Employee:
+    """
+    Authenticate a sync endpoint. Uses the request's get_db session, which
+    the endpoint shares, so authentication costs no extra connection.
+    """
+    return _active_employee(db.scalar(_employee_query(_email_for_token(credentials.credentials))))
+
+
+async def get_current_employee_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Employee:
+    """Authenticate an async endpoint on the request's get_async_db session"""
+    return await _employee_for_token(credentials.credentials, db)
+
+
+async def get_stream_employee(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    ticket: Optional[str] = Query(default=None, description="From POST /auth/ticket, for EventSource, which can't send headers"),
+    db: AsyncSession = Depends(get_async_db, scope="function")
+) -> Employee:
+    """
+    Authenticate a long-lived stream from the Authorization header or a
+    ticket issued for the stream's path, so the access token never appears
+    in a URL. The ticket is only checked when the stream connects. The
+    session is released before streaming starts.
+    """
+    if credentials:
+        email = _email_for_token(credentials.credentials)
+    elif ticket:
+        email = _email_for_ticket(ticket, request.url.path)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated"
+        )
+    return _active_employee(await db.scalar(_employee_query(email)))
+
+
+def _check_role(current_employee: Employee, allowed_roles) -> Employee:
+    if current_employee.role not in allowed_roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Access denied. Required roles: {', '.join(allowed_roles)}"
+        )
+    return current_employee
+
+
 def require_role(*allowed_roles: str):
     def role_checker(current_employee: Employee = Depends(get_current_employee)) -> Employee:
-        if current_employee.role not in allowed_roles:
+        return _check_role(current_employee, allowed_roles)
+    return role_checker
+
+
+def require_role_or_ticket(*allowed_roles: str):
+    """
+    require_role for GET endpoints the browser opens directly: also accepts a
+    ticket query parameter issued for the request path by POST /auth/ticket.
+    """
+    def role_checker(
+        request: Request,
+        credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+        ticket: Optional[str] = Query(default=None, description="From POST /auth/ticket, for links opened without headers"),
+        db: Session = Depends(get_db)
+    ) -> Employee:
+        if credentials:
+            email = _email_for_token(credentials.credentials)
+        elif ticket:
+            email = _email_for_ticket(ticket, request.url.path)
+        else:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Access denied. Required roles: {', '.join(allowed_roles)}"
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated"
             )
-        return current_employee
+        return _check_role(_active_employee(db.scalar(_employee_query(email))), allowed_roles)
+    return role_checker
+
+
+def require_role_async(*allowed_roles: str):
+    """require_role for async endpoints, authenticating on their async session"""
+    def role_checker(current_employee: Employee = Depends(get_current_employee_async)) -> Employee:
+        return _check_role(current_employee, allowed_roles)
     return role_checker
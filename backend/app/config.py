@@ -1,3 +1,6 @@
+from datetime import date
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,10 +16,124 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 1440
     refresh_token_expire_days: int = 7
+    # Lifetime of single-URL tickets for links the browser opens without headers
+    url_ticket_expire_seconds: int = 60
+
+    # Serve the async-ported read endpoints from an asyncpg/aiosqlite engine;
+    # the async URL is derived from database_url unless set explicitly
+    database_async: bool = False
+    async_database_url: Optional[str] = None
+
+    # Connection pool per engine; a statement timeout of 0 disables it. PgBouncer
+    # mode (transaction pooling) keeps no session state or cached prepared statements
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0
+    db_pgbouncer: bool = False
+
+    # Comma-separated read replica URLs for read-only endpoints; a client that
+    # wrote within the last replica_read_your_writes_seconds reads the primary
+    database_replica_urls: str = ""
+    replica_read_your_writes_seconds: int = 10
+
+    # Fernet key for integration secrets; old keys go in the comma-separated fallbacks during rotation
+    encryption_key: Optional[str] = None
+    encryption_key_fallbacks: str = ""
+
+    # Largest accepted timesheet upload
+    max_upload_size_mb: int = 25
+    max_batch_files: int = 1000
+    # Largest accepted batch upload request, all files together
+    max_batch_upload_mb: int = 500
+    upload_stats_ttl_seconds: int = 30
+    # Serialized dashboard bodies kept per worker, keyed by data version
+    dashboard_cache_size: int = 64
+    # Also store each timesheet's daily hours as packed centi-hour arrays for analytics
+    timesheet_packed_hours: bool = True
+
+    # Cold storage: blobs older than archive_after_months are packed into ARCHIVE_DIR
+    # (or the 'module:Class' archive_backend) and restored copies kept for archive_restore_hours
+    archive_after_months: int = 6
+    archive_dir: str = "uploads/archive"
+    archive_backend: Optional[str] = None
+    archive_restore_hours: int = 24
+    # Blobs no upload references are deleted by the tiering job once unreferenced
+    # and unwritten for this long
+    blob_sweep_grace_seconds: int = 3600
+
+    # Rendered thumbnails/previews; 0 workers renders in-process
+    preview_cache_dir: str = "uploads/previews"
+    preview_cache_max_mb: int = 512
+    preview_workers: int = 2
+
+    # Biweekly pay periods run every 14 days from this date (aligned to the week start day)
+    pay_period_anchor: date = date(2024, 1, 1)
+
+    # Server-sent events: with events_pg_notify, workers exchange events over
+    # PostgreSQL LISTEN/NOTIFY on events_channel so every stream sees every change
+    events_pg_notify: bool = False
+    events_channel: str = "timesheetpro_events"
+    events_heartbeat_seconds: int = 15
+    events_queue_size: int = 100
+
+    # Background jobs (integration syncs, parsing, archiving); off in tests
+    scheduler_enabled: bool = True
+
+    # Upload parsing pipeline; 0 workers parses in-process
+    parsing_workers: int = 2
+    parsing_batch_size: int = 50
+    parsing_stale_minutes: int = 30
+    # 'module:function' extractor for PDF/JPG uploads
+    document_extractor: Optional[str] = None
+
+    # Outgoing mail; notifications stay PENDING until smtp_host is set. Up to
+    # smtp_max_connections sessions are kept open and reused across sends
+    smtp_host: Optional[str] = None
+    smtp_port: int = 25
+    smtp_username: Optional[str] = None
+    smtp_password: Optional[str] = None
+    smtp_starttls: bool = False
+    smtp_from: str = "timesheets@localhost"
+    smtp_max_connections: int = 4
+    smtp_timeout_seconds: int = 30
+
+    # Notification outbox. Each worker process claims notification_batch_size rows
+    # with a notification_lease_seconds lease and delivers them on
+    # notification_worker_threads threads. Failures are retried with exponential
+    # backoff up to notification_max_attempts. Rate limits are deployment-wide:
+    # 'channel=per_second' pairs, plus one per recipient domain (0 = unlimited),
+    # split evenly across notification_processes, the total number of processes
+    # delivering on all hosts. Extra channels are 'name=module:attr' factories
+    notification_batch_size: int = 200
+    notification_worker_threads: int = 8
+    notification_lease_seconds: int = 300
+    notification_poll_seconds: float = 1.0
+    notification_max_attempts: int = 6
+    notification_retry_base_seconds: float = 30
+    notification_retry_max_seconds: float = 3600
+    notification_rate_limits: str = ""
+    notification_domain_rate_limit: float = 0
+    notification_processes: int = 1
+    notification_channels: str = ""
+    notification_webhook_url: Optional[str] = None
+    notification_webhook_timeout_seconds: float = 10
+    # Deliver from the scheduler; turn off when dedicated outbox workers run
+    notification_scheduler_delivery: bool = True
+
+    # Overdue reminders: periods ended more than reminder_grace_days ago within the
+    # last reminder_lookback_days, at most one reminder per employee per interval
+    reminders_enabled: bool = True
+    reminder_grace_days: int = 1
+    reminder_lookback_days: int = 28
+    reminder_interval_hours: int = 24
 
     # ✅ MUST be snake_case
-    google_drive_folder_id: str
-    google_service_account_file: str
+    # Optional: the Drive webhook answers 503 until these are set
+    google_drive_folder_id: Optional[str] = None
+    google_service_account_file: Optional[str] = None
     google_drive_download_dir: str = "./downloads"
 
 
@@ -1,14 +1,191 @@
-from sqlalchemy import create_engine
+import itertools
+import time
+import uuid
+from typing import List
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
 
 from app.config import settings
+from app.utils.metrics import metrics
+
+
+class _TimedPoolMixin:
+    """
+    Times the public Pool.connect() and counts checkout timeouts under
+    db.<pool_name>.*; configure_engine adds the usage gauges from the pool's
+    checkout/checkin events.
+    """
+    pool_name = "primary"
+
+    def __init__(self, *args, pool_size: int = 5, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, pool_size=pool_size, max_overflow=max_overflow, **kwargs)
+        # None when overflow is unlimited
+        self.capacity = pool_size + max_overflow if max_overflow >= 0 else None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            metrics.increment(f"db.{self.pool_name}.pool_timeouts")
+            raise
+        finally:
+            metrics.observe(f"db.{self.pool_name}.pool_checkout_wait", time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.pool_name = self.pool_name
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _is_async_driver(drivername: str) -> bool:
+    return drivername in ("postgresql+asyncpg", "postgresql+psycopg_async", "sqlite+aiosqlite")
+
+
+def _pgbouncer_options(drivername: str) -> dict:
+    """
+    connect_args keeping drivers from reusing prepared statements by name:
+    PgBouncer may hand each transaction a different server connection.
+    psycopg2 never prepares statements server-side, so it needs none.
+    """
+    if drivername == "postgresql+asyncpg":
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    if drivername in ("postgresql+psycopg", "postgresql+psycopg_async"):
+        # psycopg 3 prepares statements executed prepare_threshold times
+        return {"prepare_threshold": None}
+    return {}
+
+
+def _statement_timeout_options(drivername: str) -> dict:
+    """connect_args setting the statement timeout at connection startup"""
+    timeout = str(settings.db_statement_timeout_ms)
+    if drivername == "postgresql+asyncpg":
+        return {"server_settings": {"statement_timeout": timeout}}
+    return {"options": f"-c statement_timeout={timeout}"}
+
+
+def engine_options(url: str) -> dict:
+    """
+    create_engine keyword arguments for url from the db_* pool settings.
+    SQLite only gets the pool settings, and only for file databases.
+    """
+    parsed = make_url(url)
+    # Resolve the dialect's default driver for bare 'postgresql://' URLs
+    drivername = f"{parsed.get_backend_name()}+{parsed.get_driver_name()}"
+    is_async = _is_async_driver(drivername)
+    options = {}
+
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.database in (None, "", ":memory:"):
+            return options
+    elif parsed.get_backend_name() == "postgresql":
+        connect_args = {}
+        if settings.db_statement_timeout_ms > 0 and not settings.db_pgbouncer:
+            connect_args.update(_statement_timeout_options(drivername))
+        if settings.db_pgbouncer:
+            connect_args.update(_pgbouncer_options(drivername))
+        if connect_args:
+            options["connect_args"] = connect_args
+
+    options.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    return options
+
 
-engine = create_engine(settings.database_url)
+def configure_engine(sync_engine, pool_name: str = "primary"):
+    """
+    Name the engine's pool for metrics and, in PgBouncer mode, apply the
+    statement timeout per transaction since startup parameters aren't passed on.
+    """
+    if isinstance(sync_engine.pool, _TimedPoolMixin):
+        sync_engine.pool.pool_name = pool_name
+
+        def report_usage(checked_out: int):
+            pool = sync_engine.pool
+            metrics.set_gauge(f"db.{pool_name}.pool_checked_out", checked_out)
+            if pool.capacity:
+                metrics.set_gauge(f"db.{pool_name}.pool_saturation", round(checked_out / pool.capacity, 3))
+
+        # Engine-level pool listeners carry over when dispose() replaces the pool
+        @event.listens_for(sync_engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            report_usage(sync_engine.pool.checkedout())
+
+        @event.listens_for(sync_engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            # Fires before the connection is back in the pool
+            report_usage(max(sync_engine.pool.checkedout() - 1, 0))
+
+    if (
+        settings.db_pgbouncer
+        and settings.db_statement_timeout_ms > 0
+        and sync_engine.dialect.name == "postgresql"
+    ):
+        @event.listens_for(sync_engine, "begin")
+        def set_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.db_statement_timeout_ms)}")
+
+    return sync_engine
+
+
+engine = configure_engine(create_engine(settings.database_url, **engine_options(settings.database_url)))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Async drivers substituted for the sync ones when database_async is enabled
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+psycopg_async",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+# Cookie and response header set after a successful write; while a client
+# sends either back, its reads go to the primary. The SPA calls the API
+# cross-origin without credentials, so it echoes the header instead of the cookie.
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+# Request header forcing reads to the primary
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_async_engine = None
+_async_sessionmaker = None
+
+# Replica sessionmakers, created on first use
+_replicas = None
+_async_replicas = None
+_replica_counter = itertools.count()
+
 
 def get_db():
     db = SessionLocal()
@@ -16,3 +193,203 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def async_database_url(url: str) -> str:
+    """Rewrite a sync database URL to use the matching async driver"""
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        raise ValueError(f"Invalid database URL '{url}'")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+def get_async_engine():
+    """Async engine, created on first use so asyncpg is only needed when enabled"""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        url = settings.async_database_url or async_database_url(settings.database_url)
+        _async_engine = create_async_engine(url, **engine_options(url))
+        configure_engine(_async_engine.sync_engine, "primary_async")
+        _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+async def dispose_async_engine():
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
+
+
+class SyncSessionAdapter:
+    """
+    Awaitable facade over a sync Session for the async-ported endpoints when
+    database_async is off. Each call runs in the threadpool, so the endpoints
+    behave exactly as their sync versions did.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+async def get_async_db():
+    """
+    Session dependency for async endpoints: an AsyncSession when
+    database_async is enabled, otherwise a SyncSessionAdapter.
+    """
+    if settings.database_async:
+        get_async_engine()
+        async with _async_sessionmaker() as db:
+            yield db
+    else:
+        db = SyncSessionAdapter(SessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+def replica_urls() -> List[str]:
+    return [url.strip() for url in settings.database_replica_urls.split(",") if url.strip()]
+
+
+def _get_replicas() -> list:
+    global _replicas
+    if _replicas is None:
+        _replicas = []
+        for i, url in enumerate(replica_urls()):
+            replica = configure_engine(create_engine(url, **engine_options(url)), f"replica{i}")
+            _replicas.append(sessionmaker(autocommit=False, autoflush=False, bind=replica))
+    return _replicas
+
+
+def _get_async_replicas() -> list:
+    global _async_replicas
+    if _async_replicas is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        _async_replicas = []
+        for i, url in enumerate(replica_urls()):
+            url = async_database_url(url)
+            replica = create_async_engine(url, **engine_options(url))
+            configure_engine(replica.sync_engine, f"replica{i}_async")
+            _async_replicas.append(async_sessionmaker(replica, autoflush=False, expire_on_commit=False))
+    return _async_replicas
+
+
+def _next_replica(replicas: list):
+    """Round-robin over the configured replicas"""
+    return replicas[next(_replica_counter) % len(replicas)]
+
+
+async def dispose_replicas():
+    global _replicas, _async_replicas
+    for maker in _replicas or []:
+        maker.kw["bind"].dispose()
+    for maker in _async_replicas or []:
+        await maker.kw["bind"].dispose()
+    _replicas = None
+    _async_replicas = None
+
+
+def reads_from_primary(request: Request) -> bool:
+    """
+    Whether this request's reads must see the primary: the client asked
+    for it explicitly or wrote something within the replica lag window.
+    """
+    if request.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    last_write = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    if not last_write:
+        return False
+    try:
+        return time.time() - float(last_write) < settings.replica_read_your_writes_seconds
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request, primary: Session = Depends(get_db)):
+    """
+    Session dependency for read-only endpoints: a replica session when
+    replicas are configured, otherwise (or for read-your-writes) the primary.
+    """
+    if not replica_urls() or reads_from_primary(request):
+        yield primary
+        return
+
+    db = _next_replica(_get_replicas())()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request, primary=Depends(get_async_db)):
+    """Async counterpart of get_read_db"""
+    if not replica_urls() or reads_from_primary(request):
+        yield primary
+        return
+
+    if settings.database_async:
+        async with _next_replica(_get_async_replicas())() as db:
+            yield db
+    else:
+        db = SyncSessionAdapter(_next_replica(_get_replicas())())
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+class ReadYourWritesMiddleware:
+    """
+    Marks clients that just wrote with a short-lived cookie and an
+    X-Last-Write header so their next reads are served by the primary
+    instead of a possibly lagging replica.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                written_at = f"{time.time():.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{LAST_WRITE_COOKIE}={written_at}; Max-Age={settings.replica_read_your_writes_seconds}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                headers[LAST_WRITE_HEADER] = written_at
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -1,13 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import engine, Base
-from app.routers import auth, employees, clients, timesheets, approvals, calendars, configurations, notifications, dashboard, timesheets_upload, integrations, monitoring, webhooks
+from app.database import LAST_WRITE_HEADER, ReadYourWritesMiddleware, replica_urls
+from app.utils.body_limit import BodySizeLimitMiddleware
+from app.utils.upload_sniff import MultipartSniffMiddleware
+from app.routers import auth, employees, clients, timesheets, approvals, calendars, configurations, notifications, dashboard, timesheets_upload, integrations, monitoring, webhooks, events, exports, finance
 
 from app.routers import auth, employees, clients, timesheets, approvals, calendars, configurations, drive
 
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title="TimesheetPro API",
     description="Timesheet management system API",
@@ -20,8 +20,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read by the SPA and echoed on its next requests for read-your-writes
+    expose_headers=[LAST_WRITE_HEADER],
 )
 
+app.add_middleware(
+    MultipartSniffMiddleware,
+    fields=timesheets_upload.upload_sniff_fields(),
+    check=timesheets_upload.check_upload_head
+)
+# Added last so it runs first: Content-Length is refused before anything is inspected
+app.add_middleware(BodySizeLimitMiddleware, limits=timesheets_upload.upload_body_limits())
+
+if replica_urls():
+    app.add_middleware(ReadYourWritesMiddleware)
+
 app.include_router(auth.router)
 app.include_router(employees.router)
 app.include_router(clients.router)
@@ -35,13 +48,33 @@ app.include_router(timesheets_upload.router)
 app.include_router(integrations.router)
 app.include_router(monitoring.router)
 app.include_router(webhooks.router)
+app.include_router(events.router)
+app.include_router(exports.router)
+app.include_router(finance.router)
 
-from app.scheduler import start_scheduler
+from app.scheduler import shutdown_scheduler, start_scheduler
+from app.services.timesheet_parser import shutdown_executor
+from app.services.previews import shutdown_preview_service
+from app.database import dispose_async_engine, dispose_replicas
+from app.services.events import start_event_bridge, stop_event_bridge
 
 # Start background scheduler for polling (Email & Drive)
 @app.on_event("startup")
 def startup_event():
     start_scheduler()
+    start_event_bridge()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_scheduler()
+    stop_event_bridge()
+    shutdown_executor()
+    shutdown_preview_service()
+    await dispose_async_engine()
+    await dispose_replicas()
+
+
 app.include_router(drive.router)
 
 
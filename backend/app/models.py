@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Boolean, Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Enum as SQLEnum, Table
+from sqlalchemy import Boolean, Column, Integer, BigInteger, String, LargeBinary, Float, Date, DateTime, ForeignKey, Text, Enum as SQLEnum, Table, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 import enum
 
@@ -51,6 +51,11 @@ class UploadStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+class StorageTier(str, enum.Enum):
+    HOT = "hot"
+    COLD = "cold"
+
+
 class IntegrationType(str, enum.Enum):
     EMAIL = "email"
     DRIVE = "drive"
@@ -155,6 +160,10 @@ class Timesheet(Base):
     submission_date = Column(DateTime, nullable=True)
     file_path = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
+    # Daily hours and overtime as packed centi-hour arrays indexed by day from
+    # period_start (app.services.packed_hours); NULL when not packed
+    packed_hours = Column(LargeBinary, nullable=True)
+    packed_overtime = Column(LargeBinary, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -163,6 +172,13 @@ class Timesheet(Base):
     details = relationship("TimesheetDetail", back_populates="timesheet", cascade="all, delete-orphan")
     approvals = relationship("Approval", back_populates="timesheet", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Period overlap lookups per employee and client (missing-timesheet anti-join, duplicate check)
+        Index("ix_timesheets_employee_client_period", "employee_id", "client_id", "period_start"),
+        # max(updated_at) in conditional GET version tokens
+        Index("ix_timesheets_updated_at", "updated_at"),
+    )
+
 
 class TimesheetDetail(Base):
     __tablename__ = "timesheet_details"
@@ -180,6 +196,42 @@ class TimesheetDetail(Base):
     timesheet = relationship("Timesheet", back_populates="details")
 
 
+class TimesheetPeriodTotal(Base):
+    """
+    Approved hours and amounts per (employee, client, period), maintained by
+    app.services.aggregates when approval decisions are made.
+    Finance reports read these instead of timesheets and their details.
+    """
+    __tablename__ = "timesheet_period_totals"
+
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), nullable=False)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    timesheets = Column(Integer, nullable=False, default=0)
+    regular_hours = Column(Float, nullable=False, default=0.0)
+    overtime_hours = Column(Float, nullable=False, default=0.0)
+    # Rates in effect when the period was first approved; NULL when none was set
+    pay_rate = Column(Float, nullable=True)
+    bill_rate = Column(Float, nullable=True)
+    overtime_multiplier = Column(Float, nullable=False, default=1.5)
+    regular_pay = Column(Float, nullable=True)
+    overtime_pay = Column(Float, nullable=True)
+    billable_amount = Column(Float, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    employee = relationship("Employee")
+    client = relationship("Client")
+
+    __table_args__ = (
+        UniqueConstraint("employee_id", "client_id", "period_start", "period_end", name="uq_timesheet_period_totals_key"),
+        # Revenue by client and month
+        Index("ix_timesheet_period_totals_client_period", "client_id", "period_start"),
+    )
+
+
 class Approval(Base):
     __tablename__ = "approvals"
 
@@ -234,9 +286,20 @@ class Notification(Base):
     status = Column(SQLEnum(NotificationStatus, values_callable=lambda x: [e.value for e in x]), nullable=False, default=NotificationStatus.PENDING)
     sent_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Outbox delivery state: channel name, failed attempts so far, earliest next
+    # attempt (NULL = now) and the lease held by the worker delivering it
+    channel = Column(String, nullable=False, default="email", server_default="email")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime, nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
 
     employee = relationship("Employee")
 
+    __table_args__ = (
+        Index("ix_notifications_outbox", "status", "next_attempt_at"),
+    )
+
 
 class Configuration(Base):
     __tablename__ = "configurations"
@@ -274,6 +337,8 @@ class TimesheetUpload(Base):
     file_path = Column(String, nullable=False)  # Local storage path
     file_name = Column(String, nullable=False)  # Original filename
     file_format = Column(String, nullable=False)  # pdf, jpg, csv
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the file content (StoredBlob.digest)
+    file_size = Column(BigInteger, nullable=True)
     source = Column(SQLEnum(UploadSource, values_callable=lambda x: [e.value for e in x]), nullable=False)
     status = Column(SQLEnum(UploadStatus, values_callable=lambda x: [e.value for e in x]), nullable=False, default=UploadStatus.PENDING)
     uploaded_by = Column(Integer, ForeignKey("employees.id"), nullable=True)  # Admin who uploaded (for manual uploads)
@@ -285,6 +350,34 @@ class TimesheetUpload(Base):
     employee = relationship("Employee", foreign_keys=[employee_id])
     uploader = relationship("Employee", foreign_keys=[uploaded_by])
 
+    __table_args__ = (
+        Index("ix_timesheet_uploads_employee_hash", "employee_id", "content_hash"),
+    )
+
+
+class StoredBlob(Base):
+    """Content-addressed file shared by every upload with identical content"""
+    __tablename__ = "stored_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    digest = Column(String(64), unique=True, nullable=False, index=True)  # SHA-256 hex
+    file_path = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # Number of uploads pointing at this blob
+    tier = Column(SQLEnum(StorageTier, values_callable=lambda x: [e.value for e in x]), nullable=False, default=StorageTier.HOT)
+    # Location inside an archive pack once the blob is cold
+    archive_key = Column(String, nullable=True)
+    archive_offset = Column(BigInteger, nullable=True)
+    archive_length = Column(BigInteger, nullable=True)  # Compressed bytes
+    compression = Column(String(8), nullable=True)  # zstd or zlib
+    archived_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_stored_blobs_tier_created", "tier", "created_at"),
+    )
+
 
 class IntegrationConfig(Base):
     """Stores email and Drive integration configurations"""
@@ -7,6 +7,8 @@ from app.database import get_db
 from app.models import Approval, Timesheet, Employee, UserRole, ApprovalStatus, TimesheetStatus
 from app.schemas import ApprovalResponse, ApprovalUpdate
 from app.auth import get_current_employee, require_role
+from app.services.aggregates import refresh_timesheet_totals
+from app.services.events import publish_after_commit
 
 router = APIRouter(prefix="/approvals", tags=["Approvals"])
 
@@ -81,6 +83,11 @@ def update_approval(
             timesheet.status = TimesheetStatus.APPROVED
         elif approval_update.status == ApprovalStatus.REJECTED:
             timesheet.status = TimesheetStatus.REJECTED
+        refresh_timesheet_totals(db, timesheet)
+        publish_after_commit(db, "timesheets", f"timesheet.{timesheet.status.value}", {
+            "id": timesheet.id, "employee_id": timesheet.employee_id,
+            "client_id": timesheet.client_id, "status": timesheet.status.value
+        })
 
     db.commit()
     db.refresh(approval)
@@ -1,15 +1,16 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import Employee, UserRole
-from app.schemas import EmployeeCreate, EmployeeResponse, LoginRequest, Token
+from app.schemas import EmployeeCreate, EmployeeResponse, LoginRequest, Token, UrlTicket
 from app.auth import (
     verify_password,
     get_password_hash,
     create_access_token,
     create_refresh_token,
+    create_url_ticket,
     get_current_employee,
     require_role
 )
@@ -112,10 +113,31 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=EmployeeResponse)
-def get_current_user(current_employee: Employee = Depends(get_current_employee)):
+async def get_current_user(current_employee: Employee = Depends(get_current_employee)):
     return current_employee
 
 
+@router.post("/ticket", response_model=UrlTicket)
+def create_ticket(
+    path: str = Query(..., description="Request path the ticket opens, e.g. /timesheets/uploads/5/content"),
+    current_employee: Employee = Depends(get_current_employee)
+):
+    """
+    Issue a short-lived ticket for one URL, passed as ?ticket=... by links the
+    browser opens itself. Keeps the access token out of URLs and access logs;
+    the endpoint still checks the holder's role.
+    """
+    if not path.startswith("/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="path must be an absolute request path"
+        )
+    return {
+        "ticket": create_url_ticket(current_employee.email, path),
+        "expires_in": settings.url_ticket_expire_seconds
+    }
+
+
 @router.post("/refresh", response_model=Token)
 def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
     from app.auth import decode_token
@@ -1,20 +1,66 @@
 from typing import List, Optional
 from datetime import datetime, date, timedelta
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status as http_status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from pydantic import BaseModel
-import json
 
-from app.database import get_db
+from app.database import get_async_read_db, get_read_db
 from app.models import (
     Employee, Client, UserRole, Timesheet, TimesheetStatus,
     EmployeeClientAssignment, BusinessCalendar
 )
-from app.auth import require_role
+from app.auth import require_role, require_role_async
+from app.config import settings
+from app.services.missing_timesheets import covers, expects, iter_missing_timesheets
+from app.services.period_calendar import client_calendar
+from app.utils.cache import LRUCache
+from app.utils.fast_json import dumps
+from app.utils.conditional import (
+    CACHE_CONTROL, collection_version, compute_etag, etag_matches, not_modified, set_etag
+)
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+# Serialized dashboard bodies by ETag; a new data version never hits old entries
+_dashboard_cache = LRUCache(max_entries=settings.dashboard_cache_size)
+
+
+def dashboard_version(window_start: date, window_end: date):
+    """
+    Version of everything a month's dashboard reads: the small client,
+    employee and assignment tables whole (period calendars derive from Client
+    columns), and only the timesheets overlapping the month's period window.
+    """
+    return collection_version(
+        (Client,), (Employee,), (EmployeeClientAssignment,),
+        (Timesheet, Timesheet.period_start <= window_end, Timesheet.period_end >= window_start)
+    )
+
+
+def month_window(clients, year: int, month: int) -> tuple:
+    """
+    The month's canonical periods per client, and the window they span.
+
+    Returns:
+        tuple: (month_start, month_end, periods by client id, window_start, window_end)
+    """
+    month_start = date(year, month, 1)
+    if month == 12:
+        month_end = date(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        month_end = date(year, month + 1, 1) - timedelta(days=1)
+
+    expected_periods = {
+        client.id: client_calendar(client).periods_in(month_start, month_end)
+        for client in clients
+    }
+    window_start = min((periods[0].start for periods in expected_periods.values() if periods), default=month_start)
+    window_end = max((periods[-1].end for periods in expected_periods.values() if periods), default=month_end)
+    return month_start, month_end, expected_periods, window_start, window_end
+
 
 class TimesheetPeriodStatus(BaseModel):
     period_start: date
@@ -54,72 +100,24 @@ class DashboardResponse(BaseModel):
     clients_with_employees: List[ClientWithEmployees]
 
 
-def get_timesheet_periods(frequency: str, year: int, month: int) -> List[dict]:
-    """Generate expected timesheet periods based on frequency."""
-    periods = []
-
-    if frequency == "weekly":
-        # Generate weekly periods for the month
-        first_day = date(year, month, 1)
-        if month == 12:
-            last_day = date(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            last_day = date(year, month + 1, 1) - timedelta(days=1)
-
-        # Find the first Monday of the month or use month start
-        current = first_day
-        while current <= last_day:
-            week_end = current + timedelta(days=6)
-            if week_end > last_day:
-                week_end = last_day
-            periods.append({
-                "start": current,
-                "end": week_end
-            })
-            current = week_end + timedelta(days=1)
-
-    elif frequency == "biweekly":
-        first_day = date(year, month, 1)
-        if month == 12:
-            last_day = date(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            last_day = date(year, month + 1, 1) - timedelta(days=1)
-
-        current = first_day
-        while current <= last_day:
-            period_end = current + timedelta(days=13)
-            if period_end > last_day:
-                period_end = last_day
-            periods.append({
-                "start": current,
-                "end": period_end
-            })
-            current = period_end + timedelta(days=1)
-
-    elif frequency == "monthly":
-        first_day = date(year, month, 1)
-        if month == 12:
-            last_day = date(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            last_day = date(year, month + 1, 1) - timedelta(days=1)
-
-        periods.append({
-            "start": first_day,
-            "end": last_day
-        })
-
-    return periods
+PERIOD_STATUS_LABELS = {
+    TimesheetStatus.APPROVED: "approved",
+    TimesheetStatus.SUBMITTED: "submitted",
+}
 
 
 @router.get("/", response_model=DashboardResponse)
-def get_dashboard_data(
+async def get_dashboard_data(
+    request: Request,
     year: int = Query(default=None, description="Year to filter by"),
     month: int = Query(default=None, description="Month to filter by (1-12)"),
-    db: Session = Depends(get_db),
-    current_employee: Employee = Depends(require_role(UserRole.ADMIN, UserRole.MANAGER, UserRole.FINANCE))
+    db: AsyncSession = Depends(get_async_read_db),
+    current_employee: Employee = Depends(require_role_async(UserRole.ADMIN, UserRole.MANAGER, UserRole.FINANCE))
 ):
     """
     Get dashboard data with employees grouped by client and their timesheet status.
+    Answers If-None-Match with 304 while the underlying tables are unchanged,
+    and serves repeat polls from a cache of serialized bodies.
     """
     # Use current year/month if not specified
     now = datetime.now()
@@ -128,162 +126,225 @@ def get_dashboard_data(
     if month is None:
         month = now.month
 
-    # Get all active clients
-    clients = db.query(Client).filter(Client.is_active == True).all()
+    clients = await active_clients(db)
+    window = month_window(clients, year, month)
+    version = (await db.execute(dashboard_version(*window[3:]))).one()
+    etag = compute_etag(current_employee.role.value, {"year": year, "month": month}, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    body = _dashboard_cache.get(etag)
+    if body is None:
+        body = dumps(await build_dashboard(db, year, month, clients))
+        _dashboard_cache.set(etag, body)
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
 
-    # Get stats
-    total_clients = len(clients)
-    total_employees = db.query(Employee).filter(
-        Employee.is_active == True,
-        Employee.role == UserRole.EMPLOYEE
-    ).count()
 
-    # Calculate timesheet stats for the period
-    period_start = date(year, month, 1)
-    if month == 12:
-        period_end = date(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        period_end = date(year, month + 1, 1) - timedelta(days=1)
+async def active_clients(db: AsyncSession) -> list:
+    return (await db.scalars(select(Client).filter(Client.is_active == True))).all()
+
+
+async def build_dashboard(db: AsyncSession, year: int, month: int, clients: Optional[list] = None) -> dict:
+    """
+    Employees grouped by client with the status of each pay period overlapping the month.
+    Builds plain dicts in the shape of DashboardResponse; a large month has tens
+    of thousands of periods, and validating each as a model costs more than the
+    queries. Serialize the result with fast_json.dumps.
+    """
+    if clients is None:
+        clients = await active_clients(db)
 
-    pending_timesheets = db.query(Timesheet).filter(
-        Timesheet.status == TimesheetStatus.SUBMITTED,
-        Timesheet.period_start >= period_start,
-        Timesheet.period_end <= period_end
-    ).count()
+    # Get stats
+    total_clients = len(clients)
+    total_employees = await db.scalar(
+        select(func.count(Employee.id)).filter(
+            Employee.is_active == True,
+            Employee.role == UserRole.EMPLOYEE
+        )
+    )
 
-    approved_timesheets = db.query(Timesheet).filter(
-        Timesheet.status == TimesheetStatus.APPROVED,
-        Timesheet.period_start >= period_start,
-        Timesheet.period_end <= period_end
-    ).count()
+    # Canonical periods overlapping the month, per client calendar
+    period_start, period_end, expected_periods, window_start, window_end = month_window(clients, year, month)
+
+    # One query covers the lookups for every client's periods. Like the
+    # missing-timesheet engine, any timesheet overlapping a period covers it,
+    # so partial-period drafts are found even when they cross the window edge.
+    window_timesheets = (await db.execute(
+        select(
+            Timesheet.id, Timesheet.employee_id, Timesheet.client_id,
+            Timesheet.period_start, Timesheet.period_end, Timesheet.status
+        ).filter(
+            Timesheet.period_start <= window_end,
+            Timesheet.period_end >= window_start
+        ).order_by(Timesheet.id)
+    )).all()
+    month_timesheets = [
+        t for t in window_timesheets if t.period_start >= period_start and t.period_end <= period_end
+    ]
+
+    pending_timesheets = sum(1 for t in month_timesheets if t.status == TimesheetStatus.SUBMITTED)
+    approved_timesheets = sum(1 for t in month_timesheets if t.status == TimesheetStatus.APPROVED)
+
+    timesheets_by_assignment = {}
+    for t in window_timesheets:
+        timesheets_by_assignment.setdefault((t.employee_id, t.client_id), []).append(t)
+
+    # Active assignments of active employees, for all clients at once
+    assignments_by_client = {}
+    assignment_rows = (await db.execute(
+        select(EmployeeClientAssignment, Employee)
+        .join(Employee, Employee.id == EmployeeClientAssignment.employee_id)
+        .filter(
+            EmployeeClientAssignment.is_active == True,
+            Employee.is_active == True
+        )
+        .order_by(EmployeeClientAssignment.id)
+    )).all()
+    for assignment, employee in assignment_rows:
+        assignments_by_client.setdefault(assignment.client_id, []).append((assignment, employee))
 
     clients_with_employees = []
+    missing_timesheets = 0
 
     for client in clients:
-        # Get all active employee assignments for this client
-        assignments = db.query(EmployeeClientAssignment).filter(
-            EmployeeClientAssignment.client_id == client.id,
-            EmployeeClientAssignment.is_active == True
-        ).all()
-
         employee_statuses = []
 
-        for assignment in assignments:
-            employee = db.query(Employee).filter(
-                Employee.id == assignment.employee_id,
-                Employee.is_active == True
-            ).first()
-
-            if not employee:
-                continue
-
-            # Get expected periods based on client's submission frequency
-            expected_periods = get_timesheet_periods(
-                client.default_submission_frequency,
-                year,
-                month
-            )
-
+        for assignment, employee in assignments_by_client.get(client.id, []):
             period_statuses = []
+            timesheets = timesheets_by_assignment.get((employee.id, client.id), [])
 
-            for period in expected_periods:
-                # Check if timesheet exists for this period
-                timesheet = db.query(Timesheet).filter(
-                    Timesheet.employee_id == employee.id,
-                    Timesheet.client_id == client.id,
-                    Timesheet.period_start == period["start"],
-                    Timesheet.period_end == period["end"]
-                ).first()
+            for period in expected_periods[client.id]:
+                if not expects(assignment, period):
+                    continue
+
+                # Oldest timesheet overlapping this period
+                timesheet = next((t for t in timesheets if covers(t.period_start, t.period_end, period)), None)
 
                 if timesheet:
-                    if timesheet.status == TimesheetStatus.APPROVED:
-                        status = "approved"
-                    elif timesheet.status == TimesheetStatus.SUBMITTED:
-                        status = "submitted"
-                    else:
-                        status = "draft"
-
-                    period_statuses.append(TimesheetPeriodStatus(
-                        period_start=period["start"],
-                        period_end=period["end"],
-                        status=status,
-                        timesheet_id=timesheet.id
-                    ))
+                    period_statuses.append({
+                        "period_start": period.start,
+                        "period_end": period.end,
+                        "status": PERIOD_STATUS_LABELS.get(timesheet.status, "draft"),
+                        "timesheet_id": timesheet.id
+                    })
                 else:
-                    period_statuses.append(TimesheetPeriodStatus(
-                        period_start=period["start"],
-                        period_end=period["end"],
-                        status="missing",
-                        timesheet_id=None
-                    ))
-
-            employee_statuses.append(EmployeeTimesheetStatus(
-                employee_id=employee.id,
-                employee_name=f"{employee.first_name} {employee.last_name}",
-                employee_email=employee.email,
-                pay_rate=assignment.pay_rate or employee.pay_rate,
-                overtime_allowed=assignment.overtime_allowed,
-                periods=period_statuses
-            ))
+                    missing_timesheets += 1
+                    period_statuses.append({
+                        "period_start": period.start,
+                        "period_end": period.end,
+                        "status": "missing",
+                        "timesheet_id": None
+                    })
+
+            employee_statuses.append({
+                "employee_id": employee.id,
+                "employee_name": f"{employee.first_name} {employee.last_name}",
+                "employee_email": employee.email,
+                "pay_rate": assignment.pay_rate or employee.pay_rate,
+                "overtime_allowed": assignment.overtime_allowed,
+                "periods": period_statuses
+            })
 
         if employee_statuses:  # Only include clients with employees
-            clients_with_employees.append(ClientWithEmployees(
-                client_id=client.id,
-                client_name=client.name,
-                client_code=client.code,
-                bill_rate=client.bill_rate,
-                submission_frequency=client.default_submission_frequency,
-                employees=employee_statuses
-            ))
-
-    # Calculate missing timesheets
-    total_expected = sum(
-        len(emp.periods) for client in clients_with_employees for emp in client.employees
-    )
-    missing_timesheets = sum(
-        1 for client in clients_with_employees
-        for emp in client.employees
-        for period in emp.periods
-        if period.status == "missing"
-    )
-
-    stats = DashboardStats(
-        total_clients=total_clients,
-        total_employees=total_employees,
-        pending_timesheets=pending_timesheets,
-        approved_timesheets=approved_timesheets,
-        missing_timesheets=missing_timesheets
-    )
+            clients_with_employees.append({
+                "client_id": client.id,
+                "client_name": client.name,
+                "client_code": client.code,
+                "bill_rate": client.bill_rate,
+                "submission_frequency": client.default_submission_frequency,
+                "employees": employee_statuses
+            })
 
-    return DashboardResponse(
-        stats=stats,
-        clients_with_employees=clients_with_employees
-    )
+    return {
+        "stats": {
+            "total_clients": total_clients,
+            "total_employees": total_employees,
+            "pending_timesheets": pending_timesheets,
+            "approved_timesheets": approved_timesheets,
+            "missing_timesheets": missing_timesheets
+        },
+        "clients_with_employees": clients_with_employees
+    }
 
 
 @router.get("/stats")
-def get_dashboard_stats(
-    db: Session = Depends(get_db),
-    current_employee: Employee = Depends(require_role(UserRole.ADMIN, UserRole.MANAGER, UserRole.FINANCE))
+async def get_dashboard_stats(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_employee: Employee = Depends(require_role_async(UserRole.ADMIN, UserRole.MANAGER, UserRole.FINANCE))
 ):
     """Get quick dashboard statistics."""
-    total_clients = db.query(Client).filter(Client.is_active == True).count()
-    total_employees = db.query(Employee).filter(
-        Employee.is_active == True,
-        Employee.role == UserRole.EMPLOYEE
-    ).count()
-
-    pending = db.query(Timesheet).filter(
-        Timesheet.status == TimesheetStatus.SUBMITTED
-    ).count()
+    version = (await db.execute(collection_version((Client,), (Employee,), (Timesheet,)))).one()
+    etag = compute_etag(current_employee.role.value, {}, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    total_clients = await db.scalar(select(func.count(Client.id)).filter(Client.is_active == True))
+    total_employees = await db.scalar(
+        select(func.count(Employee.id)).filter(
+            Employee.is_active == True,
+            Employee.role == UserRole.EMPLOYEE
+        )
+    )
 
-    approved = db.query(Timesheet).filter(
-        Timesheet.status == TimesheetStatus.APPROVED
-    ).count()
+    status_counts = dict((await db.execute(
+        select(Timesheet.status, func.count(Timesheet.id))
+        .filter(Timesheet.status.in_([TimesheetStatus.SUBMITTED, TimesheetStatus.APPROVED]))
+        .group_by(Timesheet.status)
+    )).all())
 
     return {
         "total_clients": total_clients,
         "total_employees": total_employees,
-        "pending_timesheets": pending,
-        "approved_timesheets": approved
+        "pending_timesheets": status_counts.get(TimesheetStatus.SUBMITTED, 0),
+        "approved_timesheets": status_counts.get(TimesheetStatus.APPROVED, 0)
     }
+
+
+@router.get("/missing-timesheets")
+def stream_missing_timesheets(
+    start: date = Query(default=None, description="First day, defaults to the start of this month"),
+    end: date = Query(default=None, description="Last day, defaults to today"),
+    client_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    submitted_only: bool = Query(default=False, description="Count drafts as missing"),
+    db: Session = Depends(get_read_db),
+    current_employee: Employee = Depends(require_role(UserRole.ADMIN, UserRole.MANAGER, UserRole.FINANCE))
+):
+    """
+    Stream (employee, client, period) tuples with no timesheet as NDJSON.
+    Covers every pay period overlapping the range, for active assignments.
+    """
+    today = date.today()
+    start = start or today.replace(day=1)
+    end = end or today
+    if end < start:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="end must not be before start"
+        )
+
+    rows = iter_missing_timesheets(
+        db, start, end,
+        client_ids=[client_id] if client_id else None,
+        employee_ids=[employee_id] if employee_id else None,
+        submitted_only=submitted_only
+    )
+
+    def ndjson():
+        for row in rows:
+            yield dumps({
+                "employee_id": row.employee_id,
+                "client_id": row.client_id,
+                "period_start": row.period_start,
+                "period_end": row.period_end
+            }) + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Request
-from app.services.drive import drive, download_file
+from fastapi import APIRouter, HTTPException, Request, status
+from app.services.drive import DriveNotConfiguredError, download_file, get_drive
 from app.utils.token import get_token, save_token
 from app.config import settings
 
@@ -15,6 +15,11 @@ async def drive_webhook(request: Request):
     if headers.get("X-Goog-Resource-State") == "sync":
         return {"status": "sync acknowledged"}
 
+    try:
+        drive = get_drive()
+    except DriveNotConfiguredError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
     page_token = get_token()
 
     response = drive.changes().list(
@@ -36,7 +41,7 @@ async def drive_webhook(request: Request):
 
         # Only download files from the configured folder
         if settings.google_drive_folder_id in parents:
-            download_file(change["fileId"], file["name"])
+            download_file(change["fileId"], file["name"], drive)
 
 
     if "newStartPageToken" in response:
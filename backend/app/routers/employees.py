@@ -1,11 +1,12 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session, joinedload
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Employee, UserRole, EmployeeClientAssignment, Client, SubmissionFrequency
 from app.schemas import EmployeeResponse, EmployeeUpdate, EmployeeCreateByAdmin, EmployeeClientAssignmentCreate, EmployeeClientAssignmentResponse
 from app.auth import get_current_employee, require_role
+from app.utils.conditional import collection_version, compute_etag, etag_matches, not_modified, set_etag
 
 router = APIRouter(prefix="/employees", tags=["Employees"])
 
@@ -73,13 +74,21 @@ def create_employee_by_admin(
 
 @router.get("/", response_model=List[EmployeeResponse])
 def get_employees(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     client_id: int = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_employee: Employee = Depends(require_role(UserRole.MANAGER, UserRole.ADMIN, UserRole.FINANCE))
 ):
     """Get all employees with their client assignments. Optionally filter by client_id."""
+    version = db.execute(collection_version((Employee,), (EmployeeClientAssignment,))).one()
+    etag = compute_etag(current_employee.role.value, {"skip": skip, "limit": limit, "client_id": client_id}, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     query = db.query(Employee).options(joinedload(Employee.client_assignments))
 
     if client_id:
@@ -92,7 +101,7 @@ def get_employees(
 @router.get("/{employee_id}", response_model=EmployeeResponse)
 def get_employee(
     employee_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_employee: Employee = Depends(require_role(UserRole.MANAGER, UserRole.ADMIN, UserRole.FINANCE))
 ):
     employee = db.query(Employee).options(
@@ -207,7 +216,7 @@ def add_client_assignment(
 @router.get("/{employee_id}/assignments", response_model=List[EmployeeClientAssignmentResponse])
 def get_employee_assignments(
     employee_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_employee: Employee = Depends(require_role(UserRole.MANAGER, UserRole.ADMIN, UserRole.FINANCE))
 ):
     """Get all client assignments for an employee"""
@@ -0,0 +1,65 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.auth import get_stream_employee
+from app.config import settings
+from app.models import Employee, UserRole
+from app.services.events import TOPICS, broker
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+# Topics employees may follow; they only receive events about themselves
+EMPLOYEE_TOPICS = ("timesheets", "uploads")
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    topics: Optional[str] = Query(default=None, description=f"Comma-separated subset of {', '.join(TOPICS)}"),
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+    current_employee: Employee = Depends(get_stream_employee, scope="function")
+):
+    """
+    Server-sent events for timesheet, upload and integration changes.
+    Each event carries ids and the new status; a `resync` event means some
+    were dropped, or can't be replayed after Last-Event-ID, and the client
+    should refetch. EventSource authenticates with a ticket for this path
+    from POST /auth/ticket.
+    """
+    requested = [topic.strip() for topic in topics.split(",") if topic.strip()] if topics else list(TOPICS)
+    unknown = set(requested) - set(TOPICS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown topics: {', '.join(sorted(unknown))}"
+        )
+
+    employee_id = None
+    if current_employee.role == UserRole.EMPLOYEE:
+        requested = [topic for topic in requested if topic in EMPLOYEE_TOPICS]
+        employee_id = current_employee.id
+
+    subscription = broker.subscribe(requested, employee_id, last_event_id or None, settings.events_queue_size)
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                if subscription.lagged:
+                    subscription.lagged = False
+                    yield "event: resync\ndata: {}\n\n"
+                event = await subscription.get(settings.events_heartbeat_seconds)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield event.encode()
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
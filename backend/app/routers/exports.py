@@ -0,0 +1,108 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.auth import require_role
+from app.database import get_read_db
+from app.models import Employee, UserRole
+from app.services.exports import EXPORT_COLUMNS, csv_lines, iter_export_lines, ndjson_lines
+from app.services.packed_hours import DAILY_HOURS_COLUMNS, iter_daily_hours
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+FORMAT_PATTERN = "^(ndjson|csv)$"
+
+
+def _date_range(start: Optional[date], end: Optional[date]):
+    today = date.today()
+    start = start or today.replace(month=1, day=1)
+    end = end or today
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must not be before start"
+        )
+    return start, end
+
+
+def _stream_lines(kind: str, lines, columns, start: date, end: date, format: str) -> StreamingResponse:
+    filename = f"{kind}-{start.isoformat()}-{end.isoformat()}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if format == "csv":
+        return StreamingResponse(csv_lines(lines, columns), media_type="text/csv", headers=headers)
+    return StreamingResponse(ndjson_lines(lines), media_type="application/x-ndjson", headers=headers)
+
+
+def _stream_export(
+    kind: str,
+    db: Session,
+    start: Optional[date],
+    end: Optional[date],
+    client_id: Optional[int],
+    employee_id: Optional[int],
+    format: str
+) -> StreamingResponse:
+    start, end = _date_range(start, end)
+    lines = iter_export_lines(
+        db, kind, start, end,
+        client_ids=[client_id] if client_id else None,
+        employee_ids=[employee_id] if employee_id else None
+    )
+    return _stream_lines(kind, lines, EXPORT_COLUMNS, start, end, format)
+
+
+@router.get("/payroll")
+def export_payroll(
+    start: date = Query(default=None, description="First period start, defaults to January 1st"),
+    end: date = Query(default=None, description="Last period start, defaults to today"),
+    client_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    format: str = Query(default="ndjson", pattern=FORMAT_PATTERN),
+    db: Session = Depends(get_read_db),
+    current_employee: Employee = Depends(require_role(UserRole.ADMIN, UserRole.FINANCE))
+):
+    """
+    Stream approved hours priced at pay rates, one line per employee, client and period.
+    Rates come from the assignment, falling back to the employee's pay rate.
+    """
+    return _stream_export("payroll", db, start, end, client_id, employee_id, format)
+
+
+@router.get("/billing")
+def export_billing(
+    start: date = Query(default=None, description="First period start, defaults to January 1st"),
+    end: date = Query(default=None, description="Last period start, defaults to today"),
+    client_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    format: str = Query(default="ndjson", pattern=FORMAT_PATTERN),
+    db: Session = Depends(get_read_db),
+    current_employee: Employee = Depends(require_role(UserRole.ADMIN, UserRole.FINANCE))
+):
+    """Stream approved hours priced at client bill rates, one line per employee, client and period."""
+    return _stream_export("billing", db, start, end, client_id, employee_id, format)
+
+
+@router.get("/daily-hours")
+def export_daily_hours(
+    start: date = Query(default=None, description="First period start, defaults to January 1st"),
+    end: date = Query(default=None, description="Last period start, defaults to today"),
+    client_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    format: str = Query(default="ndjson", pattern=FORMAT_PATTERN),
+    db: Session = Depends(get_read_db),
+    current_employee: Employee = Depends(require_role(UserRole.ADMIN, UserRole.FINANCE))
+):
+    """
+    Stream approved hours and overtime per worked day.
+    Read from the timesheets' packed daily arrays, falling back to detail rows.
+    """
+    start, end = _date_range(start, end)
+    days = iter_daily_hours(
+        db, start, end,
+        client_ids=[client_id] if client_id else None,
+        employee_ids=[employee_id] if employee_id else None
+    )
+    return _stream_lines("daily-hours", days, DAILY_HOURS_COLUMNS, start, end, format)
@@ -0,0 +1,57 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.auth import require_role
+from app.database import get_read_db
+from app.models import Employee, UserRole
+from app.services.aggregates import payroll_by_employee_month, revenue_by_client_month
+
+router = APIRouter(prefix="/finance", tags=["Finance"])
+
+
+class ClientMonthRevenue(BaseModel):
+    client_id: int
+    client_name: str
+    month: int
+    regular_hours: float
+    overtime_hours: float
+    revenue: float
+    payroll_cost: float
+    margin: float
+
+
+class EmployeeMonthPayroll(BaseModel):
+    employee_id: int
+    employee_name: str
+    month: int
+    regular_hours: float
+    overtime_hours: float
+    regular_pay: float
+    overtime_pay: float
+    total_pay: float
+
+
+@router.get("/revenue", response_model=List[ClientMonthRevenue])
+def get_revenue(
+    year: int = Query(default=None, description="Defaults to the current year"),
+    client_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_employee: Employee = Depends(require_role(UserRole.ADMIN, UserRole.FINANCE))
+):
+    """Billable revenue, payroll cost and margin per client and month, from approved timesheets."""
+    return revenue_by_client_month(db, year or date.today().year, client_id)
+
+
+@router.get("/payroll", response_model=List[EmployeeMonthPayroll])
+def get_payroll(
+    year: int = Query(default=None, description="Defaults to the current year"),
+    employee_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_employee: Employee = Depends(require_role(UserRole.ADMIN, UserRole.FINANCE))
+):
+    """Regular and overtime pay per employee and month, from approved timesheets."""
+    return payroll_by_employee_month(db, year or date.today().year, employee_id)
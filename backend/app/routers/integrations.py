@@ -8,7 +8,6 @@ from sqlalchemy.orm import Session
 from typing import Optional
 import json
 from datetime import datetime
-from cryptography.fernet import Fernet
 import os
 import secrets
 from urllib.parse import urlencode
@@ -21,6 +20,7 @@ from app.schemas import (
     IntegrationConfigResponse, DriveFolderListResponse, DriveConfigUpdate
 )
 from app.auth import require_role, get_current_employee
+from app.services.config_secrets import encrypt_config, get_config_data, set_config_data
 
 router = APIRouter(prefix="/integrations", tags=["integrations"])
 
@@ -33,23 +33,6 @@ FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 # OAuth state storage (in production, use Redis or database)
 oauth_states = {}
 
-# Encryption key for sensitive config data (should be in environment variable)
-ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", Fernet.generate_key())
-cipher_suite = Fernet(ENCRYPTION_KEY)
-
-
-def encrypt_config(config_dict: dict) -> str:
-    """Encrypt configuration data"""
-    json_str = json.dumps(config_dict)
-    encrypted = cipher_suite.encrypt(json_str.encode())
-    return encrypted.decode()
-
-
-def decrypt_config(encrypted_str: str) -> dict:
-    """Decrypt configuration data"""
-    decrypted = cipher_suite.decrypt(encrypted_str.encode())
-    return json.loads(decrypted.decode())
-
 
 # Email Integration Endpoints
 @router.post("/email", response_model=EmailConfigResponse, status_code=status.HTTP_201_CREATED)
@@ -135,7 +118,7 @@ def update_email_config(
     
     # Decrypt existing data to merge updates
     try:
-        current_data = decrypt_config(existing.config_data)
+        current_data = get_config_data(existing)
     except:
         current_data = {}
 
@@ -149,7 +132,7 @@ def update_email_config(
     if config.password:
         current_data["password"] = config.password
 
-    existing.config_data = encrypt_config(current_data)
+    set_config_data(existing, current_data)
     
     if config.sync_interval_minutes is not None:
         existing.sync_interval_minutes = config.sync_interval_minutes
@@ -247,10 +230,7 @@ def update_drive_config(
         "oauth_credentials": config.oauth_credentials,
         "folder_id": config.folder_id
     }
-    encrypted_data = encrypt_config(config_data)
-    
-    existing.config_data = encrypted_data
-    existing.updated_at = datetime.utcnow()
+    set_config_data(existing, config_data)
     
     db.commit()
     db.refresh(existing)
@@ -279,7 +259,7 @@ def list_drive_folders(
         from googleapiclient.discovery import build
         
         # specific decrypt logic
-        data = decrypt_config(config.config_data)
+        data = get_config_data(config)
         
         # Check if we have valid tokens
         if 'access_token' not in data:
@@ -338,9 +318,9 @@ def update_drive_folder_config(
     # Decrypt, update, re-encrypt
     try:
         if config_update.folder_id:
-            data = decrypt_config(existing.config_data)
+            data = get_config_data(existing)
             data['folder_id'] = config_update.folder_id
-            existing.config_data = encrypt_config(data)
+            set_config_data(existing, data)
         
         if config_update.sync_interval_minutes is not None:
             existing.sync_interval_minutes = config_update.sync_interval_minutes
@@ -413,7 +393,7 @@ def test_integration(
     
     try:
         # Decrypt config
-        config_data = decrypt_config(config.config_data)
+        config_data = get_config_data(config)
         
         if integration_type == IntegrationType.EMAIL:
             # TODO: Implement actual IMAP connection test
@@ -564,7 +544,7 @@ def get_integration_status(
     email_info = None
     if email_config and email_config.is_active:
         try:
-            data = decrypt_config(email_config.config_data)
+            data = get_config_data(email_config)
             email_info = data.get("email")
         except:
             pass
@@ -572,7 +552,7 @@ def get_integration_status(
     drive_info = None
     if drive_config and drive_config.is_active:
         try:
-            data = decrypt_config(drive_config.config_data)
+            data = get_config_data(drive_config)
             drive_info = data.get("folder_id")
         except:
             pass
@@ -758,9 +738,8 @@ async def oauth_callback(
         ).first()
 
         if existing:
-            existing.config_data = encrypted_data
+            set_config_data(existing, config_data)
             existing.is_active = True
-            existing.updated_at = datetime.utcnow()
         else:
             integration = IntegrationConfig(
                 type=int_type,
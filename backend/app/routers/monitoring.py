@@ -6,11 +6,14 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models import Employee
+from app.models import Employee, UserRole
 from app.auth import require_role
 from app.services.email_service import run_email_monitoring
 from app.services.drive_service import run_drive_monitoring
 from app.services.scheduler import get_scheduler_status
+from app.services.timesheet_parser import process_pending_uploads
+from app.services.storage_tiering import run_storage_tiering
+from app.utils.metrics import metrics
 
 router = APIRouter(prefix="/monitoring", tags=["monitoring"])
 
@@ -53,6 +56,51 @@ def trigger_drive_monitoring(
         )
 
 
+@router.post("/parsing/run")
+def trigger_upload_parsing(
+    current_user: Employee = Depends(require_role(UserRole.ADMIN)),
+    db: Session = Depends(get_db)
+):
+    """
+    Manually parse pending timesheet uploads (Admin only).
+    Processes a single batch so the request returns promptly.
+    """
+    try:
+        return process_pending_uploads(db, max_batches=1)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error parsing uploads: {str(e)}"
+        )
+
+
+@router.post("/storage/archive")
+def trigger_storage_tiering(
+    current_user: Employee = Depends(require_role(UserRole.ADMIN)),
+    db: Session = Depends(get_db)
+):
+    """
+    Manually move old uploads to cold storage (Admin only).
+    """
+    try:
+        return run_storage_tiering(db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error archiving uploads: {str(e)}"
+        )
+
+
+@router.get("/metrics")
+def get_pipeline_metrics(
+    current_user: Employee = Depends(require_role(UserRole.ADMIN))
+):
+    """
+    Counters and per-stage timings for background pipelines (Admin only).
+    """
+    return metrics.snapshot()
+
+
 @router.get("/status")
 def get_monitoring_status(
     current_user: Employee = Depends(require_role(["admin"]))
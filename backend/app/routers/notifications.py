@@ -1,30 +1,60 @@
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 from app.database import get_db
 from app.models import Employee, UserRole, Notification, NotificationStatus
 from app.schemas import NotificationCreate, NotificationResponse
 from app.auth import require_role
+from app.services.notifications import RecipientSelector, bulk_create_notifications, resolve_recipients
+from app.services.outbox import channel_names, drain_outbox
+from app.services.reminders import create_overdue_reminders
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 
 class SendNotificationRequest(BaseModel):
     employee_id: int
+    channel: str = "email"
     notification_type: str = "timesheet_reminder"
     subject: str = "Timesheet Reminder"
     message: str = "Please submit your timesheet for the current period."
 
 
+class RecipientSelectorRequest(BaseModel):
+    """Active employees matching every given field; see RecipientSelector"""
+    client_id: Optional[int] = None
+    role: Optional[UserRole] = None
+    missing_timesheets: bool = False
+    start: Optional[date] = None
+    end: Optional[date] = None
+    submitted_only: bool = False
+
+
 class BulkNotificationRequest(BaseModel):
-    employee_ids: List[int]
+    employee_ids: List[int] = []
+    selector: Optional[RecipientSelectorRequest] = None
+    channel: str = "email"
     notification_type: str = "timesheet_reminder"
     subject: str = "Timesheet Reminder"
     message: str = "Please submit your timesheet for the current period."
 
+    @model_validator(mode="after")
+    def check_recipients(self):
+        if not self.employee_ids and self.selector is None:
+            raise ValueError("Either employee_ids or selector is required")
+        return self
+
+
+def check_channel(channel: str):
+    if channel not in channel_names():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown notification channel '{channel}'"
+        )
+
 
 @router.post("/send", response_model=NotificationResponse, status_code=status.HTTP_201_CREATED)
 def send_notification(
@@ -34,9 +64,9 @@ def send_notification(
 ):
     """
     Send a notification to an employee.
-    In a production system, this would trigger an email/SMS.
-    For now, it creates a notification record that can be processed by a background job.
+    The notification is queued in the outbox and delivered by the outbox workers.
     """
+    check_channel(notification_data.channel)
     employee = db.query(Employee).filter(Employee.id == notification_data.employee_id).first()
     if not employee:
         raise HTTPException(
@@ -46,6 +76,7 @@ def send_notification(
 
     notification = Notification(
         employee_id=notification_data.employee_id,
+        channel=notification_data.channel,
         notification_type=notification_data.notification_type,
         subject=notification_data.subject,
         message=notification_data.message,
@@ -56,12 +87,6 @@ def send_notification(
     db.commit()
     db.refresh(notification)
 
-    # In production, you would trigger an email service here
-    # For now, we just mark it as sent for demo purposes
-    # notification.status = NotificationStatus.SENT
-    # notification.sent_at = datetime.utcnow()
-    # db.commit()
-
     return notification
 
 
@@ -71,31 +96,36 @@ def send_bulk_notifications(
     db: Session = Depends(get_db),
     current_employee: Employee = Depends(require_role(UserRole.ADMIN, UserRole.MANAGER, UserRole.FINANCE))
 ):
-    """Send notifications to multiple employees at once."""
-    notifications = []
-
-    for employee_id in notification_data.employee_ids:
-        employee = db.query(Employee).filter(Employee.id == employee_id).first()
-        if not employee:
-            continue  # Skip invalid employee IDs
-
-        notification = Notification(
-            employee_id=employee_id,
-            notification_type=notification_data.notification_type,
-            subject=notification_data.subject,
-            message=notification_data.message,
-            status=NotificationStatus.PENDING
-        )
-
-        db.add(notification)
-        notifications.append(notification)
-
-    db.commit()
+    """
+    Send notifications to multiple employees at once.
+    Recipients are the given employee_ids plus everyone matched by selector,
+    e.g. all employees of a client with missing timesheets; unknown ids are skipped.
+    """
+    check_channel(notification_data.channel)
+    selector = None
+    if notification_data.selector is not None:
+        selector = RecipientSelector(**notification_data.selector.model_dump())
+
+    employee_ids = resolve_recipients(db, notification_data.employee_ids, selector)
+    return bulk_create_notifications(
+        db,
+        employee_ids,
+        notification_data.notification_type,
+        notification_data.subject,
+        notification_data.message,
+        notification_data.channel
+    )
 
-    for notification in notifications:
-        db.refresh(notification)
 
-    return notifications
+@router.post("/dispatch")
+def dispatch_notifications(
+    create_reminders: bool = True,
+    db: Session = Depends(get_db),
+    current_employee: Employee = Depends(require_role(UserRole.ADMIN))
+):
+    """Queue overdue timesheet reminders and deliver everything due in the outbox now."""
+    created = create_overdue_reminders(db) if create_reminders else 0
+    return {"created": created, **drain_outbox()}
 
 
 @router.get("/", response_model=List[NotificationResponse])
@@ -130,25 +160,3 @@ def get_notification(
             detail="Notification not found"
         )
     return notification
-
-
-@router.put("/{notification_id}/mark-sent", response_model=NotificationResponse)
-def mark_notification_sent(
-    notification_id: int,
-    db: Session = Depends(get_db),
-    current_employee: Employee = Depends(require_role(UserRole.ADMIN))
-):
-    """Mark a notification as sent (for manual/testing purposes)."""
-    notification = db.query(Notification).filter(Notification.id == notification_id).first()
-    if not notification:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notification not found"
-        )
-
-    notification.status = NotificationStatus.SENT
-    notification.sent_at = datetime.utcnow()
-    db.commit()
-    db.refresh(notification)
-
-    return notification
@@ -1,12 +1,20 @@
+import json
 from typing import List
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
-from app.database import get_db
-from app.models import Timesheet, TimesheetDetail, Employee, UserRole, TimesheetStatus, Client, Holiday
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import settings
+from app.database import get_async_read_db, get_db
+from app.models import Timesheet, TimesheetDetail, Employee, UserRole, TimesheetStatus, Client, BusinessCalendar
 from app.schemas import TimesheetCreate, TimesheetResponse, TimesheetUpdate
-from app.auth import get_current_employee, require_role
+from app.auth import get_current_employee, get_current_employee_async, require_role
+from app.services.period_calendar import client_calendar
+from app.services.events import publish_after_commit
+from app.services.packed_hours import pack_timesheet
+from app.utils.conditional import collection_version, compute_etag, etag_matches, not_modified, set_etag
 
 router = APIRouter(prefix="/timesheets", tags=["Timesheets"])
 
@@ -17,20 +25,27 @@ def calculate_timesheet_totals(timesheet: Timesheet, db: Session):
 
     timesheet.total_hours = total_hours
     timesheet.total_overtime = total_overtime
+    if settings.timesheet_packed_hours:
+        pack_timesheet(timesheet)
 
 
 def validate_and_flag_holidays(timesheet: Timesheet, db: Session):
-    client = db.query(Client).filter(Client.id == timesheet.client_id).first()
-    if not client or not client.calendar_id:
+    years = {detail.work_date.year for detail in timesheet.details}
+    if not years:
         return
 
-    for detail in timesheet.details:
-        holiday = db.query(Holiday).filter(
-            Holiday.calendar_id == client.calendar_id,
-            Holiday.date == detail.work_date
-        ).first()
+    calendars = db.query(BusinessCalendar).filter(
+        BusinessCalendar.client_id == timesheet.client_id,
+        BusinessCalendar.is_active == True,
+        BusinessCalendar.year.in_(years)
+    ).all()
 
-        if holiday:
+    non_working_dates = set()
+    for calendar in calendars:
+        non_working_dates.update(json.loads(calendar.non_working_dates or "[]"))
+
+    for detail in timesheet.details:
+        if detail.work_date.isoformat() in non_working_dates:
             detail.is_holiday = True
 
 
@@ -47,10 +62,17 @@ def create_timesheet(
             detail="Client not found"
         )
 
+    # One timesheet per pay period: anything overlapping the client's periods
+    # covering the submitted dates is a duplicate
+    periods = client_calendar(client).periods_in(timesheet_data.period_start, timesheet_data.period_end)
+    range_start = periods[0].start if periods else timesheet_data.period_start
+    range_end = periods[-1].end if periods else timesheet_data.period_end
+
     existing_timesheet = db.query(Timesheet).filter(
         Timesheet.employee_id == current_employee.id,
-        Timesheet.period_start == timesheet_data.period_start,
-        Timesheet.period_end == timesheet_data.period_end
+        Timesheet.client_id == client.id,
+        Timesheet.period_start <= range_end,
+        Timesheet.period_end >= range_start
     ).first()
 
     if existing_timesheet:
@@ -90,36 +112,51 @@ def create_timesheet(
 
 
 @router.get("/", response_model=List[TimesheetResponse])
-def get_timesheets(
+async def get_timesheets(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: TimesheetStatus = None,
-    db: Session = Depends(get_db),
-    current_employee: Employee = Depends(get_current_employee)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_employee: Employee = Depends(get_current_employee_async)
 ):
-    query = db.query(Timesheet)
-
+    criteria = []
+    scope = current_employee.role.value
     if current_employee.role == UserRole.EMPLOYEE:
-        query = query.filter(Timesheet.employee_id == current_employee.id)
+        criteria.append(Timesheet.employee_id == current_employee.id)
+        scope = current_employee.id
     elif current_employee.role == UserRole.MANAGER:
-        subordinate_ids = [emp.id for emp in current_employee.subordinates]
-        subordinate_ids.append(current_employee.id)
-        query = query.filter(Timesheet.employee_id.in_(subordinate_ids))
+        subordinate_ids = select(Employee.id).filter(Employee.manager_id == current_employee.id)
+        criteria.append(
+            (Timesheet.employee_id == current_employee.id) | Timesheet.employee_id.in_(subordinate_ids)
+        )
+        scope = current_employee.id
 
     if status:
-        query = query.filter(Timesheet.status == status)
+        criteria.append(Timesheet.status == status)
 
-    timesheets = query.offset(skip).limit(limit).all()
+    # Details are only written together with their timesheet, so the timesheet rows version them too
+    version = (await db.execute(collection_version((Timesheet, *criteria)))).one()
+    etag = compute_etag(scope, {"skip": skip, "limit": limit, "status": status}, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    query = select(Timesheet).options(selectinload(Timesheet.details)).filter(*criteria)
+    timesheets = (await db.scalars(query.order_by(Timesheet.id).offset(skip).limit(limit))).all()
     return timesheets
 
 
 @router.get("/{timesheet_id}", response_model=TimesheetResponse)
-def get_timesheet(
+async def get_timesheet(
     timesheet_id: int,
-    db: Session = Depends(get_db),
-    current_employee: Employee = Depends(get_current_employee)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_employee: Employee = Depends(get_current_employee_async)
 ):
-    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).first()
+    timesheet = await db.scalar(
+        select(Timesheet).options(selectinload(Timesheet.details)).filter(Timesheet.id == timesheet_id)
+    )
     if not timesheet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -232,6 +269,10 @@ def submit_timesheet(
 
     timesheet.status = TimesheetStatus.SUBMITTED
     timesheet.submission_date = datetime.utcnow()
+    publish_after_commit(db, "timesheets", "timesheet.submitted", {
+        "id": timesheet.id, "employee_id": timesheet.employee_id,
+        "client_id": timesheet.client_id, "status": timesheet.status.value
+    })
 
     db.commit()
     db.refresh(timesheet)
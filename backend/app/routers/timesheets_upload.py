@@ -2,23 +2,91 @@
 API router for timesheet upload operations.
 Handles manual file uploads, listing uploads, and managing upload records.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import BinaryIO, Iterator, List, Optional
+from pathlib import Path
+from urllib.parse import quote
 import json
 from datetime import datetime
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, get_read_db
 from app.models import TimesheetUpload, Employee, UploadSource, UploadStatus, UserRole
-from app.schemas import TimesheetUploadResponse
-from app.auth import get_current_employee, require_role
-from app.services.file_storage import save_uploaded_file, validate_file_format, delete_file
+from app.schemas import TimesheetUploadResponse, TimesheetUploadBatchResponse
+from app.auth import get_current_employee, require_role, require_role_or_ticket
+from app.services.file_storage import (
+    CHUNK_SIZE, get_file_path, validate_file_format, iter_upload_chunks, matches_file_format,
+    FileTooLargeError, FileContentMismatchError
+)
+from app.services.blob_store import ingest_upload, delete_upload_file, remove_unreferenced_file
+from app.services.batch_upload import ingest_batch
+from app.services.events import publish_upload_event
+from app.services.previews import PREVIEW_SIZES, PreviewUnavailableError, get_preview_service
+from app.services.storage_tiering import open_stored_file
+from app.services.upload_stats import get_upload_stats as get_cached_upload_stats, invalidate_upload_stats
+from app.utils.conditional import etag_matches
 
 router = APIRouter(prefix="/timesheets/uploads", tags=["timesheet_uploads"])
 
+# Allowance for multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def upload_body_limits() -> dict:
+    """Request body limits for BodySizeLimitMiddleware, by upload path"""
+    return {
+        "/timesheets/uploads/": settings.max_upload_size_mb * 1024 * 1024 + MULTIPART_OVERHEAD,
+        "/timesheets/uploads/batch": settings.max_batch_upload_mb * 1024 * 1024 + MULTIPART_OVERHEAD,
+    }
+
+
+def upload_sniff_fields() -> dict:
+    """File fields MultipartSniffMiddleware inspects, by upload path"""
+    return {"/timesheets/uploads/": "file"}
+
+
+def check_upload_head(filename: str, head: bytes) -> Optional[str]:
+    """
+    Magic-byte check on the first bytes of an upload as they stream in.
+    Unsupported extensions and empty files are left to the endpoint's own errors.
+    """
+    is_valid, file_format = validate_file_format(filename)
+    if not is_valid or not head or matches_file_format(head, file_format):
+        return None
+    return f"File content is not a valid {file_format.upper()}"
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "jpg": "image/jpeg",
+    "csv": "text/csv"
+}
+
+# Upload content never changes, so browsers may reuse it for a day without asking
+CONTENT_CACHE_CONTROL = "private, max-age=86400"
+
+# Previews are derived from immutable content and keyed by hash in their ETag
+PREVIEW_CACHE_CONTROL = "private, max-age=604800, immutable"
+
+
+def iter_stream(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a binary stream in chunks, closing it when done"""
+    with stream:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            yield chunk
+
+
+def inline_disposition(filename: str) -> str:
+    """Content-Disposition for showing a file in the browser, as FileResponse builds it"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"inline; filename*=utf-8''{quoted}"
+    return f'inline; filename="{filename}"'
+
 
 @router.post("/", response_model=TimesheetUploadResponse, status_code=status.HTTP_201_CREATED)
-async def upload_timesheet(
+def upload_timesheet(
     file: UploadFile = File(...),
     employee_id: int = Form(...),
     current_user: Employee = Depends(require_role(UserRole.ADMIN)),
@@ -28,7 +96,15 @@ async def upload_timesheet(
     Upload a timesheet file manually (Admin only).
     Requires employee_id to map the timesheet to an employee.
     Supports PDF, JPG, CSV formats.
+    
+    Oversized request bodies are rejected by BodySizeLimitMiddleware, and
+    files whose first bytes don't match their extension by
+    MultipartSniffMiddleware, while they are still arriving. Runs in the threadpool: the file is streamed to
+    storage in chunks while being hashed and size-checked, so it is never
+    held in memory whole.
     """
+    max_size = settings.max_upload_size_mb * 1024 * 1024
+    
     # Validate employee exists
     employee = db.query(Employee).filter(Employee.id == employee_id).first()
     if not employee:
@@ -46,38 +122,35 @@ async def upload_timesheet(
         )
     
     try:
-        # Read file content
-        file_content = await file.read()
-        
-        # Save file to storage
-        file_path, unique_filename = save_uploaded_file(
-            file_content=file_content,
-            original_filename=file.filename,
-            employee_id=employee_id
-        )
-        
-        # Create upload record
-        upload = TimesheetUpload(
+        # Stream file to storage; identical content from the same employee reuses the existing upload
+        upload, created = ingest_upload(
+            db,
             employee_id=employee_id,
-            file_path=file_path,
-            file_name=unique_filename,
+            original_filename=file.filename,
+            chunks=iter_upload_chunks(file.file, file_format, max_size=max_size),
             file_format=file_format,
             source=UploadSource.MANUAL,
-            status=UploadStatus.PENDING,
             uploaded_by=current_user.id,
-            upload_metadata=json.dumps({
-                "original_filename": file.filename,
-                "file_size": len(file_content),
-                "uploaded_at": datetime.utcnow().isoformat()
-            })
+            metadata={"uploaded_at": datetime.utcnow().isoformat()}
         )
         
-        db.add(upload)
         db.commit()
         db.refresh(upload)
         
         return upload
-        
+    
+    except FileTooLargeError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except FileContentMismatchError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -86,6 +159,75 @@ async def upload_timesheet(
         )
 
 
+@router.post("/batch", response_model=TimesheetUploadBatchResponse, status_code=status.HTTP_201_CREATED)
+def upload_timesheet_batch(
+    files: List[UploadFile] = File(...),
+    manifest: Optional[str] = Form(None),
+    employee_id: Optional[int] = Form(None),
+    current_user: Employee = Depends(require_role(UserRole.ADMIN)),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload many timesheet files in one request (Admin only).
+    Accepts any mix of PDF, JPG, CSV and zip archives of those formats.
+    
+    Each file is mapped to an employee by, in order:
+    - manifest: JSON object of filename (or path inside the zip) to employee email or ID
+    - employee_id: applies to every file in the batch
+    - the top-level folder inside a zip, e.g. jane@acme.com/week1.pdf
+    - a filename prefix, e.g. jane@acme.com__week1.pdf or 42__week1.pdf
+    
+    All uploads are committed in a single transaction. Files that can't be
+    mapped or validated are reported per item without failing the batch.
+    """
+    manifest_map = {}
+    if manifest:
+        try:
+            manifest_map = json.loads(manifest)
+        except ValueError:
+            manifest_map = None
+        if not isinstance(manifest_map, dict):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="manifest must be a JSON object mapping filenames to employee emails or IDs"
+            )
+    
+    try:
+        results = ingest_batch(
+            db,
+            files=[(file.filename, file.file) for file in files],
+            uploaded_by=current_user.id,
+            manifest=manifest_map,
+            default_employee_id=employee_id,
+            max_entries=settings.max_batch_files,
+            max_size=settings.max_upload_size_mb * 1024 * 1024
+        )
+        db.commit()
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error uploading batch: {str(e)}"
+        )
+    
+    created = sum(1 for item in results if item["created"])
+    failed = sum(1 for item in results if item["error"])
+    
+    return {
+        "total": len(results),
+        "created": created,
+        "duplicates": len(results) - created - failed,
+        "failed": failed,
+        "items": results
+    }
+
+
 @router.get("/", response_model=List[TimesheetUploadResponse])
 def list_uploads(
     employee_id: Optional[int] = None,
@@ -94,7 +236,7 @@ def list_uploads(
     skip: int = 0,
     limit: int = 100,
     current_user: Employee = Depends(require_role(UserRole.ADMIN, UserRole.MANAGER)),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     List all uploaded timesheets with optional filters.
@@ -124,7 +266,7 @@ def list_uploads(
 def get_upload(
     upload_id: int,
     current_user: Employee = Depends(require_role(UserRole.ADMIN, UserRole.MANAGER)),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get details of a specific upload.
@@ -140,6 +282,113 @@ def get_upload(
     return upload
 
 
+@router.get("/{upload_id}/content")
+def get_upload_content(
+    upload_id: int,
+    request: Request,
+    current_user: Employee = Depends(require_role_or_ticket(UserRole.ADMIN, UserRole.MANAGER)),
+    db: Session = Depends(get_db)
+):
+    """
+    Download the stored file of an upload.
+    Browsers opening it directly authenticate with ?ticket= from POST /auth/ticket.
+    Answers conditional requests matching the content hash ETag with 304
+    Not Modified. Files in hot storage support Range requests; archived
+    files are streamed whole from cold storage without being restored.
+    """
+    upload = db.query(TimesheetUpload).filter(TimesheetUpload.id == upload_id).first()
+    
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload with ID {upload_id} not found"
+        )
+    
+    headers = {"Cache-Control": CONTENT_CACHE_CONTROL}
+    if upload.content_hash:
+        headers["ETag"] = f'"{upload.content_hash}"'
+        if etag_matches(request, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    metadata = json.loads(upload.upload_metadata) if upload.upload_metadata else {}
+    filename = metadata.get("original_filename", upload.file_name)
+    media_type = MEDIA_TYPES.get(upload.file_format, "application/octet-stream")
+    
+    file_path = Path(upload.file_path)
+    if file_path.is_file():
+        # FileResponse streams from disk (zero-copy where the server supports it) and handles Range/If-Range
+        return FileResponse(
+            file_path,
+            media_type=media_type,
+            filename=filename,
+            content_disposition_type="inline",
+            headers=headers
+        )
+    
+    # Cold blobs are decompressed from their pack as they are sent, without restoring
+    # them to disk; Range is not supported on this path, so the full body is returned
+    stream = open_stored_file(upload.file_path, db)
+    if stream is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"File for upload {upload_id} is missing from storage"
+        )
+    
+    headers["Content-Disposition"] = inline_disposition(filename)
+    if upload.file_size:
+        headers["Content-Length"] = str(upload.file_size)
+    return StreamingResponse(iter_stream(stream), media_type=media_type, headers=headers)
+
+
+@router.get("/{upload_id}/preview")
+def get_upload_preview(
+    upload_id: int,
+    request: Request,
+    size: str = Query("thumb", pattern=f"^({'|'.join(PREVIEW_SIZES)})$"),
+    current_user: Employee = Depends(require_role(UserRole.ADMIN, UserRole.MANAGER)),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a downscaled JPEG of an uploaded image or the first page of a PDF.
+    size is 'thumb' for list views or 'preview' for a larger view.
+    Previews are rendered on first request and cached by content hash.
+    """
+    upload = db.query(TimesheetUpload).filter(TimesheetUpload.id == upload_id).first()
+    
+    if not upload or not upload.content_hash:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload with ID {upload_id} not found"
+        )
+    
+    headers = {
+        "Cache-Control": PREVIEW_CACHE_CONTROL,
+        "ETag": f'"{upload.content_hash}-{size}"'
+    }
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    service = get_preview_service()
+    preview_path = service.cache.get(upload.content_hash, size)
+    
+    if not preview_path:
+        file_path = get_file_path(upload.file_path, db)
+        if not file_path:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"File for upload {upload_id} is missing from storage"
+            )
+        try:
+            preview_path = service.get_preview(upload.content_hash, str(file_path), upload.file_format, size)
+        except PreviewUnavailableError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e)
+            )
+    
+    return FileResponse(preview_path, media_type="image/jpeg", headers=headers)
+
+
 @router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_upload(
     upload_id: int,
@@ -159,12 +408,17 @@ def delete_upload(
         )
     
     try:
-        # Delete file from storage
-        delete_file(upload.file_path)
+        # Drop this upload's reference to the stored file
+        orphaned_path = delete_upload_file(db, upload)
         
         # Delete database record
+        publish_upload_event(db, upload, "upload.deleted")
         db.delete(upload)
         db.commit()
+        invalidate_upload_stats()
+        
+        # Legacy uploads own their file; blobs are left to the sweeper
+        remove_unreferenced_file(orphaned_path)
         
     except Exception as e:
         db.rollback()
@@ -177,37 +431,10 @@ def delete_upload(
 @router.get("/stats/summary")
 def get_upload_stats(
     current_user: Employee = Depends(require_role(UserRole.ADMIN, UserRole.MANAGER)),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get statistics about uploaded timesheets.
-    Returns counts by source and status.
+    Returns counts by source and status, cached for a few seconds.
     """
-    # Total uploads
-    total = db.query(TimesheetUpload).count()
-    
-    # By source
-    manual_count = db.query(TimesheetUpload).filter(TimesheetUpload.source == UploadSource.MANUAL).count()
-    email_count = db.query(TimesheetUpload).filter(TimesheetUpload.source == UploadSource.EMAIL).count()
-    drive_count = db.query(TimesheetUpload).filter(TimesheetUpload.source == UploadSource.DRIVE).count()
-    
-    # By status
-    pending_count = db.query(TimesheetUpload).filter(TimesheetUpload.status == UploadStatus.PENDING).count()
-    processing_count = db.query(TimesheetUpload).filter(TimesheetUpload.status == UploadStatus.PROCESSING).count()
-    analyzed_count = db.query(TimesheetUpload).filter(TimesheetUpload.status == UploadStatus.ANALYZED).count()
-    failed_count = db.query(TimesheetUpload).filter(TimesheetUpload.status == UploadStatus.FAILED).count()
-    
-    return {
-        "total": total,
-        "by_source": {
-            "manual": manual_count,
-            "email": email_count,
-            "drive": drive_count
-        },
-        "by_status": {
-            "pending": pending_count,
-            "processing": processing_count,
-            "analyzed": analyzed_count,
-            "failed": failed_count
-        }
-    }
+    return get_cached_upload_stats(db)
@@ -165,7 +165,7 @@ def get_webhook_status(
     Get status of all webhook services (Admin only).
     """
     from app.models import IntegrationConfig, IntegrationType
-    from app.services.drive_webhook import decrypt_config
+    from app.services.config_secrets import get_config_data
     
     # Check Drive webhook
     drive_config = db.query(IntegrationConfig).filter(
@@ -177,7 +177,7 @@ def get_webhook_status(
     
     if drive_config:
         try:
-            config_data = decrypt_config(drive_config.config_data)
+            config_data = get_config_data(drive_config)
             webhook_info = config_data.get('webhook')
             if webhook_info:
                 drive_webhook_active = True
@@ -1,10 +1,15 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.database import SessionLocal
 from app.models import IntegrationType, IntegrationConfig
 from app.services.email_service import EmailMonitoringService
 from app.services.drive_service import DriveMonitoringService
+from app.services.timesheet_parser import process_pending_uploads
+from app.services.storage_tiering import run_storage_tiering
+from app.services.outbox import drain_outbox
+from app.services.reminders import create_overdue_reminders
 import logging
 
 logger = logging.getLogger(__name__)
@@ -44,8 +49,55 @@ def sync_drive_job():
     finally:
         db.close()
 
+def parse_uploads_job():
+    """Scheduled job to parse pending timesheet uploads"""
+    db = SessionLocal()
+    try:
+        result = process_pending_uploads(db)
+        if result["claimed"]:
+            logger.info(f"Upload parsing completed: {result}")
+    except Exception as e:
+        logger.error(f"Upload parsing failed: {str(e)}")
+    finally:
+        db.close()
+
+def storage_tiering_job():
+    """Scheduled job to move old uploads to cold storage"""
+    db = SessionLocal()
+    try:
+        result = run_storage_tiering(db)
+        logger.info(f"Storage tiering completed: {result}")
+    except Exception as e:
+        logger.error(f"Storage tiering failed: {str(e)}")
+    finally:
+        db.close()
+
+def reminders_job():
+    """Scheduled job to queue reminders for overdue timesheets"""
+    db = SessionLocal()
+    try:
+        created = create_overdue_reminders(db)
+        if created:
+            logger.info(f"Queued {created} timesheet reminders")
+    except Exception as e:
+        logger.error(f"Reminders failed: {str(e)}")
+    finally:
+        db.close()
+
+def notification_outbox_job():
+    """Scheduled job to deliver due notifications from the outbox"""
+    try:
+        result = drain_outbox()
+        if result["claimed"]:
+            logger.info(f"Notification delivery completed: {result}")
+    except Exception as e:
+        logger.error(f"Notification delivery failed: {str(e)}")
+
 def start_scheduler():
     """Initialize and start the scheduler with jobs from config"""
+    if not settings.scheduler_enabled or scheduler.running:
+        return
+
     # In a real app, we might load intervals from DB dynamically. 
     # For now, we set a default or just use the DB value during the job execution?
     # Actually, better to simply schedule them to run every X minutes and let the job logic check if it should proceed?
@@ -66,10 +118,57 @@ def start_scheduler():
         name='Check if sync is needed',
         replace_existing=True
     )
+
+    scheduler.add_job(
+        parse_uploads_job,
+        trigger=IntervalTrigger(minutes=1),
+        id='parse_uploads',
+        name='Parse pending timesheet uploads',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+
+    scheduler.add_job(
+        storage_tiering_job,
+        trigger=IntervalTrigger(hours=24),
+        id='storage_tiering',
+        name='Archive old timesheet uploads',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
     
+    if settings.reminders_enabled:
+        scheduler.add_job(
+            reminders_job,
+            trigger=IntervalTrigger(minutes=5),
+            id='reminders',
+            name='Queue overdue timesheet reminders',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+    if settings.notification_scheduler_delivery:
+        scheduler.add_job(
+            notification_outbox_job,
+            trigger=IntervalTrigger(minutes=1),
+            id='notification_outbox',
+            name='Deliver pending notifications',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
     scheduler.start()
     logger.info("Scheduler started.")
 
+def shutdown_scheduler():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+        logger.info("Scheduler stopped.")
+
 def check_and_run_syncs():
     """Check DB config and run sync if interval has passed"""
     db = SessionLocal()
@@ -13,6 +13,11 @@ class Token(BaseModel):
     token_type: str = "bearer"
 
 
+class UrlTicket(BaseModel):
+    ticket: str
+    expires_in: int
+
+
 class TokenData(BaseModel):
     email: Optional[str] = None
 
@@ -334,6 +339,10 @@ class NotificationResponse(NotificationBase):
     status: NotificationStatus
     sent_at: Optional[datetime] = None
     created_at: datetime
+    channel: str = "email"
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -392,6 +401,8 @@ class TimesheetUploadResponse(BaseModel):
     file_path: str
     file_name: str
     file_format: str
+    content_hash: Optional[str] = None
+    file_size: Optional[int] = None
     source: UploadSource
     status: UploadStatus
     uploaded_by: Optional[int] = None
@@ -404,6 +415,22 @@ class TimesheetUploadResponse(BaseModel):
         from_attributes = True
 
 
+class TimesheetUploadBatchItem(BaseModel):
+    file_name: str
+    archive: Optional[str] = None  # Zip the file was extracted from
+    created: bool = False  # False for duplicates and failures
+    error: Optional[str] = None
+    upload: Optional[TimesheetUploadResponse] = None
+
+
+class TimesheetUploadBatchResponse(BaseModel):
+    total: int
+    created: int
+    duplicates: int
+    failed: int
+    items: List[TimesheetUploadBatchItem]
+
+
 # Integration Config Schemas
 class EmailConfigCreate(BaseModel):
     imap_server: str
@@ -0,0 +1,261 @@
+"""
+Per-period billing and payroll aggregates.
+timesheet_period_totals holds one row per (employee, client, period) of
+approved timesheets with hours, rates and amounts. The database groups the
+approved timesheets and resolves current rates; the groups are then priced
+together as numpy arrays:
+
+    regular_pay     = regular_hours * pay_rate
+    overtime_pay    = overtime_hours * pay_rate * overtime_multiplier
+    billable_amount = (regular_hours + overtime_hours * overtime_multiplier) * bill_rate
+
+Rates are frozen when a period is first approved: later refreshes of that
+period (another approval, a rejection) keep the rates stored on its row, and
+rate changes never touch approved periods. Only a rate that was unknown at
+approval is filled in from current settings. Repricing history at today's
+rates is an explicit backfill:
+
+    python -m app.services.aggregates --reprice [--client-id N] [--employee-id N]
+
+Without --reprice the same command rebuilds hours and fills missing rows,
+e.g. after deploying the table.
+"""
+import argparse
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import delete, extract, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import Client, Employee, Timesheet, TimesheetPeriodTotal, TimesheetStatus
+from app.services.exports import DEFAULT_OVERTIME_MULTIPLIER, assignment_pay_rate
+
+
+KEY_COLUMNS = ["employee_id", "client_id", "period_start", "period_end"]
+RATE_COLUMNS = ["pay_rate", "bill_rate", "overtime_multiplier"]
+
+
+def _scope(model, employee_id, client_id, period_start, period_end) -> list:
+    criteria = []
+    if employee_id is not None:
+        criteria.append(model.employee_id == employee_id)
+    if client_id is not None:
+        criteria.append(model.client_id == client_id)
+    if period_start is not None:
+        criteria.append(model.period_start == period_start)
+    if period_end is not None:
+        criteria.append(model.period_end == period_end)
+    return criteria
+
+
+def period_groups_select(*criteria):
+    """Approved timesheets grouped per (employee, client, period) with hours and current rates"""
+    total_hours = func.sum(func.coalesce(Timesheet.total_hours, 0.0))
+    overtime_hours = func.sum(func.coalesce(Timesheet.total_overtime, 0.0))
+    return (
+        select(
+            Timesheet.employee_id,
+            Timesheet.client_id,
+            Timesheet.period_start,
+            Timesheet.period_end,
+            func.count(Timesheet.id).label("timesheets"),
+            (total_hours - overtime_hours).label("regular_hours"),
+            overtime_hours.label("overtime_hours"),
+            func.coalesce(assignment_pay_rate(), Employee.pay_rate).label("pay_rate"),
+            Client.bill_rate,
+            func.coalesce(Client.overtime_multiplier, DEFAULT_OVERTIME_MULTIPLIER).label("overtime_multiplier")
+        )
+        .join(Employee, Employee.id == Timesheet.employee_id)
+        .join(Client, Client.id == Timesheet.client_id)
+        .where(Timesheet.status == TimesheetStatus.APPROVED, *criteria)
+        .group_by(
+            Timesheet.employee_id, Timesheet.client_id, Timesheet.period_start, Timesheet.period_end,
+            Employee.pay_rate, Client.bill_rate, Client.overtime_multiplier
+        )
+    )
+
+
+def price_periods(rows: List[dict]):
+    """
+    Set regular_pay, overtime_pay and billable_amount on grouped rows, priced
+    together as arrays. A rate that isn't set leaves the amounts it prices NULL.
+    """
+    # numpy loads on first use, keeping it off the startup path
+    import numpy as np
+
+    def column(name):
+        return np.array([np.nan if row[name] is None else row[name] for row in rows], dtype=np.float64)
+
+    regular_hours, overtime_hours = column("regular_hours"), column("overtime_hours")
+    pay_rate, bill_rate, overtime_multiplier = (column(name) for name in RATE_COLUMNS)
+    amounts = {
+        "regular_pay": regular_hours * pay_rate,
+        "overtime_pay": overtime_hours * pay_rate * overtime_multiplier,
+        "billable_amount": (regular_hours + overtime_hours * overtime_multiplier) * bill_rate,
+    }
+    for name, values in amounts.items():
+        for row, amount in zip(rows, np.round(values, 2).tolist()):
+            row[name] = None if np.isnan(amount) else amount
+
+
+def refresh_period_totals(
+    db: Session,
+    employee_id: Optional[int] = None,
+    client_id: Optional[int] = None,
+    period_start: Optional[date] = None,
+    period_end: Optional[date] = None,
+    reprice: bool = False
+) -> int:
+    """
+    Recompute the totals matching every given filter; no filters rebuilds the table.
+    Periods that already have a row keep its rates unless reprice is set.
+    Runs in db's transaction without committing.
+
+    Returns:
+        int: Number of (employee, client, period) rows written
+    """
+    scope = (employee_id, client_id, period_start, period_end)
+    frozen = {} if reprice else {
+        tuple(row[:4]): row[4:] for row in db.execute(
+            select(*(getattr(TimesheetPeriodTotal, name) for name in KEY_COLUMNS + RATE_COLUMNS))
+            .where(*_scope(TimesheetPeriodTotal, *scope))
+        )
+    }
+    groups = db.execute(period_groups_select(*_scope(Timesheet, *scope))).mappings().all()
+    db.execute(delete(TimesheetPeriodTotal).where(*_scope(TimesheetPeriodTotal, *scope)))
+    if not groups:
+        return 0
+
+    rows = [dict(group) for group in groups]
+    for row in rows:
+        stored = frozen.get(tuple(row[name] for name in KEY_COLUMNS))
+        if stored is not None:
+            for name, rate in zip(RATE_COLUMNS, stored):
+                if rate is not None:
+                    row[name] = rate
+
+    price_periods(rows)
+    db.execute(insert(TimesheetPeriodTotal), rows)
+    return len(rows)
+
+
+def refresh_timesheet_totals(db: Session, timesheet: Timesheet) -> int:
+    """Recompute the period a timesheet belongs to, after its status changed"""
+    db.flush()
+    return refresh_period_totals(
+        db, timesheet.employee_id, timesheet.client_id, timesheet.period_start, timesheet.period_end
+    )
+
+
+def _month():
+    return extract("month", TimesheetPeriodTotal.period_start)
+
+
+def revenue_by_client_month(db: Session, year: int, client_id: Optional[int] = None) -> List[dict]:
+    """
+    Billable amount and payroll cost per client and month of period start.
+
+    Returns:
+        list: dicts ordered by client name and month
+    """
+    month = _month().label("month")
+    pay = func.coalesce(TimesheetPeriodTotal.regular_pay, 0.0) + func.coalesce(TimesheetPeriodTotal.overtime_pay, 0.0)
+    query = (
+        select(
+            Client.id, Client.name, month,
+            func.sum(TimesheetPeriodTotal.regular_hours),
+            func.sum(TimesheetPeriodTotal.overtime_hours),
+            func.sum(func.coalesce(TimesheetPeriodTotal.billable_amount, 0.0)),
+            func.sum(pay)
+        )
+        .join(Client, Client.id == TimesheetPeriodTotal.client_id)
+        .where(
+            TimesheetPeriodTotal.period_start >= date(year, 1, 1),
+            TimesheetPeriodTotal.period_start <= date(year, 12, 31)
+        )
+        .group_by(Client.id, Client.name, month)
+        .order_by(Client.name, month)
+    )
+    if client_id is not None:
+        query = query.where(TimesheetPeriodTotal.client_id == client_id)
+
+    return [
+        {
+            "client_id": row_client_id,
+            "client_name": name,
+            "month": int(row_month),
+            "regular_hours": round(regular_hours, 2),
+            "overtime_hours": round(overtime_hours, 2),
+            "revenue": round(revenue, 2),
+            "payroll_cost": round(cost, 2),
+            "margin": round(revenue - cost, 2)
+        }
+        for row_client_id, name, row_month, regular_hours, overtime_hours, revenue, cost in db.execute(query)
+    ]
+
+
+def payroll_by_employee_month(db: Session, year: int, employee_id: Optional[int] = None) -> List[dict]:
+    """
+    Regular and overtime pay per employee and month of period start.
+
+    Returns:
+        list: dicts ordered by employee name and month
+    """
+    month = _month().label("month")
+    query = (
+        select(
+            Employee.id, Employee.first_name, Employee.last_name, month,
+            func.sum(TimesheetPeriodTotal.regular_hours),
+            func.sum(TimesheetPeriodTotal.overtime_hours),
+            func.sum(func.coalesce(TimesheetPeriodTotal.regular_pay, 0.0)),
+            func.sum(func.coalesce(TimesheetPeriodTotal.overtime_pay, 0.0))
+        )
+        .join(Employee, Employee.id == TimesheetPeriodTotal.employee_id)
+        .where(
+            TimesheetPeriodTotal.period_start >= date(year, 1, 1),
+            TimesheetPeriodTotal.period_start <= date(year, 12, 31)
+        )
+        .group_by(Employee.id, Employee.first_name, Employee.last_name, month)
+        .order_by(Employee.last_name, Employee.first_name, month)
+    )
+    if employee_id is not None:
+        query = query.where(TimesheetPeriodTotal.employee_id == employee_id)
+
+    return [
+        {
+            "employee_id": row_employee_id,
+            "employee_name": f"{first_name} {last_name}",
+            "month": int(row_month),
+            "regular_hours": round(regular_hours, 2),
+            "overtime_hours": round(overtime_hours, 2),
+            "regular_pay": round(regular_pay, 2),
+            "overtime_pay": round(overtime_pay, 2),
+            "total_pay": round(regular_pay + overtime_pay, 2)
+        }
+        for row_employee_id, first_name, last_name, row_month, regular_hours, overtime_hours, regular_pay, overtime_pay
+        in db.execute(query)
+    ]
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild per-period billing and payroll totals")
+    parser.add_argument("--client-id", type=int)
+    parser.add_argument("--employee-id", type=int)
+    parser.add_argument("--reprice", action="store_true", help="Price approved periods at current rates")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        written = refresh_period_totals(
+            db, employee_id=args.employee_id, client_id=args.client_id, reprice=args.reprice
+        )
+        db.commit()
+        print(f"{'Repriced' if args.reprice else 'Rebuilt'} {written} period totals")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
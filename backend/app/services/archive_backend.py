@@ -0,0 +1,114 @@
+"""
+Archive backends for cold timesheet storage.
+A backend stores immutable pack files by key and serves byte ranges from them.
+LocalDirectoryArchive keeps packs on disk and stands in for object storage;
+other backends are plugged in with ARCHIVE_BACKEND=package.module:ClassName.
+"""
+import importlib
+import io
+import os
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from app.config import settings
+
+
+class ArchiveBackend(ABC):
+    """Interface for pack storage. Keys look like '2026-01/pack-<id>.pack'."""
+
+    @abstractmethod
+    def put(self, key: str, source_path: str):
+        """Store the file at source_path under key, replacing any existing object"""
+
+    @abstractmethod
+    def open_range(self, key: str, offset: int, length: int) -> BinaryIO:
+        """Readable stream over length bytes of key starting at offset"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove key if it exists"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether an object is stored under key"""
+
+
+class _RangeReader(io.RawIOBase):
+    """Read-only view of a byte range of an open file"""
+
+    def __init__(self, f: BinaryIO, offset: int, length: int):
+        self._file = f
+        self._file.seek(offset)
+        self._remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:self._remaining]
+        count = self._file.readinto(view)
+        self._remaining -= count
+        return count
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+class LocalDirectoryArchive(ArchiveBackend):
+    """Packs stored as files under a root directory"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Invalid archive key '{key}'")
+        return path
+
+    def put(self, key: str, source_path: str):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".partial")
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, path)
+
+    def open_range(self, key: str, offset: int, length: int) -> BinaryIO:
+        return io.BufferedReader(_RangeReader(open(self._path(key), "rb"), offset, length))
+
+    def delete(self, key: str):
+        path = self._path(key)
+        if path.exists():
+            path.unlink()
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+
+_backend: Optional[ArchiveBackend] = None
+
+
+def get_archive_backend() -> ArchiveBackend:
+    """
+    Configured archive backend, created on first use.
+    ARCHIVE_BACKEND names a class taking no arguments; otherwise packs go to ARCHIVE_DIR.
+    """
+    global _backend
+    if _backend is None:
+        if settings.archive_backend:
+            module_name, _, class_name = settings.archive_backend.partition(":")
+            _backend = getattr(importlib.import_module(module_name), class_name)()
+        else:
+            _backend = LocalDirectoryArchive(settings.archive_dir)
+    return _backend
+
+
+def set_archive_backend(backend: Optional[ArchiveBackend]):
+    """Replace the active backend (None resets to the configured one)"""
+    global _backend
+    _backend = backend
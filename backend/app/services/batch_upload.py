@@ -0,0 +1,205 @@
+"""
+Batch ingestion of timesheet files.
+Expands multi-file and zip uploads, maps each file to an employee and
+registers all uploads in a single transaction.
+"""
+import zipfile
+from pathlib import PurePosixPath
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.models import Employee, UploadSource
+from app.services.blob_store import PendingUpload, register_uploads
+from app.services.file_storage import validate_file_format, iter_upload_chunks, write_blob
+
+
+# Separator between the employee key and the rest of a filename, e.g. jane@acme.com__week1.pdf
+FILENAME_KEY_SEPARATOR = "__"
+
+
+class BatchEntry:
+    """A single file inside a batch, either a plain upload or a zip member"""
+
+    def __init__(self, name: str, open_stream: Callable[[], BinaryIO], archive: Optional[str] = None):
+        self.name = name
+        self.open_stream = open_stream
+        self.archive = archive
+
+
+def expand_entries(files: List[Tuple[str, BinaryIO]], max_entries: int) -> List[BatchEntry]:
+    """
+    Flatten uploaded files into batch entries, expanding zip archives.
+    Zip members are opened lazily so they are streamed, never extracted whole.
+
+    Args:
+        files: (filename, file object) for each uploaded file
+        max_entries: Maximum number of entries accepted in one batch
+
+    Raises:
+        ValueError: The batch has more than max_entries files or a zip is corrupt
+    """
+    entries = []
+
+    for filename, file_obj in files:
+        if filename.lower().endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(file_obj)
+            except zipfile.BadZipFile:
+                raise ValueError(f"{filename} is not a valid zip archive")
+
+            for info in archive.infolist():
+                if info.is_dir() or PurePosixPath(info.filename).name.startswith("."):
+                    continue
+                entries.append(BatchEntry(
+                    name=info.filename,
+                    open_stream=lambda archive=archive, info=info: archive.open(info),
+                    archive=filename
+                ))
+        else:
+            entries.append(BatchEntry(name=filename, open_stream=lambda f=file_obj: f))
+
+        if len(entries) > max_entries:
+            raise ValueError(f"Batch exceeds the maximum of {max_entries} files")
+
+    return entries
+
+
+def employee_key_for(name: str, manifest: Dict[str, str], default_key: Optional[str]) -> Optional[str]:
+    """
+    Work out which employee a file belongs to.
+
+    Resolution order: manifest entry for the full path or basename, the
+    batch-wide default, the top-level folder inside a zip
+    (jane@acme.com/week1.pdf), then the filename prefix
+    (jane@acme.com__week1.pdf or 42__week1.pdf).
+
+    Returns:
+        Employee email or id as a string, or None if nothing matched
+    """
+    path = PurePosixPath(name)
+
+    for candidate in (name, path.name):
+        if candidate in manifest:
+            return str(manifest[candidate]).strip()
+
+    if default_key:
+        return default_key
+
+    if len(path.parts) > 1:
+        return path.parts[0].strip()
+
+    if FILENAME_KEY_SEPARATOR in path.name:
+        return path.name.split(FILENAME_KEY_SEPARATOR, 1)[0].strip()
+
+    return None
+
+
+def load_employees(db: Session, keys: List[str]) -> Dict[str, int]:
+    """
+    Resolve employee keys (emails or ids) with a single query.
+
+    Returns:
+        Mapping of lower-cased key to employee id
+    """
+    emails = {key.lower() for key in keys if "@" in key}
+    ids = {int(key) for key in keys if key.isdigit()}
+
+    if not emails and not ids:
+        return {}
+
+    conditions = []
+    if emails:
+        conditions.append(func.lower(Employee.email).in_(emails))
+    if ids:
+        conditions.append(Employee.id.in_(ids))
+
+    rows = db.query(Employee.id, Employee.email).filter(
+        Employee.is_active == True,
+        or_(*conditions)
+    ).all()
+
+    resolved = {}
+    for employee_id, email in rows:
+        resolved[email.lower()] = employee_id
+        resolved[str(employee_id)] = employee_id
+    return resolved
+
+
+def ingest_batch(
+    db: Session,
+    files: List[Tuple[str, BinaryIO]],
+    uploaded_by: int,
+    manifest: Optional[Dict[str, str]] = None,
+    default_employee_id: Optional[int] = None,
+    max_entries: int = 1000,
+    max_size: Optional[int] = None
+) -> List[dict]:
+    """
+    Store every file in a batch and register the uploads in one transaction.
+
+    Files that can't be mapped to an employee, have an unsupported format or
+    fail validation are reported per item and don't abort the batch.
+
+    Returns:
+        One result dict per file: file_name, archive, upload, created, error
+    """
+    manifest = manifest or {}
+    default_key = str(default_employee_id) if default_employee_id else None
+
+    entries = expand_entries(files, max_entries)
+    keys = {entry.name: employee_key_for(entry.name, manifest, default_key) for entry in entries}
+    employees = load_employees(db, [key for key in keys.values() if key])
+
+    results = []
+    pending = []
+
+    for entry in entries:
+        result = {"file_name": entry.name, "archive": entry.archive, "upload": None, "created": False, "error": None}
+        results.append(result)
+
+        key = keys[entry.name]
+        employee_id = employees.get(key.lower()) if key else None
+        if employee_id is None:
+            result["error"] = f"No active employee matches '{key}'" if key else "Could not determine employee"
+            continue
+
+        is_valid, file_format = validate_file_format(entry.name)
+        if not is_valid:
+            result["error"] = "Invalid file format. Supported formats: PDF, JPG, CSV"
+            continue
+
+        try:
+            stream = entry.open_stream()
+            try:
+                digest, file_path, size = write_blob(iter_upload_chunks(stream, file_format, max_size=max_size))
+            finally:
+                if entry.archive:
+                    stream.close()
+        except (ValueError, zipfile.BadZipFile) as e:
+            result["error"] = str(e)
+            continue
+
+        metadata = {"batch": True}
+        if entry.archive:
+            metadata["archive"] = entry.archive
+
+        pending.append((result, PendingUpload(
+            employee_id=employee_id,
+            original_filename=PurePosixPath(entry.name).name,
+            file_format=file_format,
+            source=UploadSource.MANUAL,
+            digest=digest,
+            file_path=file_path,
+            size=size,
+            uploaded_by=uploaded_by,
+            metadata=metadata
+        )))
+
+    registered = register_uploads(db, [item for _, item in pending])
+    for (result, _), (upload, created) in zip(pending, registered):
+        result["upload"] = upload
+        result["created"] = created
+
+    return results
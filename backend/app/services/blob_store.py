@@ -0,0 +1,269 @@
+"""
+Content-addressed upload store.
+Registers TimesheetUpload rows on top of SHA-256 blobs, keeps blob reference
+counts and deduplicates identical files submitted by the same employee.
+
+Releasing the last reference leaves the blob row at ref_count 0 and its file
+in place; sweep_unreferenced_blobs deletes them later under a row lock. A
+concurrent upload of the same content either re-references the row before
+the sweep locks it, or writes the file afresh after it (write_blob always
+replaces the file), so an upload never ends up pointing at a deleted file.
+"""
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import StoredBlob, TimesheetUpload, UploadSource, UploadStatus
+from app.services.file_storage import write_blob, generate_unique_filename, delete_file
+from app.services.upload_stats import invalidate_upload_stats_after_commit
+from app.services.events import publish_upload_event
+
+
+@dataclass
+class PendingUpload:
+    """A file already written to the blob store, waiting for its upload row"""
+    employee_id: int
+    original_filename: str
+    file_format: str
+    source: UploadSource
+    digest: str
+    file_path: str
+    size: int
+    uploaded_by: Optional[int] = None
+    metadata: dict = field(default_factory=dict)
+
+
+# Upsert dialects; both support INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {"postgresql": postgresql, "sqlite": sqlite}
+
+
+def acquire_blobs(db: Session, pending: List[PendingUpload]):
+    """
+    Add one reference per pending upload to its blob, creating blob rows as needed.
+    A single INSERT ... ON CONFLICT (digest) DO UPDATE per digest, so concurrent
+    first uploads of the same content both count instead of one failing on
+    the unique index.
+    """
+    counts = {}
+    for item in pending:
+        count, _, _ = counts.get(item.digest, (0, item.file_path, item.size))
+        counts[item.digest] = (count + 1, item.file_path, item.size)
+
+    if not counts:
+        return
+
+    dialect = UPSERT_DIALECTS[db.get_bind().dialect.name]
+    for digest, (count, file_path, size) in sorted(counts.items()):
+        statement = dialect.insert(StoredBlob).values(
+            digest=digest, file_path=file_path, size=size, ref_count=count
+        )
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[StoredBlob.digest],
+            set_={"ref_count": StoredBlob.ref_count + statement.excluded.ref_count, "updated_at": datetime.utcnow()}
+        ))
+
+
+def release_blob(db: Session, digest: str):
+    """
+    Drop one reference to a blob. The row stays, at ref_count 0 after the
+    last reference, until sweep_unreferenced_blobs removes it and its file.
+    """
+    blob = db.query(StoredBlob).filter(StoredBlob.digest == digest).with_for_update().first()
+    if blob and blob.ref_count > 0:
+        blob.ref_count = blob.ref_count - 1
+
+
+def _remove_blob_file(file_path: str, grace_seconds: float) -> bool:
+    """
+    Delete a swept blob's file unless an upload rewrote it within the grace
+    period. The file is renamed aside first, so an upload writing it after
+    that creates a new file the sweep never touches; one written just before
+    is moved back. Blob content is fixed by its name, so putting it back is
+    always correct.
+    """
+    path = Path(file_path)
+    aside = path.with_name(path.name + ".sweep")
+    try:
+        os.replace(path, aside)
+    except FileNotFoundError:
+        return False
+    if time.time() - aside.stat().st_mtime < grace_seconds:
+        os.replace(aside, path)
+        return False
+    aside.unlink()
+    return True
+
+
+def sweep_unreferenced_blobs(db: Session, grace_seconds: Optional[float] = None, batch_size: int = 500) -> int:
+    """
+    Delete blobs nothing has referenced for grace_seconds. Each row is locked
+    and its count re-checked, then the row is deleted and committed before
+    the file is removed.
+
+    Returns:
+        Number of blob rows deleted
+    """
+    grace_seconds = settings.blob_sweep_grace_seconds if grace_seconds is None else grace_seconds
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    candidates = [
+        blob_id for (blob_id,) in db.query(StoredBlob.id).filter(
+            StoredBlob.ref_count == 0, StoredBlob.updated_at <= cutoff
+        ).order_by(StoredBlob.id).limit(batch_size)
+    ]
+    db.rollback()
+
+    swept = 0
+    for blob_id in candidates:
+        blob = db.query(StoredBlob).filter(
+            StoredBlob.id == blob_id, StoredBlob.ref_count == 0
+        ).with_for_update(skip_locked=True).first()
+        if blob is None:
+            db.rollback()
+            continue
+        file_path = blob.file_path
+        db.delete(blob)
+        db.commit()
+        swept += 1
+        # Cold blobs may still have a restored copy on disk; their pack stays in the archive
+        _remove_blob_file(file_path, grace_seconds)
+    return swept
+
+
+def register_uploads(db: Session, pending: List[PendingUpload]) -> List[Tuple[TimesheetUpload, bool]]:
+    """
+    Create upload rows for files already in the blob store.
+
+    A file whose digest the employee has already uploaded maps to the existing
+    upload instead of creating a new one. Rows are flushed, not committed, so a
+    whole batch can share one transaction.
+
+    Returns:
+        List of (upload, created) in the same order as pending
+    """
+    if not pending:
+        return []
+
+    digests = {item.digest for item in pending}
+    employee_ids = {item.employee_id for item in pending}
+
+    known = {}
+    existing = db.query(TimesheetUpload).filter(
+        TimesheetUpload.content_hash.in_(digests),
+        TimesheetUpload.employee_id.in_(employee_ids)
+    ).order_by(TimesheetUpload.id).all()
+    for upload in existing:
+        known.setdefault((upload.employee_id, upload.content_hash), upload)
+
+    results = []
+    new_items = []
+    for item in pending:
+        key = (item.employee_id, item.digest)
+        if key in known:
+            results.append((known[key], False))
+            continue
+
+        metadata = {
+            "original_filename": item.original_filename,
+            "file_size": item.size,
+            **item.metadata
+        }
+        upload = TimesheetUpload(
+            employee_id=item.employee_id,
+            file_path=item.file_path,
+            file_name=generate_unique_filename(item.original_filename, item.employee_id),
+            file_format=item.file_format,
+            content_hash=item.digest,
+            file_size=item.size,
+            source=item.source,
+            status=UploadStatus.PENDING,
+            uploaded_by=item.uploaded_by,
+            upload_metadata=json.dumps(metadata)
+        )
+        known[key] = upload
+        new_items.append(item)
+        results.append((upload, True))
+
+    db.add_all([upload for upload, created in results if created])
+    acquire_blobs(db, new_items)
+    db.flush()
+
+    if new_items:
+        invalidate_upload_stats_after_commit(db)
+        for upload, created in results:
+            if created:
+                publish_upload_event(db, upload, "upload.created")
+
+    return results
+
+
+def ingest_upload(
+    db: Session,
+    employee_id: int,
+    original_filename: str,
+    chunks: Iterable[bytes],
+    file_format: str,
+    source: UploadSource,
+    uploaded_by: Optional[int] = None,
+    metadata: Optional[dict] = None
+) -> Tuple[TimesheetUpload, bool]:
+    """
+    Stream a single file into the blob store and register its upload.
+
+    Args:
+        db: Database session (flushed, not committed)
+        employee_id: Employee the timesheet belongs to
+        original_filename: Filename as submitted
+        chunks: Iterable of binary chunks making up the file
+        file_format: pdf, jpg or csv
+        source: Where the file came from
+        uploaded_by: Admin who uploaded the file, for manual uploads
+        metadata: Extra source-specific metadata stored on the upload
+
+    Returns:
+        tuple: (upload, created) - created is False for a duplicate submission
+    """
+    digest, file_path, size = write_blob(chunks)
+
+    pending = PendingUpload(
+        employee_id=employee_id,
+        original_filename=original_filename,
+        file_format=file_format,
+        source=source,
+        digest=digest,
+        file_path=file_path,
+        size=size,
+        uploaded_by=uploaded_by,
+        metadata=metadata or {}
+    )
+
+    return register_uploads(db, [pending])[0]
+
+
+def delete_upload_file(db: Session, upload: TimesheetUpload) -> Optional[str]:
+    """
+    Release the storage held by an upload.
+
+    Returns:
+        Path to delete after commit for legacy uploads that own their file,
+        None for blobs, which sweep_unreferenced_blobs cleans up
+    """
+    if upload.content_hash:
+        release_blob(db, upload.content_hash)
+        return None
+
+    # Legacy uploads stored outside the blob store own their file
+    return upload.file_path
+
+
+def remove_unreferenced_file(file_path: Optional[str]):
+    """Delete a legacy file released by delete_upload_file, after commit."""
+    if file_path:
+        delete_file(file_path)
@@ -0,0 +1,148 @@
+"""
+Encryption and caching for integration configuration secrets.
+Owns the single Fernet cipher used for IntegrationConfig.config_data and keeps
+decrypted payloads in memory so syncs and status checks don't re-decrypt them.
+"""
+import json
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from cryptography.fernet import Fernet, MultiFernet
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import IntegrationConfig
+
+
+_cipher: Optional[MultiFernet] = None
+_cipher_lock = threading.Lock()
+
+# config id -> (updated_at, ciphertext, decrypted payload)
+_cache: Dict[int, Tuple[Optional[datetime], str, dict]] = {}
+_cache_lock = threading.Lock()
+
+
+def _load_keys() -> List[bytes]:
+    """
+    Collect Fernet keys from settings, newest first.
+    The first key encrypts; all keys are tried for decryption.
+    """
+    keys = []
+    if settings.encryption_key:
+        keys.append(settings.encryption_key.encode())
+    for key in settings.encryption_key_fallbacks.split(","):
+        key = key.strip()
+        if key:
+            keys.append(key.encode())
+
+    if not keys:
+        # One key per process, so every module at least agrees with itself
+        print("ENCRYPTION_KEY not set - using an ephemeral key, integration configs will not survive a restart")
+        keys.append(Fernet.generate_key())
+
+    return keys
+
+
+def get_cipher() -> MultiFernet:
+    """Get the process-wide cipher, building it on first use."""
+    global _cipher
+    if _cipher is None:
+        with _cipher_lock:
+            if _cipher is None:
+                _cipher = MultiFernet([Fernet(key) for key in _load_keys()])
+    return _cipher
+
+
+def reset_cipher():
+    """Drop the cipher and cache so keys are re-read from settings."""
+    global _cipher
+    with _cipher_lock:
+        _cipher = None
+    clear_cache()
+
+
+def encrypt_config(config_dict: dict) -> str:
+    """Encrypt configuration data"""
+    json_str = json.dumps(config_dict)
+    return get_cipher().encrypt(json_str.encode()).decode()
+
+
+def decrypt_config(encrypted_str: str) -> dict:
+    """Decrypt configuration data"""
+    decrypted = get_cipher().decrypt(encrypted_str.encode())
+    return json.loads(decrypted.decode())
+
+
+def get_config_data(config: IntegrationConfig) -> dict:
+    """
+    Get the decrypted payload of an IntegrationConfig row.
+
+    Results are cached per config id and reused while the row's updated_at
+    and ciphertext are unchanged. A shallow copy is returned so callers can
+    add or remove top-level keys without touching the cache.
+
+    Args:
+        config: IntegrationConfig row
+
+    Returns:
+        Decrypted configuration dict
+    """
+    with _cache_lock:
+        cached = _cache.get(config.id)
+
+    if cached and cached[0] == config.updated_at and cached[1] == config.config_data:
+        return dict(cached[2])
+
+    data = decrypt_config(config.config_data)
+
+    if config.id is not None:
+        with _cache_lock:
+            _cache[config.id] = (config.updated_at, config.config_data, data)
+
+    return dict(data)
+
+
+def set_config_data(config: IntegrationConfig, config_dict: dict):
+    """
+    Encrypt and store a payload on an IntegrationConfig row.
+    The cache entry is dropped; the next read after commit repopulates it.
+    """
+    config.config_data = encrypt_config(config_dict)
+    config.updated_at = datetime.utcnow()
+    invalidate(config.id)
+
+
+def invalidate(config_id: Optional[int]):
+    """Remove a single config from the cache."""
+    if config_id is None:
+        return
+    with _cache_lock:
+        _cache.pop(config_id, None)
+
+
+def clear_cache():
+    """Remove all cached configs."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def rotate_encryption_keys(db: Session) -> int:
+    """
+    Re-encrypt every IntegrationConfig with the current primary key.
+    Run after moving the old key into ENCRYPTION_KEY_FALLBACKS.
+
+    Returns:
+        Number of configs re-encrypted
+    """
+    cipher = get_cipher()
+    configs = db.query(IntegrationConfig).all()
+
+    for config in configs:
+        config.config_data = cipher.rotate(config.config_data.encode()).decode()
+        config.updated_at = datetime.utcnow()
+
+    db.commit()
+    clear_cache()
+
+    return len(configs)
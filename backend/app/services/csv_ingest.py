@@ -0,0 +1,475 @@
+"""
+Columnar CSV ingestion for timesheet exports.
+Detects the layout of a file from a sample, reads it in fixed-size chunks into
+numpy arrays and validates and aggregates hours per (employee, client, period)
+with vectorized operations, so memory stays bounded by the chunk size.
+"""
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import islice, zip_longest
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+# Accepted header names, compared after lower-casing and replacing spaces with underscores
+COLUMN_ALIASES = {
+    "date": ("date", "work_date", "day", "worked_on"),
+    "hours": ("hours", "regular_hours", "hours_worked", "total_hours"),
+    "overtime": ("overtime", "overtime_hours", "ot_hours", "ot"),
+    "employee": ("employee", "employee_email", "email", "employee_id", "emp_id", "worker"),
+    "client": ("client", "client_code"),
+    "description": ("description", "notes", "task"),
+}
+
+# Tried in this order; month-first wins when a sample fits both US and European dates
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%d.%m.%Y", "%Y/%m/%d", "%m-%d-%Y", "%d-%m-%Y")
+
+SAMPLE_BYTES = 64 * 1024
+CHUNK_ROWS = 200_000
+MAX_ERRORS = 20
+
+PERIODS = ("day", "week", "month")
+
+_EPOCH = date(1970, 1, 1)
+
+
+class CsvLayoutError(ValueError):
+    """The file doesn't look like a timesheet export"""
+
+
+@dataclass
+class CsvLayout:
+    """How to read a file: delimiter, header and the index of each known column"""
+    delimiter: str
+    has_header: bool
+    date_format: Optional[str]
+    columns: Dict[str, int]
+
+
+@dataclass
+class ColumnChunk:
+    """A block of consecutive data rows as columnar arrays"""
+    row_numbers: np.ndarray  # 1-based data row number of each entry
+    dates: np.ndarray  # datetime64[D], NaT where the date didn't parse
+    hours: np.ndarray  # float64, NaN where the value isn't a number
+    overtime: np.ndarray  # float64, NaN where the value isn't a number
+    employee: Optional[np.ndarray] = None  # str
+    client: Optional[np.ndarray] = None  # str
+    description: Optional[np.ndarray] = None  # object
+    raw_dates: Optional[np.ndarray] = None  # str, kept for error messages
+
+
+@dataclass
+class PeriodTotal:
+    """Hours for one employee, client and period"""
+    employee_key: Optional[str]
+    client_code: Optional[str]
+    period_start: date
+    first_date: date
+    last_date: date
+    hours: float
+    overtime_hours: float
+    rows: int
+    description: Optional[str] = None  # From the first row of the group
+
+
+@dataclass
+class CsvSummary:
+    layout: CsvLayout
+    rows: int = 0
+    invalid_rows: int = 0
+    errors: List[str] = field(default_factory=list)
+    totals: List[PeriodTotal] = field(default_factory=list)
+
+
+def _normalize_header(name: str) -> str:
+    return (name or "").strip().lower().replace(" ", "_")
+
+
+def _parse_with(value: str, formats) -> Optional[date]:
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def detect_date_format(values: List[str]) -> Optional[str]:
+    """First format that parses every non-empty sample value, if any"""
+    values = [value.strip() for value in values if value and value.strip()]
+    if not values:
+        return None
+    for fmt in DATE_FORMATS:
+        if all(_parse_with(value, (fmt,)) for value in values):
+            return fmt
+    return None
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _infer_columns(rows: List[List[str]]) -> Dict[str, int]:
+    """Guess column roles from values when the file has no header"""
+    columns = {}
+    width = max(len(row) for row in rows)
+    values = [[row[i].strip() for row in rows if i < len(row) and row[i].strip()] for i in range(width)]
+
+    for i, column in enumerate(values):
+        if not column:
+            continue
+        if "date" not in columns and detect_date_format(column):
+            columns["date"] = i
+        elif "employee" not in columns and all("@" in value for value in column):
+            columns["employee"] = i
+        elif all(_is_number(value) for value in column):
+            if "hours" not in columns and all(0 <= float(value) <= 24 for value in column):
+                columns["hours"] = i
+            elif "hours" in columns and "overtime" not in columns:
+                columns["overtime"] = i
+        elif "description" not in columns:
+            columns["description"] = i
+
+    return columns
+
+
+def detect_layout(file_path: str, sample_bytes: int = SAMPLE_BYTES) -> CsvLayout:
+    """
+    Work out delimiter, header, column positions and date format from the
+    start of a file.
+
+    Raises:
+        CsvLayoutError: No date or hours column could be identified
+    """
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(sample_bytes)
+
+    # Drop a partial last line so the sniffer only sees whole records
+    if len(sample) == sample_bytes and "\n" in sample:
+        sample = sample[:sample.rindex("\n") + 1]
+
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimiter = ","
+
+    rows = [row for row in csv.reader(io.StringIO(sample), delimiter=delimiter) if any(cell.strip() for cell in row)]
+    if not rows:
+        raise CsvLayoutError("File is empty")
+
+    headers = [_normalize_header(cell) for cell in rows[0]]
+    columns = {}
+    for role, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in headers:
+                columns[role] = headers.index(alias)
+                break
+
+    has_header = bool(columns)
+    data_rows = rows[1:] if has_header else rows
+    if not has_header and data_rows:
+        columns = _infer_columns(data_rows)
+
+    if "date" not in columns or "hours" not in columns:
+        raise CsvLayoutError("CSV must have a date and an hours column")
+
+    date_index = columns["date"]
+    date_format = detect_date_format([row[date_index] for row in data_rows if date_index < len(row)])
+
+    return CsvLayout(delimiter=delimiter, has_header=has_header, date_format=date_format, columns=columns)
+
+
+def _parse_dates(values: np.ndarray, date_format: Optional[str]) -> np.ndarray:
+    """Parse each distinct date string once and broadcast back to the rows"""
+    formats = ((date_format,) + tuple(f for f in DATE_FORMATS if f != date_format)) if date_format else DATE_FORMATS
+    unique, inverse = np.unique(values, return_inverse=True)
+    parsed = np.array(
+        [_parse_with(value, formats) or "NaT" for value in unique],
+        dtype="datetime64[D]"
+    ) if len(unique) else np.array([], dtype="datetime64[D]")
+    return parsed[inverse]
+
+
+def _parse_numbers(values: np.ndarray) -> np.ndarray:
+    """Convert strings to float64; blanks become 0, anything else unparsable NaN"""
+    values = np.char.strip(values)
+    values = np.where(values == "", "0", values)
+    try:
+        return values.astype(np.float64)
+    except ValueError:
+        return np.array([float(v) if _is_number(v) else np.nan for v in values], dtype=np.float64)
+
+
+def _to_chunk(records: List[List[str]], layout: CsvLayout, first_row: int) -> Optional[ColumnChunk]:
+    """Transpose raw records into arrays, dropping rows without a date"""
+    # zip_longest transposes in C and pads short rows with blanks
+    transposed = list(zip_longest(*records, fillvalue=""))
+    blank = ("",) * len(records)
+
+    def column(role: str) -> Optional[np.ndarray]:
+        index = layout.columns.get(role)
+        if index is None:
+            return None
+        values = transposed[index] if index < len(transposed) else blank
+        return np.char.strip(np.array(values, dtype=str))
+
+    raw_dates = column("date")
+    keep = raw_dates != ""
+    if not keep.any():
+        return None
+    if not keep.all():
+        raw_dates = raw_dates[keep]
+
+    def kept(values: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        return values if values is None or keep.all() else values[keep]
+
+    overtime = kept(column("overtime"))
+    description = kept(column("description"))
+
+    return ColumnChunk(
+        row_numbers=first_row + np.flatnonzero(keep),
+        dates=_parse_dates(raw_dates, layout.date_format),
+        hours=_parse_numbers(kept(column("hours"))),
+        overtime=_parse_numbers(overtime) if overtime is not None else np.zeros(len(raw_dates)),
+        employee=kept(column("employee")),
+        client=kept(column("client")),
+        description=description.astype(object) if description is not None else None,
+        raw_dates=raw_dates
+    )
+
+
+def iter_chunks(file_path: str, layout: Optional[CsvLayout] = None, chunk_rows: int = CHUNK_ROWS) -> Iterator[ColumnChunk]:
+    """
+    Read a CSV file as a sequence of columnar chunks of at most chunk_rows rows.
+    Rows that are blank or have no date are skipped.
+    """
+    layout = layout or detect_layout(file_path)
+
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f, delimiter=layout.delimiter)
+        if layout.has_header:
+            next(reader, None)
+
+        first_row = 1
+        while True:
+            records = list(islice(reader, chunk_rows))
+            if not records:
+                break
+            chunk = _to_chunk(records, layout, first_row)
+            first_row += len(records)
+            if chunk is not None:
+                yield chunk
+
+
+def period_starts(dates: np.ndarray, period: str, week_start: int = 1) -> np.ndarray:
+    """
+    First day of the period each date falls in.
+
+    Args:
+        dates: datetime64[D] array
+        period: day, week or month
+        week_start: First day of the week, 0=Sunday to 6=Saturday
+    """
+    if period == "day":
+        return dates
+    if period == "month":
+        return dates.astype("datetime64[M]").astype("datetime64[D]")
+    if period == "week":
+        days = dates.astype(np.int64)
+        # 1970-01-01 was a Thursday (4 with Sunday as 0)
+        return (days - (days + 4 - week_start) % 7).astype("datetime64[D]")
+    raise ValueError(f"Unknown period '{period}', expected one of {', '.join(PERIODS)}")
+
+
+def _validate(chunk: ColumnChunk) -> Tuple[np.ndarray, List[str]]:
+    """Mask of valid rows and messages for the first invalid ones"""
+    bad_date = np.isnat(chunk.dates)
+    bad_hours = np.isnan(chunk.hours) | (chunk.hours < 0) | (chunk.hours > 24)
+    bad_overtime = np.isnan(chunk.overtime) | (chunk.overtime < 0)
+    missing_employee = (chunk.employee == "") if chunk.employee is not None else np.zeros(len(bad_date), dtype=bool)
+
+    invalid = bad_date | bad_hours | bad_overtime | missing_employee
+    errors = []
+    for i in np.flatnonzero(invalid)[:MAX_ERRORS]:
+        problems = []
+        if bad_date[i]:
+            problems.append(f"unrecognized date '{chunk.raw_dates[i]}'")
+        if bad_hours[i]:
+            problems.append("hours must be a number between 0 and 24")
+        if bad_overtime[i]:
+            problems.append("overtime must be a non-negative number")
+        if missing_employee[i]:
+            problems.append("missing employee")
+        errors.append(f"Row {chunk.row_numbers[i]}: {', '.join(problems)}")
+
+    return ~invalid, errors
+
+
+def _factorize(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    unique, codes = np.unique(values, return_inverse=True)
+    return unique, codes.astype(np.int64)
+
+
+@dataclass
+class _Groups:
+    """Partial totals as parallel arrays, one entry per (employee, client, period)"""
+    employee: np.ndarray
+    client: np.ndarray
+    start: np.ndarray  # int64 days since epoch
+    first: np.ndarray
+    last: np.ndarray
+    hours: np.ndarray
+    overtime: np.ndarray
+    rows: np.ndarray
+    description: np.ndarray
+
+    def __len__(self):
+        return len(self.start)
+
+
+def _collapse(groups: _Groups) -> _Groups:
+    """
+    Merge entries sharing (employee, client, start).
+    The result is ordered by employee, client and start; descriptions come
+    from the first entry of each group.
+    """
+    employees, employee_codes = _factorize(groups.employee)
+    clients, client_codes = _factorize(groups.client)
+
+    low = groups.start.min()
+    span = int(groups.start.max() - low) + 1
+    keys = (employee_codes * len(clients) + client_codes) * span + (groups.start - low)
+
+    _, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    count = len(first_index)
+
+    first = np.full(count, np.iinfo(np.int64).max)
+    last = np.full(count, np.iinfo(np.int64).min)
+    np.minimum.at(first, inverse, groups.first)
+    np.maximum.at(last, inverse, groups.last)
+
+    return _Groups(
+        employee=groups.employee[first_index],
+        client=groups.client[first_index],
+        start=groups.start[first_index],
+        first=first,
+        last=last,
+        hours=np.bincount(inverse, weights=groups.hours, minlength=count),
+        overtime=np.bincount(inverse, weights=groups.overtime, minlength=count),
+        rows=np.bincount(inverse, weights=groups.rows, minlength=count).astype(np.int64),
+        description=groups.description[first_index]
+    )
+
+
+def _concat(parts: List[_Groups]) -> _Groups:
+    return _Groups(**{
+        name: np.concatenate([getattr(part, name) for part in parts])
+        for name in _Groups.__dataclass_fields__
+    })
+
+
+def _chunk_groups(chunk: ColumnChunk, valid: np.ndarray, period: str, week_start: int) -> Optional[_Groups]:
+    """Totals for the valid rows of one chunk"""
+    if not valid.any():
+        return None
+
+    size = int(valid.sum())
+    blank = np.full(size, "", dtype=str)
+    days = chunk.dates[valid].astype(np.int64)
+
+    return _collapse(_Groups(
+        employee=chunk.employee[valid] if chunk.employee is not None else blank,
+        client=chunk.client[valid] if chunk.client is not None else blank,
+        start=period_starts(chunk.dates[valid], period, week_start).astype(np.int64),
+        first=days,
+        last=days,
+        hours=chunk.hours[valid],
+        overtime=chunk.overtime[valid],
+        rows=np.ones(size, dtype=np.int64),
+        description=chunk.description[valid] if chunk.description is not None else np.full(size, "", dtype=object)
+    ))
+
+
+def aggregate_csv(
+    file_path: str,
+    period: str = "week",
+    week_start: int = 1,
+    chunk_rows: int = CHUNK_ROWS
+) -> CsvSummary:
+    """
+    Validate a CSV export and total its hours per (employee, client, period).
+
+    Invalid rows are counted, reported (up to MAX_ERRORS messages) and
+    excluded from the totals. Memory is bounded by chunk_rows plus the number
+    of distinct groups.
+
+    Args:
+        file_path: Path to the CSV file
+        period: day, week or month
+        week_start: First day of the week for weekly periods, 0=Sunday to 6=Saturday
+        chunk_rows: Rows held in memory at once
+
+    Returns:
+        CsvSummary with the totals ordered by employee, client and period
+
+    Raises:
+        CsvLayoutError: The file has no recognizable date and hours columns
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}', expected one of {', '.join(PERIODS)}")
+
+    layout = detect_layout(file_path)
+    summary = CsvSummary(layout=layout)
+    parts = []
+    pending = 0
+
+    for chunk in iter_chunks(file_path, layout, chunk_rows):
+        valid, errors = _validate(chunk)
+        summary.rows += len(valid)
+        summary.invalid_rows += int(len(valid) - valid.sum())
+        summary.errors.extend(errors[:MAX_ERRORS - len(summary.errors)])
+
+        groups = _chunk_groups(chunk, valid, period, week_start)
+        if groups is not None:
+            parts.append(groups)
+            pending += len(groups)
+
+        # Fold partial totals together once they outgrow a chunk
+        if len(parts) > 1 and pending > chunk_rows:
+            parts = [_collapse(_concat(parts))]
+            pending = len(parts[0])
+
+    if not parts:
+        return summary
+
+    totals = _collapse(_concat(parts)) if len(parts) > 1 else parts[0]
+    epoch = _EPOCH.toordinal()
+
+    summary.totals = [
+        PeriodTotal(
+            employee_key=employee or None,
+            client_code=client or None,
+            period_start=date.fromordinal(epoch + start),
+            first_date=date.fromordinal(epoch + first),
+            last_date=date.fromordinal(epoch + last),
+            hours=round(hours, 4),
+            overtime_hours=round(overtime, 4),
+            rows=rows,
+            description=description or None
+        )
+        for employee, client, start, first, last, hours, overtime, rows, description in zip(
+            totals.employee.tolist(), totals.client.tolist(), totals.start.tolist(),
+            totals.first.tolist(), totals.last.tolist(), totals.hours.tolist(),
+            totals.overtime.tolist(), totals.rows.tolist(), totals.description.tolist()
+        )
+    ]
+
+    return summary
@@ -1,23 +1,40 @@
 import io
 import os
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+
 from app.config import settings
 
 SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
 
-creds = service_account.Credentials.from_service_account_file(
-    settings.google_service_account_file,
-    scopes=SCOPES,
-)
+_drive = None
+
+
+class DriveNotConfiguredError(RuntimeError):
+    """GOOGLE_SERVICE_ACCOUNT_FILE is not set"""
+
 
-drive = build("drive", "v3", credentials=creds)
+def get_drive():
+    """Service-account Drive client, built on first use"""
+    global _drive
+    if _drive is None:
+        if not settings.google_service_account_file:
+            raise DriveNotConfiguredError("GOOGLE_SERVICE_ACCOUNT_FILE is not configured")
 
-os.makedirs(settings.google_drive_download_dir, exist_ok=True)
+        from google.oauth2 import service_account
+        from googleapiclient.discovery import build
 
+        creds = service_account.Credentials.from_service_account_file(
+            settings.google_service_account_file,
+            scopes=SCOPES,
+        )
+        _drive = build("drive", "v3", credentials=creds)
+    return _drive
 
-def download_file(file_id: str, filename: str):
+
+def download_file(file_id: str, filename: str, drive=None):
+    from googleapiclient.http import MediaIoBaseDownload
+
+    drive = drive or get_drive()
+    os.makedirs(settings.google_drive_download_dir, exist_ok=True)
     path = os.path.join(settings.google_drive_download_dir, filename)
 
     request = drive.files().get_media(fileId=file_id)
@@ -29,5 +46,3 @@ def download_file(file_id: str, filename: str):
         _, done = downloader.next_chunk()
 
     print(f"✅ Downloaded: {filename}")
-
-
@@ -6,27 +6,17 @@ import json
 from datetime import datetime, timedelta
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from cryptography.fernet import Fernet
 import os
 import io
 
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-
 from app.models import (
     IntegrationConfig, IntegrationType, Employee,
     TimesheetUpload, ProcessedFile, UploadSource, UploadStatus
 )
-from app.services.file_storage import save_uploaded_file, validate_file_format
-
-
-def decrypt_config(encrypted_str: str) -> dict:
-    """Decrypt configuration data"""
-    ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", Fernet.generate_key())
-    cipher_suite = Fernet(ENCRYPTION_KEY)
-    decrypted = cipher_suite.decrypt(encrypted_str.encode())
-    return json.loads(decrypted.decode())
+from app.services.file_storage import validate_file_format
+from app.services.blob_store import ingest_upload
+from app.services.config_secrets import get_config_data
+from app.services.events import publish_after_commit
 
 
 class DriveMonitoringService:
@@ -49,7 +39,7 @@ class DriveMonitoringService:
             return False
         
         try:
-            self.config = decrypt_config(config.config_data)
+            self.config = get_config_data(config)
             return True
         except Exception as e:
             print(f"Error loading Drive config: {e}")
@@ -58,6 +48,9 @@ class DriveMonitoringService:
     def connect_to_drive(self) -> bool:
         """Connect to Google Drive API"""
         try:
+            from google.oauth2.credentials import Credentials
+            from googleapiclient.discovery import build
+
             # Handle new token-based config (from Connect page)
             if 'access_token' in self.config:
                 creds = Credentials(
@@ -139,6 +132,8 @@ class DriveMonitoringService:
     def download_file(self, file_id: str) -> Optional[bytes]:
         """Download file content from Drive"""
         try:
+            from googleapiclient.http import MediaIoBaseDownload
+
             request = self.drive_service.files().get_media(fileId=file_id)
             file_buffer = io.BytesIO()
             downloader = MediaIoBaseDownload(file_buffer, request)
@@ -192,38 +187,30 @@ class DriveMonitoringService:
                 print(f"Failed to download file: {file_name}")
                 return False
             
-            # Save file
-            file_path, unique_filename = save_uploaded_file(
-                file_content=file_content,
-                original_filename=file_name,
-                employee_id=employee_id
-            )
-            
-            # Create upload record
-            upload = TimesheetUpload(
+            # Save file; a file this employee already submitted maps to the existing upload
+            upload, created = ingest_upload(
+                self.db,
                 employee_id=employee_id,
-                file_path=file_path,
-                file_name=unique_filename,
+                original_filename=file_name,
+                chunks=[file_content],
                 file_format=file_format,
                 source=UploadSource.DRIVE,
-                status=UploadStatus.PENDING,
-                upload_metadata=json.dumps({
-                    "original_filename": file_name,
-                    "file_size": len(file_content),
+                metadata={
                     "drive_file_id": file_id,
                     "owner_email": owner_email,
                     "modified_time": file_metadata.get('modifiedTime', ''),
                     "created_time": file_metadata.get('createdTime', '')
-                })
+                }
             )
-            
-            self.db.add(upload)
             self.db.commit()
-            self.db.refresh(upload)
             
             # Mark file as processed
             self.mark_file_processed(file_id, employee_id, upload.id)
             
+            if not created:
+                print(f"File {file_name} from {owner_email} duplicates upload {upload.id}, skipping")
+                return False
+            
             print(f"Processed file {file_name} from {owner_email}")
             return True
             
@@ -292,6 +279,9 @@ class DriveMonitoringService:
             integration.last_sync = now_utc
             integration.sync_count = (integration.sync_count or 0) + processed_count
             integration.updated_at = now_utc
+            publish_after_commit(self.db, "integrations", "integration.synced", {
+                "type": "drive", "processed": processed_count, "last_sync": now_utc.isoformat()
+            })
             self.db.commit()
             
             return {
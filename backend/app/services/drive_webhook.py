@@ -6,23 +6,11 @@ import json
 from datetime import datetime, timedelta
 from typing import Optional
 from sqlalchemy.orm import Session
-from cryptography.fernet import Fernet
-import os
 import uuid
 
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-
 from app.models import IntegrationConfig, IntegrationType
 from app.services.drive_service import DriveMonitoringService
-
-
-def decrypt_config(encrypted_str: str) -> dict:
-    """Decrypt configuration data"""
-    ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", Fernet.generate_key())
-    cipher_suite = Fernet(ENCRYPTION_KEY)
-    decrypted = cipher_suite.decrypt(encrypted_str.encode())
-    return json.loads(decrypted.decode())
+from app.services.config_secrets import get_config_data, set_config_data
 
 
 class DriveWebhookService:
@@ -44,7 +32,7 @@ class DriveWebhookService:
             return False
         
         try:
-            self.config = decrypt_config(config.config_data)
+            self.config = get_config_data(config)
             return True
         except Exception as e:
             print(f"Error loading Drive config: {e}")
@@ -53,6 +41,9 @@ class DriveWebhookService:
     def connect_to_drive(self) -> bool:
         """Connect to Google Drive API"""
         try:
+            from google.oauth2.credentials import Credentials
+            from googleapiclient.discovery import build
+
             oauth_creds = json.loads(self.config['oauth_credentials'])
             
             creds = Credentials(
@@ -119,7 +110,7 @@ class DriveWebhookService:
             
             if config:
                 # Decrypt existing config
-                existing_config = decrypt_config(config.config_data)
+                existing_config = get_config_data(config)
                 
                 # Add webhook info
                 existing_config['webhook'] = {
@@ -131,11 +122,7 @@ class DriveWebhookService:
                 }
                 
                 # Re-encrypt and save
-                ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", Fernet.generate_key())
-                cipher_suite = Fernet(ENCRYPTION_KEY)
-                encrypted_data = cipher_suite.encrypt(json.dumps(existing_config).encode()).decode()
-                
-                config.config_data = encrypted_data
+                set_config_data(config, existing_config)
                 self.db.commit()
             
             print(f"Webhook registered: {channel_id}")
@@ -180,14 +167,10 @@ class DriveWebhookService:
             ).first()
             
             if config:
-                existing_config = decrypt_config(config.config_data)
+                existing_config = get_config_data(config)
                 existing_config.pop('webhook', None)
                 
-                ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", Fernet.generate_key())
-                cipher_suite = Fernet(ENCRYPTION_KEY)
-                encrypted_data = cipher_suite.encrypt(json.dumps(existing_config).encode()).decode()
-                
-                config.config_data = encrypted_data
+                set_config_data(config, existing_config)
                 self.db.commit()
             
             return {"success": True, "message": "Webhook stopped successfully"}
@@ -9,27 +9,18 @@ import json
 from datetime import datetime, timedelta
 from typing import List, Optional, Tuple, Any, Dict
 from sqlalchemy.orm import Session
-from cryptography.fernet import Fernet
 import os
 import base64
 import time
 
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-
 from app.models import (
     IntegrationConfig, IntegrationType, Employee, 
     TimesheetUpload, ProcessedFile, UploadSource, UploadStatus
 )
-from app.services.file_storage import save_uploaded_file, validate_file_format
-
-
-def decrypt_config(encrypted_str: str) -> dict:
-    """Decrypt configuration data"""
-    ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", Fernet.generate_key())
-    cipher_suite = Fernet(ENCRYPTION_KEY)
-    decrypted = cipher_suite.decrypt(encrypted_str.encode())
-    return json.loads(decrypted.decode())
+from app.services.file_storage import validate_file_format
+from app.services.blob_store import ingest_upload
+from app.services.config_secrets import get_config_data
+from app.services.events import publish_after_commit
 
 
 class EmailMonitoringService:
@@ -55,7 +46,7 @@ class EmailMonitoringService:
             return False
         
         try:
-            self.config = decrypt_config(config.config_data)
+            self.config = get_config_data(config)
             
             # Determine auth type
             if 'access_token' in self.config:
@@ -84,6 +75,9 @@ class EmailMonitoringService:
     def connect_gmail_api(self) -> bool:
         """Connect using Gmail API with OAuth credentials"""
         try:
+            from google.oauth2.credentials import Credentials
+            from googleapiclient.discovery import build
+
             creds = Credentials(
                 token=self.config.get('access_token'),
                 refresh_token=self.config.get('refresh_token'),
@@ -238,36 +232,28 @@ class EmailMonitoringService:
                     continue
                 
                 try:
-                    file_path, unique_filename = save_uploaded_file(
-                        file_content=file_data,
-                        original_filename=filename,
-                        employee_id=employee_id
-                    )
-                    
-                    upload = TimesheetUpload(
+                    upload, created = ingest_upload(
+                        self.db,
                         employee_id=employee_id,
-                        file_path=file_path,
-                        file_name=unique_filename,
+                        original_filename=filename,
+                        chunks=[file_data],
                         file_format=file_format,
                         source=UploadSource.EMAIL,
-                        status=UploadStatus.PENDING,
-                        upload_metadata=json.dumps({
-                            "original_filename": filename,
-                            "file_size": len(file_data),
+                        metadata={
                             "email_subject": msg.get('Subject', 'No Subject'),
                             "email_from": from_header,
                             "email_date": msg.get('Date', ''),
                             "message_id": message_id
-                        })
+                        }
                     )
-                    
-                    self.db.add(upload)
                     self.db.commit()
-                    self.db.refresh(upload)
                     
                     self.mark_email_processed(message_id, employee_id, upload.id)
-                    processed_count += 1
-                    print(f"Processed {filename} from {sender_email}")
+                    if created:
+                        processed_count += 1
+                        print(f"Processed {filename} from {sender_email}")
+                    else:
+                        print(f"Skipped duplicate {filename} from {sender_email} (upload {upload.id})")
                     
                 except Exception as e:
                     print(f"Error processing attachment {filename}: {e}")
@@ -369,6 +355,9 @@ class EmailMonitoringService:
             integration.last_sync = now_utc
             integration.sync_count = (integration.sync_count or 0) + processed_count
             integration.updated_at = now_utc
+            publish_after_commit(self.db, "integrations", "integration.synced", {
+                "type": "email", "processed": processed_count, "last_sync": now_utc.isoformat()
+            })
             self.db.commit()
             
             return {
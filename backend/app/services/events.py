@@ -0,0 +1,285 @@
+"""
+Server-sent event fan-out.
+Changes are announced with publish_after_commit(db, ...): the event goes out
+once the session commits and is dropped if it rolls back. The in-process
+broker hands each event to every subscribed SSE stream of its topic. With
+events_pg_notify enabled, events travel through PostgreSQL NOTIFY instead and
+every worker process LISTENs, so streams see changes made by any worker.
+
+Events are small (ids and statuses); clients refetch what they display.
+Event ids are random and assigned where the event is published, so every
+worker tags the same event with the same id and a stream can resume on
+another worker. A Last-Event-ID a worker no longer has in its history gets
+a resync instead of a replay.
+"""
+import asyncio
+import json
+import select
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+
+TOPICS = ("timesheets", "uploads", "integrations")
+
+# Largest NOTIFY payload PostgreSQL accepts is 8000 bytes
+MAX_NOTIFY_BYTES = 7900
+
+# Drivers PgNotifyBridge knows how to read notifications from
+LISTEN_DRIVERS = ("psycopg2", "psycopg")
+
+
+def new_event_id() -> str:
+    return uuid.uuid4().hex
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    topic: str
+    type: str
+    data: dict
+
+    def encode(self) -> str:
+        """SSE wire format"""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n"
+
+
+class Subscription:
+    """
+    Bounded queue of events for one stream. A subscriber that falls behind
+    loses events and is told to resync instead of stalling the broker.
+    """
+
+    def __init__(self, topics: Iterable[str], employee_id: Optional[int], queue_size: int):
+        self.topics = frozenset(topics)
+        self.employee_id = employee_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+    def matches(self, event: Event) -> bool:
+        if event.topic not in self.topics:
+            return False
+        return self.employee_id is None or event.data.get("employee_id") == self.employee_id
+
+    def put(self, event: Event):
+        """Runs on the subscriber's event loop"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """Thread-safe in-process fan-out with a short history for Last-Event-ID resumes"""
+
+    def __init__(self, history: int = 256):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=history)
+
+    def subscribe(
+        self,
+        topics: Iterable[str],
+        employee_id: Optional[int] = None,
+        last_event_id: Optional[str] = None,
+        queue_size: int = 100
+    ) -> Subscription:
+        """
+        Register a stream on the running event loop, replaying history after
+        last_event_id. When that event isn't in the history the subscription
+        starts lagged, so the stream tells the client to resync.
+        """
+        subscription = Subscription(topics, employee_id, queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+            history = list(self._history)
+        missed = []
+        if last_event_id is not None:
+            ids = [e.id for e in history]
+            if last_event_id in ids:
+                missed = history[ids.index(last_event_id) + 1:]
+            else:
+                subscription.lagged = True
+        for event in missed:
+            if subscription.matches(event):
+                subscription.put(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def dispatch(self, topic: str, event_type: str, data: dict, event_id: Optional[str] = None) -> Event:
+        """Deliver to local subscribers; callable from any thread"""
+        with self._lock:
+            event = Event(event_id or new_event_id(), topic, event_type, data)
+            self._history.append(event)
+            subscribers = [s for s in self._subscribers if s.matches(event)]
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # Loop already closed; the stream is gone
+                self.unsubscribe(subscription)
+        return event
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+broker = EventBroker()
+
+
+class PgNotifyBridge:
+    """
+    Carries events between worker processes over LISTEN/NOTIFY. A background
+    thread listens on a dedicated connection and dispatches to the local
+    broker, reconnecting after errors. Works with psycopg2 and psycopg 3,
+    whichever the database URL resolves to.
+    """
+
+    def __init__(self, database_url: str, channel: str):
+        from sqlalchemy import create_engine
+
+        self.channel = channel
+        self.engine = create_engine(database_url, pool_pre_ping=True)
+        if self.engine.dialect.driver not in LISTEN_DRIVERS:
+            self.engine.dispose()
+            raise ValueError(
+                f"events_pg_notify needs one of {', '.join(LISTEN_DRIVERS)}, not {self.engine.dialect.driver}"
+            )
+        self._stop = threading.Event()
+        self._thread = None
+
+    def notify(self, topic: str, event_type: str, data: dict, event_id: str):
+        from sqlalchemy import text
+
+        payload = json.dumps({"id": event_id, "topic": topic, "type": event_type, "data": data}, default=str)
+        if len(payload.encode()) > MAX_NOTIFY_BYTES:
+            raise ValueError(f"Event {event_type} is too large for NOTIFY")
+        with self.engine.begin() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="pg-notify-bridge", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.engine.dispose()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                print(f"Event bridge connection lost: {type(e).__name__}: {e}")
+                self._stop.wait(2)
+
+    def _listen(self):
+        connection = self.engine.raw_connection()
+        try:
+            dbapi_connection = connection.driver_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            if self.engine.dialect.driver == "psycopg":
+                payloads = self._psycopg_payloads(dbapi_connection)
+            else:
+                payloads = self._psycopg2_payloads(dbapi_connection)
+            for payload in payloads:
+                message = json.loads(payload)
+                broker.dispatch(message["topic"], message["type"], message["data"], message.get("id"))
+        finally:
+            connection.close()
+
+    def _psycopg2_payloads(self, dbapi_connection) -> Iterator[str]:
+        while not self._stop.is_set():
+            if select.select([dbapi_connection], [], [], 1.0) == ([], [], []):
+                continue
+            dbapi_connection.poll()
+            while dbapi_connection.notifies:
+                yield dbapi_connection.notifies.pop(0).payload
+
+    def _psycopg_payloads(self, dbapi_connection) -> Iterator[str]:
+        # psycopg 3 has no poll(); notifies() blocks, and its timeout (3.2+) lets the loop see stop
+        while not self._stop.is_set():
+            for notification in dbapi_connection.notifies(timeout=1.0):
+                yield notification.payload
+
+
+_bridge: Optional[PgNotifyBridge] = None
+
+
+def start_event_bridge():
+    """Start the LISTEN/NOTIFY bridge when events_pg_notify is enabled"""
+    global _bridge
+    if settings.events_pg_notify and _bridge is None:
+        _bridge = PgNotifyBridge(settings.database_url, settings.events_channel)
+        _bridge.start()
+
+
+def stop_event_bridge():
+    global _bridge
+    if _bridge is not None:
+        _bridge.stop()
+        _bridge = None
+
+
+def publish(topic: str, event_type: str, data: dict):
+    """Announce a change now, to this process or (with the bridge) to every worker"""
+    event_id = new_event_id()
+    if _bridge is not None:
+        try:
+            _bridge.notify(topic, event_type, data, event_id)
+            return
+        except Exception as e:
+            print(f"NOTIFY failed, delivering {event_type} locally: {type(e).__name__}: {e}")
+    broker.dispatch(topic, event_type, data, event_id)
+
+
+def publish_after_commit(db: Session, topic: str, event_type: str, data: dict):
+    """Announce a change once db's transaction commits"""
+    if not db.in_transaction():
+        # Tie the event to a transaction so a rollback discards it
+        db.begin()
+    db.info.setdefault("pending_events", []).append((topic, event_type, data))
+
+
+def publish_upload_event(db: Session, upload, event_type: str):
+    publish_after_commit(db, "uploads", event_type, {
+        "id": upload.id, "employee_id": upload.employee_id, "status": upload.status.value
+    })
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending(session):
+    events: List = session.info.pop("pending_events", [])
+    for topic, event_type, data in events:
+        publish(topic, event_type, data)
+
+
+@sa_event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop("pending_events", None)
@@ -0,0 +1,211 @@
+"""
+Payroll and billing exports.
+Approved timesheets are read in (employee, client, period) order through a
+server-side cursor and priced one line at a time, so an export of any size
+streams in constant memory. Overtime is paid and billed at the client's
+overtime multiplier:
+
+    regular = total_hours - total_overtime
+    amount  = regular * rate + total_overtime * rate * overtime_multiplier
+
+Payroll uses the assignment's pay rate, falling back to the employee's;
+billing uses the client's bill rate. Lines without a rate have no amount.
+"""
+import csv
+import io
+from dataclasses import dataclass, fields
+from datetime import date
+from typing import Iterable, Iterator, List, Optional
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import Client, Employee, EmployeeClientAssignment, Timesheet, TimesheetStatus
+from app.utils.fast_json import dumps
+
+
+EXPORT_KINDS = ("payroll", "billing")
+
+DEFAULT_OVERTIME_MULTIPLIER = 1.5
+
+
+@dataclass
+class ExportLine:
+    employee_id: int
+    employee_name: str
+    client_id: int
+    client_code: str
+    period_start: date
+    period_end: date
+    timesheets: int
+    regular_hours: float
+    overtime_hours: float
+    rate: Optional[float]
+    overtime_multiplier: float
+    amount: Optional[float]
+
+
+EXPORT_COLUMNS = [field.name for field in fields(ExportLine)]
+
+
+def assignment_pay_rate():
+    """Pay rate of the latest assignment covering the timesheet's period"""
+    return (
+        select(EmployeeClientAssignment.pay_rate)
+        .where(
+            EmployeeClientAssignment.employee_id == Timesheet.employee_id,
+            EmployeeClientAssignment.client_id == Timesheet.client_id,
+            EmployeeClientAssignment.pay_rate.is_not(None),
+            or_(EmployeeClientAssignment.start_date.is_(None), EmployeeClientAssignment.start_date <= Timesheet.period_end),
+            or_(EmployeeClientAssignment.end_date.is_(None), EmployeeClientAssignment.end_date >= Timesheet.period_start)
+        )
+        .order_by(EmployeeClientAssignment.id.desc())
+        .limit(1)
+        .correlate(Timesheet)
+        .scalar_subquery()
+    )
+
+
+def export_query(
+    kind: str,
+    start: date,
+    end: date,
+    client_ids: Optional[Iterable[int]] = None,
+    employee_ids: Optional[Iterable[int]] = None
+):
+    """
+    Approved timesheets whose period starts within [start, end], with the rate to price them at.
+
+    Args:
+        kind: "payroll" or "billing"
+        start: First period start included
+        end: Last period start included
+        client_ids: Restrict to these clients
+        employee_ids: Restrict to these employees
+
+    Returns:
+        Select ordered by employee, client and period
+
+    Raises:
+        ValueError: If kind is not an export kind
+    """
+    if kind == "payroll":
+        rate = func.coalesce(assignment_pay_rate(), Employee.pay_rate)
+    elif kind == "billing":
+        rate = Client.bill_rate
+    else:
+        raise ValueError(f"Unknown export '{kind}'")
+
+    query = (
+        select(
+            Timesheet.employee_id,
+            Employee.first_name,
+            Employee.last_name,
+            Timesheet.client_id,
+            Client.code,
+            Timesheet.period_start,
+            Timesheet.period_end,
+            func.coalesce(Timesheet.total_hours, 0.0),
+            func.coalesce(Timesheet.total_overtime, 0.0),
+            rate,
+            func.coalesce(Client.overtime_multiplier, DEFAULT_OVERTIME_MULTIPLIER)
+        )
+        .join(Employee, Employee.id == Timesheet.employee_id)
+        .join(Client, Client.id == Timesheet.client_id)
+        .where(and_(
+            Timesheet.status == TimesheetStatus.APPROVED,
+            Timesheet.period_start >= start,
+            Timesheet.period_start <= end
+        ))
+        .order_by(Timesheet.employee_id, Timesheet.client_id, Timesheet.period_start, Timesheet.period_end)
+    )
+    if client_ids is not None:
+        query = query.where(Timesheet.client_id.in_(list(client_ids)))
+    if employee_ids is not None:
+        query = query.where(Timesheet.employee_id.in_(list(employee_ids)))
+    return query
+
+
+def _price(line: ExportLine) -> ExportLine:
+    line.regular_hours = round(line.regular_hours, 2)
+    line.overtime_hours = round(line.overtime_hours, 2)
+    if line.rate is not None:
+        line.amount = round(
+            line.regular_hours * line.rate + line.overtime_hours * line.rate * line.overtime_multiplier, 2
+        )
+    return line
+
+
+def iter_export_lines(
+    db: Session,
+    kind: str,
+    start: date,
+    end: date,
+    client_ids: Optional[Iterable[int]] = None,
+    employee_ids: Optional[Iterable[int]] = None,
+    batch_size: int = 1000
+) -> Iterator[ExportLine]:
+    """
+    Stream one priced line per (employee, client, period).
+    Several approved timesheets for the same period are summed into one line;
+    rows arrive in that order, so only the current line is held in memory.
+    """
+    query = export_query(kind, start, end, client_ids, employee_ids)
+    result = db.execute(query.execution_options(yield_per=batch_size))
+
+    line = None
+    for (employee_id, first_name, last_name, client_id, client_code, period_start, period_end,
+         total_hours, overtime_hours, rate, multiplier) in result:
+        if line is not None and (line.employee_id, line.client_id, line.period_start, line.period_end) == (
+            employee_id, client_id, period_start, period_end
+        ):
+            line.timesheets += 1
+            line.regular_hours += total_hours - overtime_hours
+            line.overtime_hours += overtime_hours
+            continue
+
+        if line is not None:
+            yield _price(line)
+        line = ExportLine(
+            employee_id=employee_id,
+            employee_name=f"{first_name} {last_name}",
+            client_id=client_id,
+            client_code=client_code,
+            period_start=period_start,
+            period_end=period_end,
+            timesheets=1,
+            regular_hours=total_hours - overtime_hours,
+            overtime_hours=overtime_hours,
+            rate=rate,
+            overtime_multiplier=multiplier,
+            amount=None
+        )
+
+    if line is not None:
+        yield _price(line)
+
+
+def ndjson_lines(lines: Iterable) -> Iterator[bytes]:
+    for line in lines:
+        yield dumps(vars(line)) + b"\n"
+
+
+def csv_lines(lines: Iterable, columns: List[str] = EXPORT_COLUMNS) -> Iterator[str]:
+    """CSV of dataclass records with a header row, written one record at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer.writerow(columns)
+    yield flush()
+    for line in lines:
+        writer.writerow(
+            "" if value is None else value.isoformat() if isinstance(value, date) else value
+            for value in vars(line).values()
+        )
+        yield flush()
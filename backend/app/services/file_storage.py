@@ -4,29 +4,29 @@ Handles saving, retrieving, and managing uploaded timesheet files.
 """
 import os
 import shutil
+import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Iterable, Iterator, Optional
 import hashlib
 
 
 # Base upload directory
 UPLOAD_BASE_DIR = Path(os.getenv("UPLOAD_DIR", "uploads/timesheets"))
 
+# Content-addressed blobs, one file per distinct SHA-256
+BLOB_DIR = UPLOAD_BASE_DIR / "blobs"
 
-def get_employee_upload_path(employee_id: int) -> Path:
-    """
-    Get the upload directory path for a specific employee.
-    Creates directory structure: uploads/timesheets/{employee_id}/{year}/{month}/
-    """
-    now = datetime.now()
-    year = now.strftime("%Y")
-    month = now.strftime("%m")
-    
-    path = UPLOAD_BASE_DIR / str(employee_id) / year / month
-    path.mkdir(parents=True, exist_ok=True)
-    
-    return path
+# Read/write unit when streaming uploads
+CHUNK_SIZE = 256 * 1024
+
+
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class FileContentMismatchError(ValueError):
+    """Raised when file content does not match its declared format"""
 
 
 def generate_unique_filename(original_filename: str, employee_id: int) -> str:
@@ -46,40 +46,61 @@ def generate_unique_filename(original_filename: str, employee_id: int) -> str:
     return f"{timestamp}_{short_hash}_{clean_name}"
 
 
-def save_uploaded_file(file_content: bytes, original_filename: str, employee_id: int) -> tuple[str, str]:
+def get_blob_path(digest: str) -> Path:
+    """
+    Get the storage path for a content-addressed blob.
+    Layout: uploads/timesheets/blobs/{digest[:2]}/{digest[2:4]}/{digest}
     """
-    Save uploaded file to local storage.
+    return BLOB_DIR / digest[:2] / digest[2:4] / digest
+
+
+def write_blob(chunks: Iterable[bytes]) -> tuple[str, str, int]:
+    """
+    Stream file content into the blob store, hashing while writing.
+    The blob file is always replaced, even when the content is already
+    stored: the fresh modification time tells the unreferenced-blob sweeper
+    an upload is about to reference it.
     
     Args:
-        file_content: Binary content of the file
-        original_filename: Original filename from upload
-        employee_id: ID of the employee
+        chunks: Iterable of binary chunks making up the file
         
     Returns:
-        tuple: (file_path, file_name) - Full path and generated filename
+        tuple: (digest, file_path, size) - SHA-256 hex digest, blob path and byte count
     """
-    # Get employee's upload directory
-    upload_dir = get_employee_upload_path(employee_id)
-    
-    # Generate unique filename
-    unique_filename = generate_unique_filename(original_filename, employee_id)
+    tmp_dir = BLOB_DIR / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
     
-    # Full file path
-    file_path = upload_dir / unique_filename
+    sha256 = hashlib.sha256()
+    size = 0
     
-    # Write file
-    with open(file_path, 'wb') as f:
-        f.write(file_content)
+    fd, tmp_name = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                sha256.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        
+        digest = sha256.hexdigest()
+        blob_path = get_blob_path(digest)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_name, blob_path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
     
-    return str(file_path), unique_filename
+    return digest, str(blob_path), size
 
 
-def get_file_path(file_path_str: str) -> Optional[Path]:
+def get_file_path(file_path_str: str, db=None) -> Optional[Path]:
     """
     Get Path object for a stored file.
+    Blobs moved to cold storage are restored from the archive first.
     
     Args:
         file_path_str: String path from database
+        db: Optional database session for looking up archived blobs
         
     Returns:
         Path object if file exists, None otherwise
@@ -89,9 +110,19 @@ def get_file_path(file_path_str: str) -> Optional[Path]:
     if file_path.exists() and file_path.is_file():
         return file_path
     
+    if is_blob_digest(file_path.name):
+        # Imported here to avoid a cycle: tiering builds on this module
+        from app.services.storage_tiering import restore_blob
+        return restore_blob(file_path.name, db=db)
+    
     return None
 
 
+def is_blob_digest(name: str) -> bool:
+    """True if name looks like a SHA-256 hex digest, i.e. a blob file name"""
+    return len(name) == 64 and all(c in "0123456789abcdef" for c in name)
+
+
 def delete_file(file_path_str: str) -> bool:
     """
     Delete a file from storage.
@@ -156,3 +187,71 @@ def get_file_size(file_path_str: str) -> Optional[int]:
         return file_path.stat().st_size
     
     return None
+
+
+def matches_file_format(head: bytes, file_format: str) -> bool:
+    """
+    Check the leading bytes of a file against its declared format.
+    
+    Args:
+        head: First bytes of the file (at least a few hundred bytes when available)
+        file_format: pdf, jpg or csv as returned by validate_file_format
+        
+    Returns:
+        True if the content looks like the declared format
+    """
+    if file_format == 'pdf':
+        # The spec tolerates junk before the header within the first 1 KB
+        return b'%PDF-' in head[:1024]
+    
+    if file_format == 'jpg':
+        return head.startswith(b'\xff\xd8\xff')
+    
+    if file_format == 'csv':
+        return b'\x00' not in head
+    
+    return False
+
+
+def iter_upload_chunks(
+    file_obj: BinaryIO,
+    file_format: str,
+    max_size: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Read an uploaded file in chunks, validating it as it streams.
+    The first chunk is checked against the format's magic bytes before
+    anything is yielded, and the running size is checked on every chunk.
+    
+    Args:
+        file_obj: Binary file object positioned at the start of the upload
+        file_format: Declared format (pdf, jpg, csv)
+        max_size: Maximum size in bytes, or None for no limit
+        chunk_size: Bytes per read
+        
+    Raises:
+        FileContentMismatchError: Leading bytes don't match file_format
+        FileTooLargeError: More than max_size bytes were read
+    """
+    size = 0
+    first = True
+    
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            break
+        
+        if first:
+            if not matches_file_format(chunk, file_format):
+                raise FileContentMismatchError(f"File content is not a valid {file_format.upper()}")
+            first = False
+        
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise FileTooLargeError(f"File exceeds the maximum upload size of {max_size} bytes")
+        
+        yield chunk
+    
+    if first:
+        raise FileContentMismatchError("File is empty")
@@ -0,0 +1,167 @@
+"""
+Outgoing mail over a pool of persistent SMTP sessions.
+Each session is opened (EHLO, STARTTLS, AUTH) once and reused for many
+messages; every message is its own MAIL/RCPT/DATA transaction, so a failed
+send never affects the others on the same session.
+"""
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.message import EmailMessage
+from typing import Optional
+
+from app.config import settings
+from app.utils.metrics import metrics
+
+
+# Errors after which the session can't be trusted and is reopened
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """Whether the connection itself failed; SMTPException subclasses OSError, so protocol replies are excluded"""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class MailNotConfiguredError(RuntimeError):
+    """smtp_host isn't set"""
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether retrying the send may succeed: dropped connections and 4xx replies"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return is_connection_error(error)
+
+
+def build_message(to: str, subject: str, body: str, sender: Optional[str] = None) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = sender or settings.smtp_from
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+
+class SMTPPool:
+    """
+    At most size concurrent SMTP sessions, idle ones kept open for reuse.
+    Thread-safe; callers beyond size wait for a free session.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 25,
+        size: int = 4,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = False,
+        timeout: float = 30
+    ):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+
+    @classmethod
+    def from_settings(cls) -> "SMTPPool":
+        if not settings.smtp_host:
+            raise MailNotConfiguredError("SMTP is not configured (set SMTP_HOST)")
+        return cls(
+            settings.smtp_host,
+            settings.smtp_port,
+            settings.smtp_max_connections,
+            settings.smtp_username,
+            settings.smtp_password,
+            settings.smtp_starttls,
+            settings.smtp_timeout_seconds
+        )
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except Exception:
+            smtp.close()
+            raise
+        metrics.increment("mail.connections_opened")
+        return smtp
+
+    @contextmanager
+    def session(self):
+        """
+        A connected session. It goes back to the pool after success, or after
+        any other error once RSET has cleared the half-finished transaction;
+        a broken connection, a failed RSET or an interrupt closes it instead.
+        """
+        with self._slots:
+            try:
+                smtp = self._idle.get_nowait()
+            except queue.Empty:
+                smtp = self._connect()
+            try:
+                yield smtp
+            except Exception as e:
+                if is_connection_error(e):
+                    smtp.close()
+                    raise
+                try:
+                    smtp.rset()
+                except Exception:
+                    smtp.close()
+                else:
+                    self._idle.put(smtp)
+                raise
+            except BaseException:
+                smtp.close()
+                raise
+            else:
+                self._idle.put(smtp)
+
+    def send(self, message: EmailMessage, retries: int = 3, backoff: float = 0.5):
+        """
+        Send one message, retrying transient failures with exponential backoff.
+
+        Raises:
+            smtplib.SMTPException / OSError: Permanent failure or retries exhausted
+        """
+        for attempt in range(retries + 1):
+            try:
+                with self.session() as smtp:
+                    smtp.send_message(message)
+                metrics.increment("mail.sent")
+                return
+            except Exception as e:
+                if attempt == retries or not is_transient(e):
+                    metrics.increment("mail.failed")
+                    raise
+                metrics.increment("mail.retries")
+                time.sleep(backoff * 2 ** attempt)
+
+    def close(self):
+        while True:
+            try:
+                smtp = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                smtp.quit()
+            except CONNECTION_ERRORS + (smtplib.SMTPException,):
+                smtp.close()
@@ -0,0 +1,181 @@
+"""
+Missing-timesheet detection.
+Expected (employee, client, period) tuples are generated in SQL by joining
+active assignments to the pay periods of their client's calendar, then
+anti-joined against timesheets. The periods come from the period calendar
+as a small VALUES CTE (one row per period per calendar in use), so the same
+query runs on PostgreSQL and SQLite and the result can be streamed.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import Date, Integer, String, and_, column, exists, func, or_, select, values
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Client, Employee, EmployeeClientAssignment, SubmissionFrequency, Timesheet, TimesheetStatus
+)
+from app.services.period_calendar import get_period_calendar
+
+
+# Statuses that count as handed in when submitted_only is set
+SUBMITTED_STATUSES = (TimesheetStatus.SUBMITTED, TimesheetStatus.APPROVED)
+
+
+@dataclass(frozen=True)
+class MissingTimesheet:
+    employee_id: int
+    client_id: int
+    period_start: date
+    period_end: date
+
+
+def covers(timesheet_start: date, timesheet_end: date, period) -> bool:
+    """A timesheet counts for every period it overlaps, even a partial one"""
+    return timesheet_start <= period.end and timesheet_end >= period.start
+
+
+def expects(assignment, period) -> bool:
+    """Whether an assignment owes a timesheet for period, given its start and end dates"""
+    return (
+        (assignment.start_date is None or assignment.start_date <= period.end)
+        and (assignment.end_date is None or assignment.end_date >= period.start)
+    )
+
+
+def _calendar_keys(db: Session, client_ids: Optional[Iterable[int]] = None) -> list:
+    """Distinct (frequency, week_start_day) pairs among active clients"""
+    frequency = func.coalesce(Client.default_submission_frequency, SubmissionFrequency.WEEKLY)
+    week_start = func.coalesce(Client.week_start_day, 1)
+    query = db.query(frequency, week_start).filter(Client.is_active == True).distinct()
+    if client_ids is not None:
+        query = query.filter(Client.id.in_(list(client_ids)))
+    return query.all()
+
+
+def _periods_cte(keys: list, start: date, end: date):
+    rows = []
+    for frequency, week_start_day in keys:
+        frequency = SubmissionFrequency(frequency)
+        for period in get_period_calendar(frequency, week_start_day).periods_in(start, end):
+            rows.append((frequency.value, week_start_day, period.start, period.end))
+    if not rows:
+        return None
+
+    return values(
+        column("frequency", String),
+        column("week_start_day", Integer),
+        column("period_start", Date),
+        column("period_end", Date),
+        name="expected_periods"
+    ).data(rows).cte("expected_periods")
+
+
+def missing_timesheets_query(
+    db: Session,
+    start: date,
+    end: date,
+    client_ids: Optional[Iterable[int]] = None,
+    employee_ids: Optional[Iterable[int]] = None,
+    submitted_only: bool = False
+):
+    """
+    Select of (employee_id, client_id, period_start, period_end) for every
+    pay period overlapping start..end that an active employee owes an active
+    client and has no timesheet for.
+
+    A period is expected only while the assignment runs (start_date/end_date)
+    and is covered by any timesheet for the same employee and client that
+    overlaps it; expects() and covers() state the same rules in Python.
+
+    Args:
+        db: Database session
+        start: First day of the range
+        end: Last day of the range
+        client_ids: Restrict to these clients
+        employee_ids: Restrict to these employees
+        submitted_only: Drafts don't count as handed in
+
+    Returns:
+        Select statement, or None when no client has periods in the range
+    """
+    client_ids = None if client_ids is None else list(client_ids)
+    periods = _periods_cte(_calendar_keys(db, client_ids), start, end)
+    if periods is None:
+        return None
+
+    covered = exists().where(
+        Timesheet.employee_id == EmployeeClientAssignment.employee_id,
+        Timesheet.client_id == EmployeeClientAssignment.client_id,
+        Timesheet.period_start <= periods.c.period_end,
+        Timesheet.period_end >= periods.c.period_start
+    )
+    if submitted_only:
+        covered = covered.where(Timesheet.status.in_(SUBMITTED_STATUSES))
+
+    query = (
+        select(
+            EmployeeClientAssignment.employee_id,
+            EmployeeClientAssignment.client_id,
+            periods.c.period_start,
+            periods.c.period_end
+        )
+        .join(Employee, Employee.id == EmployeeClientAssignment.employee_id)
+        .join(Client, Client.id == EmployeeClientAssignment.client_id)
+        .join(periods, and_(
+            periods.c.frequency == func.coalesce(Client.default_submission_frequency, SubmissionFrequency.WEEKLY),
+            periods.c.week_start_day == func.coalesce(Client.week_start_day, 1)
+        ))
+        .where(
+            EmployeeClientAssignment.is_active == True,
+            Employee.is_active == True,
+            Client.is_active == True,
+            or_(EmployeeClientAssignment.start_date.is_(None), EmployeeClientAssignment.start_date <= periods.c.period_end),
+            or_(EmployeeClientAssignment.end_date.is_(None), EmployeeClientAssignment.end_date >= periods.c.period_start),
+            ~covered
+        )
+        .order_by(EmployeeClientAssignment.employee_id, EmployeeClientAssignment.client_id, periods.c.period_start)
+    )
+    if client_ids is not None:
+        query = query.where(EmployeeClientAssignment.client_id.in_(client_ids))
+    if employee_ids is not None:
+        query = query.where(EmployeeClientAssignment.employee_id.in_(list(employee_ids)))
+    return query
+
+
+def iter_missing_timesheets(
+    db: Session,
+    start: date,
+    end: date,
+    client_ids: Optional[Iterable[int]] = None,
+    employee_ids: Optional[Iterable[int]] = None,
+    submitted_only: bool = False,
+    batch_size: int = 1000
+) -> Iterator[MissingTimesheet]:
+    """
+    Stream missing timesheets ordered by employee, client and period.
+    Rows are fetched batch_size at a time with a server-side cursor where
+    the driver supports one.
+    """
+    query = missing_timesheets_query(db, start, end, client_ids, employee_ids, submitted_only)
+    if query is None:
+        return
+
+    result = db.execute(query.execution_options(yield_per=batch_size))
+    for employee_id, client_id, period_start, period_end in result:
+        yield MissingTimesheet(employee_id, client_id, period_start, period_end)
+
+
+def count_missing_timesheets(
+    db: Session,
+    start: date,
+    end: date,
+    client_ids: Optional[Iterable[int]] = None,
+    employee_ids: Optional[Iterable[int]] = None,
+    submitted_only: bool = False
+) -> int:
+    query = missing_timesheets_query(db, start, end, client_ids, employee_ids, submitted_only)
+    if query is None:
+        return 0
+    return db.execute(select(func.count()).select_from(query.order_by(None).subquery())).scalar_one()
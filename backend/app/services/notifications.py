@@ -0,0 +1,126 @@
+"""
+Set-based notification creation.
+Recipients are resolved with one query (explicit ids and/or a selector) and
+notifications are written with one multi-row INSERT ... RETURNING, so the
+number of statements doesn't grow with the number of recipients.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, List, Optional
+
+from sqlalchemy import insert, select, union
+from sqlalchemy.orm import Session
+
+from app.models import Employee, EmployeeClientAssignment, Notification, NotificationStatus, UserRole
+from app.services.missing_timesheets import missing_timesheets_query
+
+
+# Columns handed back for the created notifications
+RETURNED_COLUMNS = (
+    Notification.id, Notification.employee_id, Notification.notification_type, Notification.subject,
+    Notification.message, Notification.status, Notification.sent_at, Notification.created_at,
+    Notification.channel, Notification.attempts, Notification.next_attempt_at, Notification.last_error
+)
+
+
+@dataclass
+class RecipientSelector:
+    """
+    Active employees matching every given criterion.
+    With missing_timesheets, only those owing a timesheet between start and end.
+    """
+    client_id: Optional[int] = None
+    role: Optional[UserRole] = None
+    missing_timesheets: bool = False
+    start: Optional[date] = None
+    end: Optional[date] = None
+    submitted_only: bool = False
+
+
+def selector_query(db: Session, selector: RecipientSelector):
+    """Select of distinct employee ids matched by selector, or None when nothing can match"""
+    if selector.missing_timesheets:
+        today = date.today()
+        missing = missing_timesheets_query(
+            db,
+            selector.start or today.replace(day=1),
+            selector.end or today,
+            client_ids=[selector.client_id] if selector.client_id else None,
+            submitted_only=selector.submitted_only
+        )
+        if missing is None:
+            return None
+        missing = missing.order_by(None).subquery()
+        query = select(missing.c.employee_id).join(Employee, Employee.id == missing.c.employee_id)
+    else:
+        query = select(Employee.id).where(Employee.is_active == True)
+        if selector.client_id:
+            query = query.join(EmployeeClientAssignment, EmployeeClientAssignment.employee_id == Employee.id).where(
+                EmployeeClientAssignment.client_id == selector.client_id,
+                EmployeeClientAssignment.is_active == True
+            )
+
+    if selector.role:
+        query = query.where(Employee.role == selector.role)
+    return query.distinct()
+
+
+def resolve_recipients(
+    db: Session,
+    employee_ids: Optional[Iterable[int]] = None,
+    selector: Optional[RecipientSelector] = None
+) -> List[int]:
+    """
+    Existing employee ids among employee_ids plus everyone matched by
+    selector, in one query. Unknown ids are dropped.
+    """
+    queries = []
+    employee_ids = list(set(employee_ids or ()))
+    if employee_ids:
+        queries.append(select(Employee.id).where(Employee.id.in_(employee_ids)))
+    if selector is not None:
+        query = selector_query(db, selector)
+        if query is not None:
+            queries.append(query)
+    if not queries:
+        return []
+
+    query = queries[0] if len(queries) == 1 else union(*queries)
+    return sorted(db.execute(query).scalars())
+
+
+def bulk_create_notifications(
+    db: Session,
+    employee_ids: List[int],
+    notification_type: str,
+    subject: str,
+    message: str,
+    channel: str = "email"
+) -> list:
+    """
+    Insert one PENDING notification per employee id in a single statement.
+
+    Returns:
+        list: Row mappings of the created notifications, in employee id order
+    """
+    if not employee_ids:
+        return []
+
+    rows = db.execute(
+        insert(Notification).returning(*RETURNED_COLUMNS),
+        [
+            {
+                "employee_id": employee_id,
+                "channel": channel,
+                "notification_type": notification_type,
+                "subject": subject,
+                "message": message,
+                "status": NotificationStatus.PENDING,
+            }
+            for employee_id in employee_ids
+        ]
+    ).mappings().all()
+    db.commit()
+    # RETURNING order isn't guaranteed for batched inserts; asking for it makes
+    # SQLite fall back to one statement per row
+    return sorted(rows, key=lambda row: row["employee_id"])
@@ -0,0 +1,434 @@
+"""
+Notification outbox.
+Notifications are written PENDING in the same transaction as whatever caused
+them; delivery workers claim due rows with SKIP LOCKED and a lease, deliver
+them through a channel (email, webhook or a registered plugin) under
+per-channel and per-recipient-domain token buckets, and record the outcome.
+Failures are retried with exponential backoff until notification_max_attempts.
+
+Delivery is at-least-once: a worker that dies mid-batch leaves its lease to
+expire and another worker picks the rows up again.
+
+Run dedicated workers with:
+    python -m app.services.outbox --processes 4
+"""
+import abc
+import argparse
+import importlib
+import multiprocessing
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Employee, Notification, NotificationStatus
+from app.services.mailer import SMTPPool, build_message, is_transient
+from app.utils.metrics import metrics
+from app.utils.rate_limit import KeyedTokenBuckets, TokenBucket
+
+
+# Longest a delivery thread waits for a rate limit token before deferring the message
+MAX_RATE_WAIT_SECONDS = 1.0
+
+
+class ChannelNotConfiguredError(RuntimeError):
+    """A channel's settings are missing; its notifications stay pending"""
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    id: int
+    employee_id: int
+    recipient: str
+    channel: str
+    notification_type: str
+    subject: str
+    message: str
+    attempts: int
+
+    @property
+    def domain(self) -> str:
+        return self.recipient.rpartition("@")[2].lower()
+
+
+class NotificationChannel(abc.ABC):
+    """
+    Delivers outbox messages. deliver() raises on failure and is_transient()
+    decides whether the message is retried. Must be thread-safe.
+    """
+    name = ""
+
+    @abc.abstractmethod
+    def deliver(self, message: OutboxMessage):
+        """Send one message, raising on failure"""
+
+    def is_transient(self, error: Exception) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+
+class EmailChannel(NotificationChannel):
+    """Email to the employee over the shared SMTP session pool"""
+    name = "email"
+
+    def __init__(self, pool: Optional[SMTPPool] = None):
+        if pool is None and not settings.smtp_host:
+            raise ChannelNotConfiguredError("SMTP is not configured (set SMTP_HOST)")
+        self.pool = pool or SMTPPool.from_settings()
+
+    def deliver(self, message: OutboxMessage):
+        # Retries are the outbox's job, not the pool's
+        self.pool.send(build_message(message.recipient, message.subject, message.message), retries=0)
+
+    def is_transient(self, error: Exception) -> bool:
+        return is_transient(error)
+
+    def close(self):
+        self.pool.close()
+
+
+class WebhookChannel(NotificationChannel):
+    """
+    JSON POST to notification_webhook_url. The Idempotency-Key header lets
+    the receiver drop duplicates from at-least-once delivery.
+    """
+    name = "webhook"
+
+    def __init__(self, url: Optional[str] = None, timeout: Optional[float] = None):
+        import httpx
+
+        self.url = url or settings.notification_webhook_url
+        if not self.url:
+            raise ChannelNotConfiguredError("Webhook URL is not configured (set NOTIFICATION_WEBHOOK_URL)")
+        self._httpx = httpx
+        self.client = httpx.Client(timeout=timeout or settings.notification_webhook_timeout_seconds)
+
+    def deliver(self, message: OutboxMessage):
+        response = self.client.post(
+            self.url,
+            json={
+                "id": message.id,
+                "employee_id": message.employee_id,
+                "recipient": message.recipient,
+                "notification_type": message.notification_type,
+                "subject": message.subject,
+                "message": message.message,
+            },
+            headers={"Idempotency-Key": f"notification-{message.id}"}
+        )
+        response.raise_for_status()
+
+    def is_transient(self, error: Exception) -> bool:
+        if isinstance(error, self._httpx.HTTPStatusError):
+            code = error.response.status_code
+            return code >= 500 or code in (408, 429)
+        return True
+
+    def close(self):
+        self.client.close()
+
+
+_channel_factories: Dict[str, Callable[[], NotificationChannel]] = {
+    EmailChannel.name: EmailChannel,
+    WebhookChannel.name: WebhookChannel,
+}
+
+
+def register_channel(name: str, factory: Callable[[], NotificationChannel]):
+    """Make a channel available to workers, e.g. from a plugin module"""
+    _channel_factories[name] = factory
+
+
+def _load_factory(path: str) -> Callable[[], NotificationChannel]:
+    """Resolve a 'module:attr' channel factory"""
+    module_name, _, attr = path.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"Invalid channel '{path}', expected 'module:attr'")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def channel_factories() -> Dict[str, Callable[[], NotificationChannel]]:
+    """Built-in and registered channels plus those from notification_channels"""
+    factories = dict(_channel_factories)
+    for entry in filter(None, (item.strip() for item in settings.notification_channels.split(","))):
+        name, _, path = entry.partition("=")
+        factories[name.strip()] = _load_factory(path.strip())
+    return factories
+
+
+def channel_names() -> List[str]:
+    return sorted(channel_factories())
+
+
+def parse_rate_limits(value: str) -> Dict[str, float]:
+    """'email=50,webhook=10' -> {'email': 50.0, 'webhook': 10.0}"""
+    limits = {}
+    for entry in filter(None, (item.strip() for item in value.split(","))):
+        name, _, rate = entry.partition("=")
+        limits[name.strip()] = float(rate)
+    return limits
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter after the given number of failed attempts"""
+    delay = min(settings.notification_retry_base_seconds * 2 ** (attempts - 1), settings.notification_retry_max_seconds)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class RateLimiter:
+    """
+    Token buckets per channel and per (channel, recipient domain).
+
+    Args:
+        channel_rates: Deployment-wide messages per second by channel
+        domain_rate: Deployment-wide messages per second per recipient domain
+        processes: Processes sharing the limits; each gets an equal share
+    """
+
+    def __init__(self, channel_rates: Dict[str, float], domain_rate: float, processes: int = 1):
+        processes = max(processes, 1)
+        self.channels = {
+            name: TokenBucket(rate / processes) for name, rate in channel_rates.items() if rate > 0
+        }
+        self.domains = KeyedTokenBuckets(domain_rate / processes) if domain_rate > 0 else None
+
+    @classmethod
+    def from_settings(cls, processes: Optional[int] = None) -> "RateLimiter":
+        return cls(
+            parse_rate_limits(settings.notification_rate_limits),
+            settings.notification_domain_rate_limit,
+            processes or settings.notification_processes
+        )
+
+    def acquire(self, message: OutboxMessage) -> float:
+        """0 when the message may go now, otherwise seconds to defer it by"""
+        bucket = self.channels.get(message.channel)
+        if bucket is not None:
+            wait = bucket.acquire(MAX_RATE_WAIT_SECONDS)
+            if wait:
+                return wait
+        if self.domains is not None:
+            return self.domains[(message.channel, message.domain)].acquire(MAX_RATE_WAIT_SECONDS)
+        return 0.0
+
+
+class OutboxWorker:
+    """
+    Claims and delivers due notifications. One per process; delivery runs on
+    a thread pool while database access stays in the calling thread.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        channels: Optional[Dict[str, NotificationChannel]] = None,
+        threads: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
+        self.session_factory = session_factory
+        self.channels = self._open_channels() if channels is None else channels
+        self.batch_size = batch_size or settings.notification_batch_size
+        self.rate_limiter = rate_limiter or RateLimiter.from_settings()
+        self.executor = ThreadPoolExecutor(max_workers=threads or settings.notification_worker_threads)
+
+    @staticmethod
+    def _open_channels() -> Dict[str, NotificationChannel]:
+        channels = {}
+        for name, factory in channel_factories().items():
+            try:
+                channels[name] = factory()
+            except ChannelNotConfiguredError as e:
+                print(f"Notification channel '{name}' disabled: {e}")
+        return channels
+
+    def claim(self, db: Session) -> List[OutboxMessage]:
+        """
+        Lease up to batch_size due notifications for this worker's channels.
+        The conditional UPDATE only takes rows whose lease is free, so two
+        workers never hold the same row even where SKIP LOCKED isn't available.
+        """
+        if not self.channels:
+            return []
+
+        now = datetime.utcnow()
+        lease_free = or_(Notification.locked_until.is_(None), Notification.locked_until < now)
+        candidates = db.query(Notification.id).filter(
+            Notification.status == NotificationStatus.PENDING,
+            Notification.channel.in_(list(self.channels)),
+            or_(Notification.next_attempt_at.is_(None), Notification.next_attempt_at <= now),
+            lease_free
+        ).order_by(Notification.id).limit(self.batch_size).with_for_update(skip_locked=True).all()
+        if not candidates:
+            db.rollback()
+            return []
+
+        claimed = db.execute(
+            update(Notification)
+            .where(Notification.id.in_([row.id for row in candidates]), lease_free)
+            .values(locked_until=now + timedelta(seconds=settings.notification_lease_seconds))
+            .returning(Notification.id)
+        ).scalars().all()
+        messages = [
+            OutboxMessage(*row) for row in db.query(
+                Notification.id, Notification.employee_id, Employee.email, Notification.channel,
+                Notification.notification_type, Notification.subject, Notification.message, Notification.attempts
+            ).join(Employee, Employee.id == Notification.employee_id).filter(
+                Notification.id.in_(claimed)
+            ).order_by(Notification.id)
+        ] if claimed else []
+        db.commit()
+        return messages
+
+    def deliver(self, message: OutboxMessage) -> dict:
+        """Deliver one message and return its new state as a bulk update row"""
+        now = datetime.utcnow()
+        row = {
+            "id": message.id, "status": NotificationStatus.PENDING, "attempts": message.attempts,
+            "next_attempt_at": None, "locked_until": None, "sent_at": None, "last_error": None,
+        }
+
+        wait = self.rate_limiter.acquire(message)
+        if wait:
+            metrics.increment("outbox.deferred")
+            row["next_attempt_at"] = now + timedelta(seconds=wait)
+            return row
+
+        channel = self.channels[message.channel]
+        try:
+            channel.deliver(message)
+        except Exception as e:
+            row["attempts"] += 1
+            row["last_error"] = f"{type(e).__name__}: {e}"[:1000]
+            if channel.is_transient(e) and row["attempts"] < settings.notification_max_attempts:
+                metrics.increment("outbox.retried")
+                row["next_attempt_at"] = now + timedelta(seconds=retry_delay(row["attempts"]))
+            else:
+                metrics.increment("outbox.failed")
+                row["status"] = NotificationStatus.FAILED
+            return row
+
+        metrics.increment(f"outbox.sent.{message.channel}")
+        row["attempts"] += 1
+        row["status"] = NotificationStatus.SENT
+        row["sent_at"] = datetime.utcnow()
+        return row
+
+    def run_once(self) -> dict:
+        """Claim and deliver one batch; returns claimed, sent, retried and failed counts"""
+        db = self.session_factory()
+        try:
+            messages = self.claim(db)
+            summary = {"claimed": len(messages), "sent": 0, "retried": 0, "failed": 0}
+            if not messages:
+                return summary
+
+            with metrics.timer("outbox.batch"):
+                rows = list(self.executor.map(self.deliver, messages))
+            db.execute(update(Notification), rows)
+            db.commit()
+        finally:
+            db.close()
+
+        previous_attempts = {message.id: message.attempts for message in messages}
+        for row in rows:
+            if row["status"] == NotificationStatus.SENT:
+                summary["sent"] += 1
+            elif row["status"] == NotificationStatus.FAILED:
+                summary["failed"] += 1
+            elif row["attempts"] > previous_attempts[row["id"]]:
+                summary["retried"] += 1
+        return summary
+
+    def drain(self, max_batches: Optional[int] = None) -> dict:
+        """Deliver batches until nothing is due"""
+        totals = {"claimed": 0, "sent": 0, "retried": 0, "failed": 0}
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            summary = self.run_once()
+            batches += 1
+            for key in totals:
+                totals[key] += summary[key]
+            if not summary["claimed"]:
+                break
+        return totals
+
+    def run(self, stop: threading.Event, poll_seconds: Optional[float] = None):
+        """Deliver until stop is set, polling while the outbox is empty"""
+        poll_seconds = settings.notification_poll_seconds if poll_seconds is None else poll_seconds
+        while not stop.is_set():
+            try:
+                if self.run_once()["claimed"]:
+                    continue
+            except Exception as e:
+                print(f"Outbox batch failed: {type(e).__name__}: {e}")
+            stop.wait(poll_seconds)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for channel in self.channels.values():
+            channel.close()
+
+
+def drain_outbox(max_batches: Optional[int] = None) -> dict:
+    """Deliver everything due with a short-lived worker (scheduler and admin runs)"""
+    worker = OutboxWorker()
+    try:
+        return worker.drain(max_batches)
+    finally:
+        worker.close()
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _worker_process(stop, processes):
+    # Only the parent handles signals; workers stop when it sets stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    worker = OutboxWorker(rate_limiter=RateLimiter.from_settings(processes))
+    try:
+        worker.run(stop)
+    finally:
+        worker.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run notification outbox workers")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    # Rate limits are shared by every delivering process, here and on other hosts
+    sharing = max(args.processes, settings.notification_processes)
+    # SIGTERM/Ctrl-C let every worker finish its current batch before exiting
+    signal.signal(signal.SIGTERM, _interrupt)
+    stop = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=_worker_process, args=(stop, sharing)) for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        while any(process.is_alive() for process in processes):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    stop.set()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Compact daily hours per timesheet.
+Alongside its detail rows, a timesheet stores its daily hours and overtime as
+packed arrays: little-endian uint16 centi-hours (0.01 h), one per day from
+period_start to period_end. A weekly timesheet carries two 14-byte arrays in
+its own row, so per-day analytics read timesheets only and never expand into
+timesheet_details.
+
+Timesheets created before packing was enabled, or whose details fall outside
+their period, have NULL arrays; readers fall back to the detail rows for them.
+The arrays only serve per-day reads. total_hours and total_overtime stay
+computed from the detail rows: the arrays are derived from those same rows
+when totals are calculated and are rounded to centi-hours, so they can't be
+a cheaper or more exact source for them.
+Backfill existing timesheets with `python -m app.services.packed_hours`.
+"""
+import argparse
+import sys
+from array import array
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import Timesheet, TimesheetDetail, TimesheetStatus
+
+
+CENTI = 100
+
+
+@dataclass
+class DailyHours:
+    timesheet_id: int
+    employee_id: int
+    client_id: int
+    work_date: date
+    hours: float
+    overtime_hours: float
+
+
+DAILY_HOURS_COLUMNS = ["timesheet_id", "employee_id", "client_id", "work_date", "hours", "overtime_hours"]
+
+
+def pack(values: Sequence[int]) -> bytes:
+    """
+    Pack centi-hour counts as little-endian uint16.
+
+    Raises:
+        OverflowError: If a value is negative or above 655.35 hours
+    """
+    packed = array("H", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack(blob: bytes) -> array:
+    values = array("H")
+    values.frombytes(blob)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def pack_days(
+    period_start: date,
+    period_end: date,
+    days: Iterable[Tuple[date, Optional[float], Optional[float]]]
+) -> Optional[Tuple[bytes, bytes]]:
+    """
+    Pack (work_date, hours, overtime) entries into hours and overtime arrays.
+    Entries on the same day are summed.
+
+    Returns:
+        tuple: (hours, overtime) arrays, or None if an entry falls outside the period
+    """
+    length = (period_end - period_start).days + 1
+    if length <= 0:
+        return None
+    hours = [0] * length
+    overtime = [0] * length
+    for work_date, day_hours, day_overtime in days:
+        offset = (work_date - period_start).days
+        if not 0 <= offset < length:
+            return None
+        hours[offset] += round((day_hours or 0.0) * CENTI)
+        overtime[offset] += round((day_overtime or 0.0) * CENTI)
+    try:
+        return pack(hours), pack(overtime)
+    except OverflowError:
+        return None
+
+
+def pack_timesheet(timesheet: Timesheet) -> bool:
+    """Store the packed arrays of timesheet's details; returns whether it could be packed"""
+    packed = pack_days(
+        timesheet.period_start, timesheet.period_end,
+        ((detail.work_date, detail.hours, detail.overtime_hours) for detail in timesheet.details)
+    )
+    timesheet.packed_hours, timesheet.packed_overtime = packed or (None, None)
+    return packed is not None
+
+
+def _unpacked_days(timesheet_id, employee_id, client_id, period_start, hours_blob, overtime_blob) -> Iterator[DailyHours]:
+    for offset, (hours, overtime) in enumerate(zip(unpack(hours_blob), unpack(overtime_blob))):
+        if hours or overtime:
+            yield DailyHours(
+                timesheet_id, employee_id, client_id, period_start + timedelta(days=offset),
+                hours / CENTI, overtime / CENTI
+            )
+
+
+def iter_daily_hours(
+    db: Session,
+    start: date,
+    end: date,
+    client_ids: Optional[Iterable[int]] = None,
+    employee_ids: Optional[Iterable[int]] = None,
+    statuses: Sequence[TimesheetStatus] = (TimesheetStatus.APPROVED,),
+    batch_size: int = 1000
+) -> Iterator[DailyHours]:
+    """
+    Stream the worked days of timesheets whose period starts within [start, end].
+    Packed timesheets come first, straight from the timesheets table; the
+    remaining ones are read from their detail rows. Days without hours are skipped.
+    """
+    criteria = [
+        Timesheet.status.in_(list(statuses)),
+        Timesheet.period_start >= start,
+        Timesheet.period_start <= end
+    ]
+    if client_ids is not None:
+        criteria.append(Timesheet.client_id.in_(list(client_ids)))
+    if employee_ids is not None:
+        criteria.append(Timesheet.employee_id.in_(list(employee_ids)))
+
+    packed = db.execute(
+        select(
+            Timesheet.id, Timesheet.employee_id, Timesheet.client_id, Timesheet.period_start,
+            Timesheet.packed_hours, Timesheet.packed_overtime
+        )
+        .where(Timesheet.packed_hours.is_not(None), *criteria)
+        .order_by(Timesheet.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in packed:
+        yield from _unpacked_days(*row)
+
+    details = db.execute(
+        select(
+            Timesheet.id, Timesheet.employee_id, Timesheet.client_id, TimesheetDetail.work_date,
+            TimesheetDetail.hours, TimesheetDetail.overtime_hours
+        )
+        .join(TimesheetDetail, TimesheetDetail.timesheet_id == Timesheet.id)
+        .where(Timesheet.packed_hours.is_(None), *criteria)
+        .order_by(Timesheet.id, TimesheetDetail.work_date)
+        .execution_options(yield_per=batch_size)
+    )
+    for timesheet_id, employee_id, client_id, work_date, hours, overtime in details:
+        yield DailyHours(timesheet_id, employee_id, client_id, work_date, hours or 0.0, overtime or 0.0)
+
+
+def backfill_packed_hours(db: Session, batch_size: int = 500) -> Tuple[int, int]:
+    """
+    Pack every timesheet that has no arrays yet, committing per batch.
+
+    Returns:
+        tuple: (packed, skipped) counts; skipped timesheets have details outside their period
+    """
+    packed = skipped = 0
+    last_id = 0
+    while True:
+        batch: List[Timesheet] = db.scalars(
+            select(Timesheet)
+            .options(selectinload(Timesheet.details))
+            .where(Timesheet.packed_hours.is_(None), Timesheet.id > last_id)
+            .order_by(Timesheet.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return packed, skipped
+        for timesheet in batch:
+            if pack_timesheet(timesheet):
+                packed += 1
+            else:
+                skipped += 1
+        last_id = batch[-1].id
+        db.commit()
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Pack daily hours of timesheets stored only as detail rows")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        packed, skipped = backfill_packed_hours(db, args.batch_size)
+        print(f"Packed {packed} timesheets, skipped {skipped} with details outside their period")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
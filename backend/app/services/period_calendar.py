@@ -0,0 +1,164 @@
+"""
+Canonical pay-period calendar.
+Period boundaries for a (frequency, week_start_day, anchor) are generated
+once for a multi-year window and looked up by binary search, so finding the
+period of a date or the periods overlapping a range is O(log n).
+
+Weekly periods start on the week start day, biweekly periods run every 14
+days from the anchor (aligned to the week start day) and monthly periods
+are calendar months.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from threading import Lock
+from typing import List, Optional, Union
+
+from dateutil.relativedelta import relativedelta
+
+from app.config import settings
+from app.models import SubmissionFrequency
+
+
+# Window generated up front around today; lookups outside it extend the window
+YEARS_BEFORE = 5
+YEARS_AFTER = 2
+
+PERIOD_DAYS = {
+    SubmissionFrequency.WEEKLY: 7,
+    SubmissionFrequency.BIWEEKLY: 14,
+}
+
+
+@dataclass(frozen=True)
+class Period:
+    start: date
+    end: date
+
+    def __contains__(self, day: date) -> bool:
+        return self.start <= day <= self.end
+
+
+def day_of_week(day: date) -> int:
+    """Day of week with the repo's numbering, 0=Sunday to 6=Saturday"""
+    return (day.weekday() + 1) % 7
+
+
+def align_to_week_start(day: date, week_start_day: int) -> date:
+    """Latest week start day on or before day"""
+    return day - timedelta(days=(day_of_week(day) - week_start_day) % 7)
+
+
+class PeriodCalendar:
+    """Sorted period start ordinals for one frequency/week start/anchor"""
+
+    def __init__(
+        self,
+        frequency: SubmissionFrequency,
+        week_start_day: int = 1,
+        anchor: Optional[date] = None,
+        today: Optional[date] = None
+    ):
+        self.frequency = SubmissionFrequency(frequency)
+        self.week_start_day = week_start_day % 7
+        anchor = anchor or settings.pay_period_anchor
+        if self.frequency == SubmissionFrequency.MONTHLY:
+            self.anchor = anchor.replace(day=1)
+        else:
+            self.anchor = align_to_week_start(anchor, self.week_start_day)
+
+        today = today or date.today()
+        self._lock = Lock()
+        self._starts: List[int] = []
+        self._generate(today - relativedelta(years=YEARS_BEFORE), today + relativedelta(years=YEARS_AFTER))
+
+    def _start_on_or_before(self, day: date) -> date:
+        if self.frequency == SubmissionFrequency.MONTHLY:
+            return day.replace(day=1)
+        length = PERIOD_DAYS[self.frequency]
+        return self.anchor + timedelta(days=((day - self.anchor).days // length) * length)
+
+    def _next_start(self, start: date) -> date:
+        if self.frequency == SubmissionFrequency.MONTHLY:
+            return start + relativedelta(months=1)
+        return start + timedelta(days=PERIOD_DAYS[self.frequency])
+
+    def _generate(self, first: date, last: date):
+        """(Re)build the boundaries so the window covers first..last, plus one period after"""
+        if self._starts:
+            first = min(first, date.fromordinal(self._starts[0]))
+            last = max(last, date.fromordinal(self._starts[-1]))
+
+        starts = []
+        current = self._start_on_or_before(first)
+        while current <= last:
+            starts.append(current.toordinal())
+            current = self._next_start(current)
+        # Sentinel start so every generated period has an end
+        starts.append(current.toordinal())
+        self._starts = starts
+
+    def _covering(self, first: date, last: date) -> List[int]:
+        """Boundaries covering first..last; callers keep using the returned list"""
+        starts = self._starts
+        if first.toordinal() < starts[0] or last.toordinal() >= starts[-1]:
+            with self._lock:
+                self._generate(first, last)
+                starts = self._starts
+        return starts
+
+    @staticmethod
+    def _period_at(starts: List[int], index: int) -> Period:
+        return Period(date.fromordinal(starts[index]), date.fromordinal(starts[index + 1] - 1))
+
+    @property
+    def window(self) -> Period:
+        """Range currently covered by precomputed periods"""
+        starts = self._starts
+        return Period(date.fromordinal(starts[0]), date.fromordinal(starts[-1] - 1))
+
+    def period_for(self, day: date) -> Period:
+        """The period containing day"""
+        starts = self._covering(day, day)
+        return self._period_at(starts, bisect_right(starts, day.toordinal()) - 1)
+
+    def periods_in(self, start: date, end: date) -> List[Period]:
+        """All periods overlapping start..end, in order"""
+        if end < start:
+            return []
+        starts = self._covering(start, end)
+        first = bisect_right(starts, start.toordinal()) - 1
+        last = bisect_left(starts, end.toordinal() + 1)
+        return [self._period_at(starts, i) for i in range(first, last)]
+
+    def is_canonical(self, start: date, end: date) -> bool:
+        """Whether start..end is exactly one period"""
+        period = self.period_for(start)
+        return period.start == start and period.end == end
+
+
+@lru_cache(maxsize=256)
+def _calendar(frequency: SubmissionFrequency, week_start_day: int, anchor: date) -> PeriodCalendar:
+    return PeriodCalendar(frequency, week_start_day, anchor)
+
+
+def get_period_calendar(
+    frequency: Union[SubmissionFrequency, str, None],
+    week_start_day: Optional[int] = None,
+    anchor: Optional[date] = None
+) -> PeriodCalendar:
+    """
+    Shared calendar for a frequency, week start day (0=Sunday) and anchor.
+    Missing values fall back to weekly, Monday and pay_period_anchor.
+    """
+    return _calendar(
+        SubmissionFrequency(frequency or SubmissionFrequency.WEEKLY),
+        1 if week_start_day is None else week_start_day % 7,
+        anchor or settings.pay_period_anchor
+    )
+
+
+def client_calendar(client) -> PeriodCalendar:
+    """Calendar for a client's submission frequency and week start day"""
+    return get_period_calendar(client.default_submission_frequency, client.week_start_day)
@@ -0,0 +1,252 @@
+"""
+Thumbnail and first-page previews for uploaded JPG/PDF timesheets.
+Previews are rendered lazily on a process pool and cached on disk by content
+hash and size, with least-recently-used eviction once the cache outgrows
+preview_cache_max_mb. Pillow and PyMuPDF are optional; without them previews
+are simply unavailable.
+"""
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+# Pillow and PyMuPDF are loaded on first use, they're slow to import
+Image = None
+pymupdf = None
+_imaging_loaded = False
+
+
+def _load_imaging():
+    global Image, pymupdf, _imaging_loaded
+    if _imaging_loaded:
+        return
+
+    try:
+        from PIL import Image
+    except ImportError:  # Optional: pip install timesheetpro-backend[previews]
+        Image = None
+
+    try:
+        import pymupdf
+    except ImportError:
+        try:
+            import fitz as pymupdf
+        except ImportError:
+            pymupdf = None
+
+    _imaging_loaded = True
+
+
+# Longest edge in pixels for each preview size
+PREVIEW_SIZES = {
+    "thumb": 256,
+    "preview": 1024,
+}
+
+JPEG_QUALITY = 80
+
+# How long a request waits for a render before giving up
+RENDER_TIMEOUT_SECONDS = 30
+
+
+class PreviewUnavailableError(ValueError):
+    """No preview can be produced for this file"""
+
+
+def can_preview(file_format: str) -> bool:
+    _load_imaging()
+    if file_format == "jpg":
+        return Image is not None
+    if file_format == "pdf":
+        return Image is not None and pymupdf is not None
+    return False
+
+
+def render_preview(source_path: str, file_format: str, max_edge: int, target_path: str) -> int:
+    """
+    Render a downscaled JPEG of an image or of the first page of a PDF.
+    Runs in a worker process.
+
+    Returns:
+        Size of the written preview in bytes
+    """
+    _load_imaging()
+    if file_format == "pdf":
+        with pymupdf.open(source_path) as document:
+            if document.page_count == 0:
+                raise PreviewUnavailableError("PDF has no pages")
+            page = document.load_page(0)
+            zoom = max_edge / max(page.rect.width, page.rect.height)
+            pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+            image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    else:
+        image = Image.open(source_path)
+        # Let the JPEG decoder downscale while decoding instead of loading full resolution
+        image.draft("RGB", (max_edge, max_edge))
+        image = image.convert("RGB")
+        image.thumbnail((max_edge, max_edge))
+
+    fd, tmp_name = tempfile.mkstemp(dir=os.path.dirname(target_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            image.save(f, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        os.replace(tmp_name, target_path)
+    finally:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+
+    return os.path.getsize(target_path)
+
+
+class PreviewCache:
+    """
+    Disk cache of rendered previews keyed by content hash and size.
+
+    Reads touch the file's mtime, so eviction removes the least recently
+    used previews first. The total size is scanned once and then tracked
+    in memory.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+
+    def path_for(self, digest: str, size: str) -> Path:
+        return self.root / digest[:2] / f"{digest}-{size}.jpg"
+
+    def get(self, digest: str, size: str) -> Optional[Path]:
+        path = self.path_for(digest, size)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def _scan(self) -> int:
+        return sum(path.stat().st_size for path in self.root.rglob("*.jpg"))
+
+    def added(self, nbytes: int):
+        """Account for a newly written preview and evict if over budget"""
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan()
+            else:
+                self._total += nbytes
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Drop oldest-used previews until 90% of the budget is free again
+        target = int(self.max_bytes * 0.9)
+        entries = []
+        for path in self.root.rglob("*.jpg"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except FileNotFoundError:
+                continue
+        self._total = total
+
+
+class PreviewService:
+    """Renders previews on a worker pool, one render per (digest, size) at a time"""
+
+    def __init__(self, cache: PreviewCache, workers: int):
+        self.cache = cache
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Re-entrant: an inline render completes its future, and runs the callback, while the lock is held
+        self._lock = threading.RLock()
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+
+    def _submit(self, source_path: str, file_format: str, max_edge: int, target: Path) -> Future:
+        if self.workers <= 0:
+            future = Future()
+            try:
+                future.set_result(render_preview(source_path, file_format, max_edge, str(target)))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor.submit(render_preview, source_path, file_format, max_edge, str(target))
+
+    def get_preview(self, digest: str, source_path: str, file_format: str, size: str = "thumb") -> Path:
+        """
+        Path of the cached preview, rendering it first if needed.
+
+        Raises:
+            PreviewUnavailableError: Unsupported format, missing libraries or an unreadable file
+        """
+        if size not in PREVIEW_SIZES:
+            raise PreviewUnavailableError(f"Unknown preview size '{size}'")
+        if not can_preview(file_format):
+            raise PreviewUnavailableError(f"Previews are not available for {file_format.upper()} files")
+
+        cached = self.cache.get(digest, size)
+        if cached:
+            return cached
+
+        key = (digest, size)
+        target = self.cache.path_for(digest, size)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                future = self._submit(source_path, file_format, PREVIEW_SIZES[size], target)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda f, key=key: self._finished(key, f))
+
+        try:
+            future.result(timeout=RENDER_TIMEOUT_SECONDS)
+        except PreviewUnavailableError:
+            raise
+        except Exception as e:
+            raise PreviewUnavailableError(f"Could not render preview: {e}")
+        return target
+
+    def _finished(self, key: Tuple[str, str], future: Future):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.cache.added(future.result())
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_service: Optional[PreviewService] = None
+
+
+def get_preview_service() -> PreviewService:
+    """Shared preview service, created on first use"""
+    global _service
+    if _service is None:
+        cache = PreviewCache(settings.preview_cache_dir, settings.preview_cache_max_mb * 1024 * 1024)
+        _service = PreviewService(cache, settings.preview_workers)
+    return _service
+
+
+def shutdown_preview_service():
+    global _service
+    if _service is not None:
+        _service.shutdown()
+        _service = None
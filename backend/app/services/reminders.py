@@ -0,0 +1,98 @@
+"""
+Overdue timesheet reminders.
+Employees owing timesheets are found with the missing-timesheet query and one
+reminder per employee is bulk-inserted into the notification outbox. Runs are
+serialized with a transaction-scoped advisory lock on PostgreSQL, so two
+scheduler workers cannot both see an employee as unreminded and queue twice.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Client, Notification, NotificationStatus
+from app.services.missing_timesheets import MissingTimesheet, iter_missing_timesheets
+from app.utils.metrics import metrics
+
+
+REMINDER_TYPE = "timesheet_reminder"
+REMINDER_SUBJECT = "Overdue timesheets"
+
+# Advisory lock key held while a reminder run reads and inserts
+REMINDER_LOCK_ID = 7_301_001
+
+
+def lock_reminder_run(db: Session) -> None:
+    """
+    Wait for any other reminder run to commit. The lock is released when the
+    transaction ends; SQLite serializes writers itself, so nothing is taken there.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": REMINDER_LOCK_ID})
+
+
+def format_reminder(periods: List[MissingTimesheet], client_names: Dict[int, str]) -> str:
+    lines = ["The following timesheets have not been submitted yet:", ""]
+    for missing in periods:
+        lines.append(
+            f"- {client_names.get(missing.client_id, f'Client {missing.client_id}')}: "
+            f"{missing.period_start.isoformat()} to {missing.period_end.isoformat()}"
+        )
+    lines += ["", "Please submit them as soon as possible."]
+    return "\n".join(lines)
+
+
+def create_overdue_reminders(db: Session, today: Optional[date] = None) -> int:
+    """
+    Queue one reminder per employee with overdue timesheets.
+
+    A period is overdue once it ended more than reminder_grace_days ago
+    without a submitted or approved timesheet; only the last
+    reminder_lookback_days are considered. Employees reminded within
+    reminder_interval_hours are skipped. Concurrent runs wait for each other,
+    so the later one sees the reminders the earlier one created.
+
+    Returns:
+        int: Number of notifications created
+    """
+    today = today or date.today()
+    due_by = today - timedelta(days=settings.reminder_grace_days)
+    since = today - timedelta(days=settings.reminder_lookback_days)
+
+    lock_reminder_run(db)
+    reminded = {
+        employee_id for (employee_id,) in db.query(Notification.employee_id).filter(
+            Notification.notification_type == REMINDER_TYPE,
+            Notification.created_at >= datetime.utcnow() - timedelta(hours=settings.reminder_interval_hours)
+        ).distinct()
+    }
+
+    overdue = defaultdict(list)
+    for missing in iter_missing_timesheets(db, since, due_by, submitted_only=True):
+        if missing.period_end <= due_by and missing.employee_id not in reminded:
+            overdue[missing.employee_id].append(missing)
+    if not overdue:
+        # Release the lock
+        db.commit()
+        return 0
+
+    client_ids = {missing.client_id for periods in overdue.values() for missing in periods}
+    client_names = dict(db.query(Client.id, Client.name).filter(Client.id.in_(client_ids)).all())
+
+    db.execute(insert(Notification), [
+        {
+            "employee_id": employee_id,
+            "notification_type": REMINDER_TYPE,
+            "subject": REMINDER_SUBJECT,
+            "message": format_reminder(periods, client_names),
+            "status": NotificationStatus.PENDING,
+        }
+        for employee_id, periods in overdue.items()
+    ])
+    db.commit()
+
+    metrics.increment("reminders.created", len(overdue))
+    return len(overdue)
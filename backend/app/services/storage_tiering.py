@@ -0,0 +1,368 @@
+"""
+Hot/cold tiering for stored timesheet files.
+Blobs older than archive_after_months are compressed into per-month pack files
+on the archive backend and their hot copies removed. Cold blobs are streamed
+back from their pack on demand, or restored to disk for callers needing a path.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import uuid
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import StoredBlob, StorageTier, TimesheetUpload
+from app.services import file_storage
+from app.services.archive_backend import ArchiveBackend, get_archive_backend
+from app.services.blob_store import PendingUpload, acquire_blobs, sweep_unreferenced_blobs
+
+try:
+    import zstandard
+except ImportError:  # Optional: packs fall back to zlib
+    zstandard = None
+
+
+# Largest pack written in one go; bigger months are split across packs
+PACK_MAX_BYTES = 512 * 1024 * 1024
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def _compressor(codec: str):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compressobj()
+    if codec == "zlib":
+        return zlib.compressobj(6)
+    raise ValueError(f"Unsupported compression '{codec}'")
+
+
+def _decompressor(codec: str):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed archives")
+        return zstandard.ZstdDecompressor().decompressobj()
+    if codec == "zlib":
+        return zlib.decompressobj()
+    raise ValueError(f"Unsupported compression '{codec}'")
+
+
+class _DecompressingReader(io.RawIOBase):
+    """Readable stream that decompresses a compressed member on the fly"""
+
+    def __init__(self, raw: BinaryIO, codec: str):
+        self._raw = raw
+        self._decompressor = _decompressor(codec)
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            compressed = self._raw.read(file_storage.CHUNK_SIZE)
+            if not compressed:
+                return 0
+            self._buffer = self._decompressor.decompress(compressed)
+        count = min(len(buffer), len(self._buffer))
+        buffer[:count] = self._buffer[:count]
+        self._buffer = self._buffer[count:]
+        return count
+
+    def close(self):
+        self._raw.close()
+        super().close()
+
+
+def _cold_blob(db: Session, digest: str) -> Optional[StoredBlob]:
+    return db.query(StoredBlob).filter(
+        StoredBlob.digest == digest,
+        StoredBlob.tier == StorageTier.COLD
+    ).first()
+
+
+def open_cold_blob(blob: StoredBlob, backend: Optional[ArchiveBackend] = None) -> BinaryIO:
+    """Stream the decompressed content of a cold blob straight from its pack"""
+    backend = backend or get_archive_backend()
+    raw = backend.open_range(blob.archive_key, blob.archive_offset, blob.archive_length)
+    return io.BufferedReader(_DecompressingReader(raw, blob.compression), buffer_size=file_storage.CHUNK_SIZE)
+
+
+def restore_blob(digest: str, db: Optional[Session] = None, backend: Optional[ArchiveBackend] = None) -> Optional[Path]:
+    """
+    Write a cold blob back to its hot path so it can be opened by path.
+    The content is verified against its digest. Restored copies are removed
+    again by the archive job after archive_restore_hours.
+
+    Returns:
+        Path of the restored file, or None if the digest isn't archived
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        blob = _cold_blob(db, digest)
+        if not blob:
+            return None
+
+        target = Path(blob.file_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent)
+        sha256 = hashlib.sha256()
+        try:
+            with os.fdopen(fd, "wb") as out, open_cold_blob(blob, backend) as stream:
+                for chunk in iter(lambda: stream.read(file_storage.CHUNK_SIZE), b""):
+                    sha256.update(chunk)
+                    out.write(chunk)
+            if sha256.hexdigest() != digest:
+                raise IOError(f"Archived content for {digest} failed verification")
+            os.replace(tmp_name, target)
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+        return target
+    finally:
+        if own_session:
+            db.close()
+
+
+def open_stored_file(file_path_str: str, db: Optional[Session] = None) -> Optional[BinaryIO]:
+    """
+    Open a stored file for reading whichever tier it is in.
+    Hot files are opened directly; cold blobs are streamed from the archive
+    without being written back to disk.
+
+    Returns:
+        Binary stream, or None if the file is neither on disk nor archived
+    """
+    file_path = Path(file_path_str)
+    if file_path.is_file():
+        return open(file_path, "rb")
+
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        blob = _cold_blob(db, file_path.name)
+        return open_cold_blob(blob) if blob else None
+    finally:
+        if own_session:
+            db.close()
+
+
+def _remove_hot_copy(file_path: str):
+    """Delete a hot file and any blob directories left empty"""
+    path = Path(file_path)
+    file_storage.delete_file(file_path)
+    for parent in (path.parent, path.parent.parent):
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+
+
+def _write_pack(blobs: List[StoredBlob], codec: str, tmp_dir: Path) -> tuple:
+    """
+    Compress blobs one after another into a temporary pack file.
+
+    Returns:
+        tuple: (pack path, index entries for the blobs that were packed)
+    """
+    fd, pack_path = tempfile.mkstemp(dir=tmp_dir, suffix=".pack")
+    entries = []
+    with os.fdopen(fd, "wb") as pack:
+        for blob in blobs:
+            source = Path(blob.file_path)
+            if not source.is_file():
+                print(f"Skipping blob {blob.digest}: hot file missing at {source}")
+                continue
+
+            offset = pack.tell()
+            compressor = _compressor(codec)
+            with open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(file_storage.CHUNK_SIZE), b""):
+                    pack.write(compressor.compress(chunk))
+            pack.write(compressor.flush())
+            entries.append({
+                "digest": blob.digest,
+                "offset": offset,
+                "length": pack.tell() - offset,
+                "size": blob.size,
+                "compression": codec
+            })
+    return pack_path, entries
+
+
+def _pack_groups(blobs: List[StoredBlob]) -> List[tuple]:
+    """Split blobs into (month, blobs) groups no bigger than PACK_MAX_BYTES"""
+    by_month = defaultdict(list)
+    for blob in blobs:
+        by_month[blob.created_at.strftime("%Y-%m")].append(blob)
+
+    groups = []
+    for month, month_blobs in sorted(by_month.items()):
+        current, size = [], 0
+        for blob in month_blobs:
+            if current and size + blob.size > PACK_MAX_BYTES:
+                groups.append((month, current))
+                current, size = [], 0
+            current.append(blob)
+            size += blob.size
+        groups.append((month, current))
+    return groups
+
+
+def adopt_legacy_uploads(db: Session) -> int:
+    """
+    Move uploads stored before content addressing into the blob store so
+    they can be tiered like everything else.
+
+    Returns:
+        Number of uploads adopted
+    """
+    adopted = 0
+    uploads = db.query(TimesheetUpload).filter(TimesheetUpload.content_hash.is_(None)).all()
+
+    for upload in uploads:
+        source = Path(upload.file_path)
+        if not source.is_file():
+            continue
+
+        with open(source, "rb") as f:
+            digest, blob_path, size = file_storage.write_blob(iter(lambda: f.read(file_storage.CHUNK_SIZE), b""))
+
+        acquire_blobs(db, [PendingUpload(
+            employee_id=upload.employee_id,
+            original_filename=upload.file_name,
+            file_format=upload.file_format,
+            source=upload.source,
+            digest=digest,
+            file_path=blob_path,
+            size=size
+        )])
+        upload.content_hash = digest
+        upload.file_size = size
+        upload.file_path = blob_path
+        db.commit()
+
+        if str(source) != blob_path:
+            file_storage.delete_file(str(source))
+        adopted += 1
+
+    return adopted
+
+
+def archive_cold_blobs(
+    db: Session,
+    older_than_months: Optional[int] = None,
+    backend: Optional[ArchiveBackend] = None,
+    now: Optional[datetime] = None
+) -> dict:
+    """
+    Pack hot blobs older than the cutoff into per-month archive files.
+
+    Each pack gets a JSON index stored next to it (key + '.idx') so an
+    archive can be read without the database. Blob rows are switched to
+    COLD and the hot files deleted only after the pack is stored.
+
+    Args:
+        db: Database session
+        older_than_months: Age cutoff, defaults to archive_after_months
+        backend: Archive backend, defaults to the configured one
+        now: Reference time, defaults to utcnow
+
+    Returns:
+        dict: blobs archived, packs written, bytes before/after, restored copies removed
+    """
+    backend = backend or get_archive_backend()
+    now = now or datetime.utcnow()
+    months = settings.archive_after_months if older_than_months is None else older_than_months
+    cutoff = now - relativedelta(months=months)
+    codec = default_codec()
+
+    summary = {"archived": 0, "packs": 0, "bytes_before": 0, "bytes_after": 0, "restored_removed": 0}
+
+    blobs = db.query(StoredBlob).filter(
+        StoredBlob.tier == StorageTier.HOT,
+        StoredBlob.created_at < cutoff,
+        StoredBlob.ref_count > 0
+    ).order_by(StoredBlob.created_at).all()
+
+    tmp_dir = file_storage.BLOB_DIR / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    for month, group in _pack_groups(blobs):
+        pack_path, entries = _write_pack(group, codec, tmp_dir)
+        index_path = pack_path + ".idx"
+        try:
+            if not entries:
+                continue
+
+            key = f"{month}/pack-{now.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.pack"
+            with open(index_path, "w") as f:
+                json.dump({"key": key, "blobs": entries}, f)
+            backend.put(key, pack_path)
+            backend.put(key + ".idx", index_path)
+
+            by_digest = {blob.digest: blob for blob in group}
+            for entry in entries:
+                blob = by_digest[entry["digest"]]
+                blob.tier = StorageTier.COLD
+                blob.archive_key = key
+                blob.archive_offset = entry["offset"]
+                blob.archive_length = entry["length"]
+                blob.compression = codec
+                blob.archived_at = now
+            db.commit()
+
+            for entry in entries:
+                _remove_hot_copy(by_digest[entry["digest"]].file_path)
+                summary["bytes_before"] += entry["size"]
+                summary["bytes_after"] += entry["length"]
+
+            summary["archived"] += len(entries)
+            summary["packs"] += 1
+        finally:
+            for path in (pack_path, index_path):
+                if os.path.exists(path):
+                    os.unlink(path)
+
+    summary["restored_removed"] = prune_restored_copies(db, now)
+    return summary
+
+
+def prune_restored_copies(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete hot copies of cold blobs not touched for archive_restore_hours"""
+    now = now or datetime.utcnow()
+    expires = (now - timedelta(hours=settings.archive_restore_hours)).timestamp()
+    removed = 0
+
+    for (file_path,) in db.query(StoredBlob.file_path).filter(StoredBlob.tier == StorageTier.COLD).yield_per(1000):
+        path = Path(file_path)
+        try:
+            if path.stat().st_mtime < expires:
+                _remove_hot_copy(file_path)
+                removed += 1
+        except FileNotFoundError:
+            continue
+
+    return removed
+
+
+def run_storage_tiering(db: Session) -> dict:
+    """Scheduled entry point: adopt legacy files, sweep unreferenced blobs, then archive old ones"""
+    adopted = adopt_legacy_uploads(db)
+    swept = sweep_unreferenced_blobs(db)
+    summary = archive_cold_blobs(db)
+    summary["legacy_adopted"] = adopted
+    summary["blobs_swept"] = swept
+    return summary
@@ -0,0 +1,461 @@
+"""
+Timesheet parsing pipeline.
+Claims PENDING uploads in batches, extracts work rows from the stored files in a
+process pool and turns them into draft Timesheet/TimesheetDetail records.
+"""
+import importlib
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import (
+    Client, EmployeeClientAssignment, Timesheet, TimesheetDetail,
+    TimesheetStatus, TimesheetUpload, UploadStatus
+)
+from app.services.batch_upload import load_employees
+from app.services.events import publish_upload_event
+from app.services.packed_hours import pack_timesheet
+from app.services.file_storage import get_file_path
+from app.services.period_calendar import client_calendar
+from app.services.upload_stats import invalidate_upload_stats
+from app.utils.metrics import metrics
+
+
+class ExtractionError(ValueError):
+    """The file could not be turned into timesheet rows"""
+
+
+@dataclass
+class ParsedRow:
+    """One day of work read from a timesheet file"""
+    work_date: date
+    hours: float
+    overtime_hours: float = 0.0
+    description: Optional[str] = None
+    client_code: Optional[str] = None
+    employee_key: Optional[str] = None  # Email or id, for exports covering several employees
+
+
+def parse_csv(file_path: str) -> List[ParsedRow]:
+    """
+    Read timesheet rows from a CSV export.
+
+    The file is read column-wise by csv_ingest and totalled per employee,
+    client and day, so an export with many entries per day yields one row
+    per day. Exports covering several employees carry the employee key
+    (email or id) on each row.
+
+    Raises:
+        ExtractionError: Required columns are missing or any row is invalid
+    """
+    # Imported here so numpy only loads in processes that parse
+    from app.services.csv_ingest import CsvLayoutError, aggregate_csv
+
+    try:
+        summary = aggregate_csv(file_path, period="day")
+    except CsvLayoutError as e:
+        raise ExtractionError(str(e))
+
+    if summary.errors:
+        more = summary.invalid_rows - len(summary.errors)
+        raise ExtractionError("; ".join(summary.errors) + (f" (+{more} more)" if more > 0 else ""))
+
+    return [
+        ParsedRow(
+            work_date=total.first_date,
+            hours=total.hours,
+            overtime_hours=total.overtime_hours,
+            description=total.description,
+            client_code=total.client_code,
+            employee_key=total.employee_key
+        )
+        for total in summary.totals
+    ]
+
+
+def unconfigured_extractor(file_path: str) -> List[ParsedRow]:
+    """Default for scanned formats until an OCR/document extractor is configured"""
+    raise ExtractionError("No document extractor is configured for this file format")
+
+
+_EXTRACTORS: Dict[str, Callable[[str], List[ParsedRow]]] = {
+    "csv": parse_csv,
+}
+
+
+def register_extractor(file_format: str, extractor: Callable[[str], List[ParsedRow]]):
+    """
+    Register the extractor used for a file format.
+    Must be called before the worker pool starts so workers inherit it.
+    """
+    _EXTRACTORS[file_format] = extractor
+
+
+def load_extractor(path: str) -> Callable[[str], List[ParsedRow]]:
+    """Import an extractor from a 'module:function' path"""
+    module_name, _, attr = path.partition(":")
+    if not attr:
+        raise ExtractionError(f"Extractor path '{path}' must look like 'package.module:function'")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def get_extractor(file_format: str, document_extractor: Optional[str] = None) -> Callable[[str], List[ParsedRow]]:
+    """
+    Extractor for a file format: a registered one first, then the configured
+    document extractor, then the unconfigured default.
+    """
+    if file_format in _EXTRACTORS:
+        return _EXTRACTORS[file_format]
+    if document_extractor:
+        return load_extractor(document_extractor)
+    return unconfigured_extractor
+
+
+def extract_rows(file_path: str, file_format: str, document_extractor: Optional[str] = None) -> Tuple[List[ParsedRow], float]:
+    """
+    Worker entry point: run the extractor for one file.
+
+    Returns:
+        tuple: (rows, seconds spent extracting)
+    """
+    start = time.perf_counter()
+    rows = get_extractor(file_format, document_extractor)(file_path)
+    return rows, time.perf_counter() - start
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> Optional[Executor]:
+    """
+    Shared process pool for extraction, created on first use.
+    Returns None when parsing_workers is 0, meaning extract in-process.
+    """
+    global _executor
+    if settings.parsing_workers <= 0:
+        return None
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.parsing_workers)
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def claim_pending_uploads(db: Session, batch_size: int) -> List[TimesheetUpload]:
+    """
+    Move up to batch_size uploads to PROCESSING and return them.
+
+    Rows are locked with SKIP LOCKED so concurrent workers claim disjoint
+    batches. Uploads stuck in PROCESSING longer than parsing_stale_minutes
+    (e.g. after a crash) are claimed again.
+    """
+    stale_before = datetime.utcnow() - timedelta(minutes=settings.parsing_stale_minutes)
+
+    uploads = db.query(TimesheetUpload).filter(
+        or_(
+            TimesheetUpload.status == UploadStatus.PENDING,
+            and_(
+                TimesheetUpload.status == UploadStatus.PROCESSING,
+                TimesheetUpload.updated_at < stale_before
+            )
+        )
+    ).order_by(TimesheetUpload.id).limit(batch_size).with_for_update(skip_locked=True).all()
+
+    for upload in uploads:
+        upload.status = UploadStatus.PROCESSING
+        upload.error_message = None
+        upload.updated_at = datetime.utcnow()
+        publish_upload_event(db, upload, "upload.processing")
+
+    db.commit()
+    if uploads:
+        invalidate_upload_stats()
+    return uploads
+
+
+def resolve_employees(db: Session, upload: TimesheetUpload, rows: List[ParsedRow]) -> Dict[Optional[str], int]:
+    """
+    Map each employee key used in rows to an employee id.
+    Rows without a key belong to the upload's employee.
+
+    Raises:
+        ExtractionError: A key matches no active employee
+    """
+    keys = {row.employee_key for row in rows if row.employee_key}
+    resolved = {None: upload.employee_id}
+
+    if keys:
+        found = load_employees(db, list(keys))
+        missing = {key for key in keys if key.lower() not in found}
+        if missing:
+            raise ExtractionError(f"Unknown employee(s): {', '.join(sorted(missing))}")
+        resolved.update({key: found[key.lower()] for key in keys})
+
+    return resolved
+
+
+def resolve_clients(db: Session, rows: List[Tuple[int, ParsedRow]]) -> Dict[Tuple[int, Optional[str]], int]:
+    """
+    Map each (employee id, client code) pair in rows to a client id.
+    Rows without a code fall back to the employee's only active assignment.
+
+    Raises:
+        ExtractionError: A code is unknown or the client is ambiguous
+    """
+    codes = {row.client_code for _, row in rows if row.client_code}
+    found = {}
+
+    if codes:
+        found = dict(db.query(Client.code, Client.id).filter(Client.code.in_(codes)).all())
+        missing = codes - set(found)
+        if missing:
+            raise ExtractionError(f"Unknown client code(s): {', '.join(sorted(missing))}")
+
+    resolved = {(employee_id, row.client_code): found[row.client_code] for employee_id, row in rows if row.client_code}
+
+    uncoded = {employee_id for employee_id, row in rows if not row.client_code}
+    if uncoded:
+        assignments = defaultdict(set)
+        for employee_id, client_id in db.query(
+            EmployeeClientAssignment.employee_id, EmployeeClientAssignment.client_id
+        ).filter(
+            EmployeeClientAssignment.employee_id.in_(uncoded),
+            EmployeeClientAssignment.is_active == True
+        ).all():
+            assignments[employee_id].add(client_id)
+
+        for employee_id in uncoded:
+            if len(assignments[employee_id]) != 1:
+                raise ExtractionError(
+                    f"Rows have no client and employee {employee_id} is not assigned to exactly one client"
+                )
+            resolved[(employee_id, None)] = next(iter(assignments[employee_id]))
+
+    return resolved
+
+
+def create_draft_timesheets(db: Session, upload: TimesheetUpload, rows: List[ParsedRow]) -> Tuple[List[int], List[int]]:
+    """
+    Turn parsed rows into draft timesheets, one per employee, client and
+    canonical period of the client's calendar. A timesheet that already
+    exists for the same employee, client and period is left untouched.
+
+    Returns:
+        tuple: (created timesheet ids, existing timesheet ids)
+    """
+    if not rows:
+        raise ExtractionError("No timesheet rows found in file")
+
+    employees = resolve_employees(db, upload, rows)
+    owned = [(employees[row.employee_key], row) for row in rows]
+    clients = resolve_clients(db, owned)
+    calendars = {
+        client.id: client_calendar(client)
+        for client in db.query(Client).filter(Client.id.in_(set(clients.values()))).all()
+    }
+
+    groups = defaultdict(list)
+    for employee_id, row in owned:
+        client_id = clients[(employee_id, row.client_code)]
+        period = calendars[client_id].period_for(row.work_date)
+        groups[(employee_id, client_id, period)].append(row)
+
+    for (employee_id, _, _), group_rows in groups.items():
+        daily = defaultdict(float)
+        for row in group_rows:
+            daily[row.work_date] += row.hours
+        over = [day for day, hours in daily.items() if hours > 24]
+        if over:
+            raise ExtractionError(f"Employee {employee_id} has more than 24 hours on {min(over).isoformat()}")
+
+    created = []
+    existing = []
+
+    for (employee_id, client_id, period), period_rows in groups.items():
+        timesheet = db.query(Timesheet).filter(
+            Timesheet.employee_id == employee_id,
+            Timesheet.client_id == client_id,
+            Timesheet.period_start == period.start,
+            Timesheet.period_end == period.end
+        ).first()
+        if timesheet:
+            existing.append(timesheet.id)
+            continue
+
+        timesheet = Timesheet(
+            employee_id=employee_id,
+            client_id=client_id,
+            period_start=period.start,
+            period_end=period.end,
+            status=TimesheetStatus.DRAFT,
+            total_hours=sum(row.hours for row in period_rows),
+            total_overtime=sum(row.overtime_hours for row in period_rows),
+            file_path=upload.file_path,
+            notes=f"Imported from upload {upload.id}"
+        )
+        timesheet.details = [
+            TimesheetDetail(
+                work_date=row.work_date,
+                hours=row.hours,
+                overtime_hours=row.overtime_hours,
+                description=row.description
+            )
+            for row in period_rows
+        ]
+        if settings.timesheet_packed_hours:
+            pack_timesheet(timesheet)
+        db.add(timesheet)
+        db.flush()
+        created.append(timesheet.id)
+
+    return created, existing
+
+
+def _update_metadata(upload: TimesheetUpload, values: dict):
+    metadata = json.loads(upload.upload_metadata) if upload.upload_metadata else {}
+    metadata.update(values)
+    upload.upload_metadata = json.dumps(metadata)
+
+
+def mark_failed(db: Session, upload_id: int, error: str):
+    """Record a parsing failure on an upload in its own transaction"""
+    db.rollback()
+    upload = db.query(TimesheetUpload).filter(TimesheetUpload.id == upload_id).first()
+    if upload:
+        upload.status = UploadStatus.FAILED
+        upload.error_message = error[:2000]
+        publish_upload_event(db, upload, "upload.failed")
+        db.commit()
+        invalidate_upload_stats()
+    metrics.increment("parsing.uploads_failed")
+
+
+def persist_result(db: Session, upload_id: int, rows: List[ParsedRow]) -> bool:
+    """
+    Save the rows extracted for an upload and mark it ANALYZED.
+
+    Returns:
+        True on success, False if the upload was marked FAILED
+    """
+    with metrics.timer("parsing.persist"):
+        try:
+            upload = db.query(TimesheetUpload).filter(TimesheetUpload.id == upload_id).first()
+            if not upload:
+                return False
+
+            created, existing = create_draft_timesheets(db, upload, rows)
+            upload.status = UploadStatus.ANALYZED
+            upload.error_message = None
+            _update_metadata(upload, {
+                "parsed_rows": len(rows),
+                "timesheet_ids": created,
+                "existing_timesheet_ids": existing
+            })
+            publish_upload_event(db, upload, "upload.analyzed")
+            db.commit()
+            invalidate_upload_stats()
+        except ExtractionError as e:
+            mark_failed(db, upload_id, str(e))
+            return False
+
+    metrics.increment("parsing.uploads_analyzed")
+    metrics.increment("parsing.rows", len(rows))
+    return True
+
+
+def process_pending_uploads(
+    db: Session,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+    executor: Optional[Executor] = None
+) -> dict:
+    """
+    Parse pending uploads until none are left.
+
+    Extraction runs in the process pool (or in-process when no pool is
+    configured); database writes stay in the calling thread.
+
+    Args:
+        db: Database session
+        batch_size: Uploads claimed per batch, defaults to parsing_batch_size
+        max_batches: Stop after this many batches
+        executor: Executor to extract with, defaults to the shared pool
+
+    Returns:
+        dict: claimed, analyzed, failed, rows and elapsed seconds
+    """
+    batch_size = batch_size or settings.parsing_batch_size
+    executor = executor or get_executor()
+    document_extractor = settings.document_extractor
+
+    summary = {"claimed": 0, "analyzed": 0, "failed": 0, "rows": 0}
+    start = time.perf_counter()
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        with metrics.timer("parsing.claim"):
+            claimed = [(u.id, u.file_path, u.file_format) for u in claim_pending_uploads(db, batch_size)]
+            # Bring back anything moved to cold storage so workers can read it by path
+            claimed = [
+                (upload_id, str(get_file_path(file_path, db) or file_path), file_format)
+                for upload_id, file_path, file_format in claimed
+            ]
+        if not claimed:
+            break
+
+        batches += 1
+        summary["claimed"] += len(claimed)
+        metrics.increment("parsing.uploads_claimed", len(claimed))
+
+        if executor is None:
+            outcomes = []
+            for upload_id, file_path, file_format in claimed:
+                try:
+                    outcomes.append((upload_id, extract_rows(file_path, file_format, document_extractor), None))
+                except Exception as e:
+                    outcomes.append((upload_id, None, e))
+        else:
+            futures = {
+                executor.submit(extract_rows, file_path, file_format, document_extractor): upload_id
+                for upload_id, file_path, file_format in claimed
+            }
+            outcomes = []
+            for future in as_completed(futures):
+                try:
+                    outcomes.append((futures[future], future.result(), None))
+                except Exception as e:
+                    outcomes.append((futures[future], None, e))
+
+        for upload_id, result, error in outcomes:
+            if error is not None:
+                message = str(error) if isinstance(error, ExtractionError) else f"{type(error).__name__}: {error}"
+                print(f"Failed to parse upload {upload_id}: {message}")
+                mark_failed(db, upload_id, message)
+                summary["failed"] += 1
+                continue
+
+            rows, seconds = result
+            metrics.observe("parsing.extract", seconds)
+            if persist_result(db, upload_id, rows):
+                summary["analyzed"] += 1
+                summary["rows"] += len(rows)
+            else:
+                summary["failed"] += 1
+
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    if summary["seconds"]:
+        metrics.set_gauge("parsing.rows_per_second", round(summary["rows"] / summary["seconds"], 1))
+    return summary
@@ -0,0 +1,78 @@
+"""
+Upload statistics for the admin dashboard.
+Counts by source and status come from a single grouped query and are served
+from a short-lived cache that upload state changes invalidate.
+"""
+from sqlalchemy import event as sa_event
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import TimesheetUpload, UploadSource, UploadStatus
+from app.utils.cache import TTLCache
+
+
+_stats_cache = TTLCache(ttl_seconds=settings.upload_stats_ttl_seconds)
+
+SUMMARY_KEY = "summary"
+
+
+def compute_upload_stats(db: Session) -> dict:
+    """
+    Count uploads per source and status with one GROUP BY query.
+
+    Returns:
+        dict: total, by_source and by_status, with every enum value present
+    """
+    rows = db.query(
+        TimesheetUpload.source,
+        TimesheetUpload.status,
+        func.count(TimesheetUpload.id)
+    ).group_by(TimesheetUpload.source, TimesheetUpload.status).all()
+
+    by_source = {source.value: 0 for source in UploadSource}
+    by_status = {upload_status.value: 0 for upload_status in UploadStatus}
+    total = 0
+
+    for source, upload_status, count in rows:
+        by_source[source.value] += count
+        by_status[upload_status.value] += count
+        total += count
+
+    return {
+        "total": total,
+        "by_source": by_source,
+        "by_status": by_status
+    }
+
+
+def get_upload_stats(db: Session) -> dict:
+    """Upload statistics, cached for upload_stats_ttl_seconds. Treat as read-only."""
+    return _stats_cache.get_or_set(SUMMARY_KEY, lambda: compute_upload_stats(db))
+
+
+def invalidate_upload_stats():
+    """Drop cached statistics after uploads are added, removed or change status"""
+    _stats_cache.invalidate(SUMMARY_KEY)
+
+
+def invalidate_upload_stats_after_commit(db: Session):
+    """
+    Drop cached statistics once db's transaction commits, so a concurrent
+    request cannot re-cache counts from before the change.
+    """
+    if not db.in_transaction():
+        db.begin()
+    db.info["invalidate_upload_stats"] = True
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _invalidate_pending(session):
+    if session.info.pop("invalidate_upload_stats", False):
+        invalidate_upload_stats()
+
+
+@sa_event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop("invalidate_upload_stats", None)
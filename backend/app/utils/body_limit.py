@@ -0,0 +1,82 @@
+"""
+Request body size limits enforced while the body is still being received.
+FastAPI spools a multipart body completely before the endpoint runs, so a
+limit checked in the endpoint comes too late. This middleware answers 413
+from Content-Length before reading anything, and for bodies without one
+counts bytes as they arrive and stops reading once the limit is crossed.
+"""
+from typing import Dict
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+BODY_METHODS = {"POST", "PUT", "PATCH"}
+
+
+class BodySizeLimitMiddleware:
+    """
+    Args:
+        app: ASGI application
+        limits: Maximum body size in bytes per request path
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = {path.rstrip("/"): limit for path, limit in limits.items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in BODY_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits.get(scope["path"].rstrip("/"))
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(scope, receive, send, limit)
+            return
+
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    rejected = True
+                    if not response_started:
+                        await self._reject(scope, receive, send, limit)
+                    # The app sees a disconnect and stops parsing the body
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+
+    @staticmethod
+    async def _reject(scope, receive, send, limit: int):
+        response = JSONResponse(
+            {"detail": f"Request body exceeds the limit of {limit} bytes"},
+            status_code=413,
+            headers={"Connection": "close"}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,65 @@
+"""
+Conditional GET support for list and dashboard endpoints.
+A collection's version is its row count and latest updated_at under the
+endpoint's filters: inserts and deletes move the count, edits move updated_at.
+Endpoints hash the version with the caller's scope and parameters into an
+ETag, and answer a matching If-None-Match with 304 before loading or
+serializing any rows.
+"""
+import hashlib
+import json
+from typing import Any, Iterable, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+
+# Let browsers keep the body but revalidate it on every request
+CACHE_CONTROL = "private, no-cache"
+
+
+def collection_version(*sources: Tuple) -> Select:
+    """
+    One-row query of (count, max(updated_at)) for each source.
+
+    Args:
+        sources: (model, *criteria) tuples; criteria scope the rows counted
+
+    Returns:
+        Select: execute it and pass the row to compute_etag
+    """
+    columns = []
+    for model, *criteria in sources:
+        columns.append(select(func.count()).select_from(model).where(*criteria).scalar_subquery())
+        columns.append(select(func.max(model.updated_at)).where(*criteria).scalar_subquery())
+    return select(*columns)
+
+
+def compute_etag(scope: Any, params: dict, version: Iterable) -> str:
+    """Weak ETag over the caller's scope, request parameters and data version"""
+    payload = json.dumps([scope, params, list(version)], sort_keys=True, default=str)
+    return f'W/"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match names etag (weak comparison, as RFC 9110 requires for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def set_etag(response: Response, etag: str):
+    """Attach validators to the response FastAPI builds from the return value"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
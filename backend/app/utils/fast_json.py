@@ -0,0 +1,34 @@
+"""
+Fast JSON for large responses.
+Endpoints that assemble plain dicts and lists from rows they already trust
+serialize them here instead of through response_model validation; the model
+stays on the route for the OpenAPI schema. orjson is used when installed
+(the `fast-json` extra), otherwise the stdlib encoder produces the same JSON.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON; dates as ISO 8601, enums as their values"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
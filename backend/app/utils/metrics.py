@@ -0,0 +1,74 @@
+"""
+In-process metrics registry.
+Counters and timings for background pipelines, exposed via /monitoring/metrics.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class MetricsRegistry:
+    """Thread-safe counters and duration summaries keyed by name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timings = {}
+        self._gauges = {}
+
+    def increment(self, name: str, value: float = 1):
+        """Add value to a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        """Record the current value of something that goes up and down"""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        """Record one duration sample"""
+        with self._lock:
+            count, total, maximum = self._timings.get(name, (0, 0.0, 0.0))
+            self._timings[name] = (count + 1, total + seconds, max(maximum, seconds))
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time the enclosed block and record it under name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def get_counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        """Current values of all metrics"""
+        with self._lock:
+            timings = {
+                name: {
+                    "count": count,
+                    "total_seconds": round(total, 6),
+                    "avg_seconds": round(total / count, 6) if count else 0.0,
+                    "max_seconds": round(maximum, 6)
+                }
+                for name, (count, total, maximum) in self._timings.items()
+            }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": timings
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+            self._gauges.clear()
+
+
+# Global instance
+metrics = MetricsRegistry()
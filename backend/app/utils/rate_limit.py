@@ -0,0 +1,77 @@
+"""
+In-process token buckets.
+Buckets live in one process; callers sharing a limit across N processes give
+each a bucket with 1/N of the rate.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class TokenBucket:
+    """Thread-safe bucket refilled at rate tokens per second, holding at most capacity"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        Take tokens if available.
+
+        Returns:
+            float: 0 when taken, otherwise seconds until enough tokens are available
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, timeout: float, tokens: float = 1) -> float:
+        """
+        Wait up to timeout seconds for tokens.
+
+        Returns:
+            float: 0 when taken, otherwise the remaining wait beyond timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return 0.0
+            remaining = deadline - time.monotonic()
+            if wait > remaining:
+                return wait - max(remaining, 0)
+            time.sleep(wait)
+
+
+class KeyedTokenBuckets:
+    """One bucket per key, created on first use; the least recently used are dropped beyond max_keys"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, max_keys: int = 10000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: Hashable) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket
@@ -0,0 +1,140 @@
+"""
+Content checks on multipart uploads while the body is still being received.
+FastAPI spools the whole multipart body before the endpoint runs, so the
+endpoint's magic-byte check only sees a mismatched file once all of it has
+arrived. This middleware watches the body as it streams past, finds the file
+part's filename and first bytes, and answers 400 as soon as they fail the
+check, without reading the rest. The endpoint still checks the content in
+full; this only rejects obvious mismatches early.
+"""
+import re
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+# Bytes of a file part inspected; a PDF header may sit anywhere in the first 1 KB
+HEAD_SIZE = 1024
+
+# Stop looking for the file part once this much of the body has gone by
+MAX_SCAN_BYTES = 256 * 1024
+
+NOT_FOUND = "not found"
+
+_NAME = re.compile(r'\bname="([^"]*)"')
+_FILENAME = re.compile(r'\bfilename="([^"]*)"')
+
+
+def file_part_head(
+    body: bytes, boundary: bytes, field: str, head_size: int = HEAD_SIZE
+) -> Union[None, str, Tuple[str, bytes]]:
+    """
+    Locate a file field in the start of a multipart body.
+
+    Returns:
+        (filename, first head_size bytes) once they have arrived, NOT_FOUND if
+        the body ended without the field, or None while more bytes are needed
+    """
+    delimiter = b"--" + boundary
+    position = body.find(delimiter)
+    if position < 0:
+        return None
+
+    while True:
+        position += len(delimiter)
+        if body[position:position + 2] == b"--":
+            return NOT_FOUND
+        headers_end = body.find(b"\r\n\r\n", position)
+        if headers_end < 0:
+            return None
+        headers = body[position:headers_end].decode("latin-1")
+        content_start = headers_end + 4
+        next_delimiter = body.find(b"\r\n" + delimiter, content_start)
+
+        name = _NAME.search(headers)
+        if name and name.group(1) == field:
+            filename = _FILENAME.search(headers)
+            filename = filename.group(1) if filename else ""
+            if next_delimiter >= 0:
+                return filename, body[content_start:next_delimiter][:head_size]
+            # Leave room for a delimiter split across chunks
+            if len(body) - content_start >= head_size + len(delimiter) + 2:
+                return filename, body[content_start:content_start + head_size]
+            return None
+
+        if next_delimiter < 0:
+            return None
+        position = next_delimiter + 2
+
+
+class MultipartSniffMiddleware:
+    """
+    Args:
+        app: ASGI application
+        fields: Name of the file field to inspect per request path
+        check: (filename, head) -> error detail, or None to let the request through
+    """
+
+    def __init__(self, app, fields: Dict[str, str], check: Callable[[str, bytes], Optional[str]]):
+        self.app = app
+        self.fields = {path.rstrip("/"): field for path, field in fields.items()}
+        self.check = check
+
+    async def __call__(self, scope, receive, send):
+        field = self.fields.get(scope["path"].rstrip("/")) if scope["type"] == "http" else None
+        if field is None or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        content_type = Headers(scope=scope).get("content-type", "")
+        boundary = re.search(r'boundary="?([^";]+)"?', content_type)
+        if not content_type.startswith("multipart/form-data") or not boundary:
+            await self.app(scope, receive, send)
+            return
+
+        boundary = boundary.group(1).encode("latin-1")
+        scanned = bytearray()
+        decided = False
+        rejected = False
+        response_started = False
+
+        async def inspecting_receive():
+            nonlocal decided, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if decided or message["type"] != "http.request":
+                return message
+
+            scanned.extend(message.get("body", b""))
+            found = file_part_head(bytes(scanned), boundary, field)
+            if found is None and message.get("more_body", False) and len(scanned) < MAX_SCAN_BYTES:
+                return message
+
+            decided = True
+            scanned.clear()
+            if isinstance(found, tuple):
+                error = self.check(*found)
+                if error:
+                    rejected = True
+                    if not response_started:
+                        await JSONResponse(
+                            {"detail": error}, status_code=400, headers={"Connection": "close"}
+                        )(scope, receive, send)
+                    # The app sees a disconnect and stops parsing the body
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, inspecting_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
@@ -0,0 +1,44 @@
+"""
+Benchmark the columnar CSV engine against the synthetic corpus.
+
+Reports rows per second and peak resident memory for aggregating each file
+per (employee, client, week).
+
+Usage:
+    uv run python benchmarks/generate_csv_corpus.py
+    uv run python benchmarks/bench_csv_ingest.py benchmarks/corpus/*.csv
+"""
+import argparse
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.csv_ingest import CHUNK_ROWS, aggregate_csv  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV ingestion")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--period", default="week", choices=["day", "week", "month"])
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    print(f"{'file':40} {'rows':>10} {'groups':>8} {'seconds':>8} {'rows/s':>12} {'peak MB':>8}")
+    for file_path in args.files:
+        start = time.perf_counter()
+        summary = aggregate_csv(file_path, period=args.period, chunk_rows=args.chunk_rows)
+        elapsed = time.perf_counter() - start
+        # ru_maxrss is KB on Linux
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        print(
+            f"{Path(file_path).name:40} {summary.rows:>10} {len(summary.totals):>8} "
+            f"{elapsed:>8.2f} {summary.rows / elapsed:>12,.0f} {peak_mb:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
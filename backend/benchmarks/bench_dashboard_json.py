@@ -0,0 +1,144 @@
+"""
+Compare dashboard serialization paths on a synthetic month.
+
+Builds a payload of clients x employees x periods (50,000 periods by default)
+and times each way of turning the assembled rows into response bytes:
+
+  models+encoder   nested Pydantic models, jsonable_encoder, json.dumps
+  response_model   plain rows validated as DashboardResponse, then dump_json
+  fast (stdlib)    plain rows through fast_json.dumps without orjson
+  fast (orjson)    plain rows through fast_json.dumps (needs the fast-json extra)
+
+No database is involved; this isolates the CPU spent after the queries.
+
+Usage:
+    uv run python benchmarks/bench_dashboard_json.py
+    uv run python benchmarks/bench_dashboard_json.py --clients 200 --employees 50 --periods 5 --repeat 5
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+STATUSES = ["approved", "submitted", "draft", "missing"]
+
+
+def build_rows(clients: int, employees: int, periods: int) -> dict:
+    """Plain rows in the shape build_dashboard returns"""
+    from app.models import SubmissionFrequency
+
+    start = date(2026, 10, 5)
+    period_dates = [(start + timedelta(weeks=i), start + timedelta(weeks=i, days=6)) for i in range(periods)]
+    rows = []
+    for c in range(clients):
+        rows.append({
+            "client_id": c + 1,
+            "client_name": f"Client {c}",
+            "client_code": f"BM{c:04d}",
+            "bill_rate": 95.0,
+            "submission_frequency": SubmissionFrequency.WEEKLY,
+            "employees": [{
+                "employee_id": c * employees + e + 1,
+                "employee_name": f"Employee {c}-{e}",
+                "employee_email": f"employee{c}-{e}@example.com",
+                "pay_rate": 42.5,
+                "overtime_allowed": True,
+                "periods": [{
+                    "period_start": period_start,
+                    "period_end": period_end,
+                    "status": STATUSES[(e + p) % len(STATUSES)],
+                    "timesheet_id": None if (e + p) % len(STATUSES) == 3 else c * 1000 + e * 10 + p
+                } for p, (period_start, period_end) in enumerate(period_dates)]
+            } for e in range(employees)]
+        })
+    return {
+        "stats": {"total_clients": clients, "total_employees": clients * employees,
+                  "pending_timesheets": 0, "approved_timesheets": 0, "missing_timesheets": 0},
+        "clients_with_employees": rows
+    }
+
+
+def models_and_encoder(rows: dict) -> bytes:
+    """What the endpoint did before: build every model, then FastAPI's generic encoder"""
+    from fastapi.encoders import jsonable_encoder
+
+    from app.routers.dashboard import (
+        ClientWithEmployees, DashboardResponse, DashboardStats, EmployeeTimesheetStatus, TimesheetPeriodStatus
+    )
+
+    response = DashboardResponse(
+        stats=DashboardStats(**rows["stats"]),
+        clients_with_employees=[
+            ClientWithEmployees(**{**client, "employees": [
+                EmployeeTimesheetStatus(**{**employee, "periods": [
+                    TimesheetPeriodStatus(**period) for period in employee["periods"]
+                ]}) for employee in client["employees"]
+            ]}) for client in rows["clients_with_employees"]
+        ]
+    )
+    return json.dumps(jsonable_encoder(response)).encode()
+
+
+def response_model(rows: dict) -> bytes:
+    from app.routers.dashboard import DashboardResponse
+
+    return DashboardResponse.model_validate(rows).model_dump_json().encode()
+
+
+def fast_stdlib(rows: dict) -> bytes:
+    from app.utils import fast_json
+
+    orjson, fast_json.orjson = fast_json.orjson, None
+    try:
+        return fast_json.dumps(rows)
+    finally:
+        fast_json.orjson = orjson
+
+
+def fast_orjson(rows: dict) -> bytes:
+    from app.utils.fast_json import dumps
+
+    return dumps(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard serialization")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--employees", type=int, default=50, help="Employees per client")
+    parser.add_argument("--periods", type=int, default=10, help="Periods per employee")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from app.utils import fast_json
+
+    rows = build_rows(args.clients, args.employees, args.periods)
+    paths = [("models+encoder", models_and_encoder), ("response_model", response_model), ("fast (stdlib)", fast_stdlib)]
+    if fast_json.orjson is not None:
+        paths.append(("fast (orjson)", fast_orjson))
+    else:
+        print("orjson not installed; skipping the orjson path")
+
+    reference = json.loads(response_model(rows))
+    total_periods = args.clients * args.employees * args.periods
+    print(f"{total_periods:,} periods")
+    print(f"{'path':>16} {'ms':>9} {'MB':>7} {'speedup':>8}")
+    baseline = None
+    for name, serialize in paths:
+        body = serialize(rows)
+        assert json.loads(body) == reference, f"{name} output differs"
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            serialize(rows)
+            best = min(best, time.perf_counter() - started)
+        baseline = baseline or best
+        print(f"{name:>16} {best * 1000:>9.1f} {len(body) / 1e6:>7.2f} {baseline / best:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Compare daily-hours storage: detail rows versus packed per-timesheet arrays.
+
+Seeds a year of weekly timesheets (five worked days each) into two SQLite
+databases. One stores the days as timesheet_details rows only. The other
+stores them as packed centi-hour arrays on the timesheets table only. It
+then reports each database's size and the time to scan every worked day:
+a join over the detail rows versus unpacking the arrays through
+iter_daily_hours.
+
+Usage:
+    uv run python benchmarks/bench_packed_hours.py
+    uv run python benchmarks/bench_packed_hours.py --employees 10000 --weeks 52
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def seed(engine, employees: int, weeks: int, packed: bool):
+    """Create the schema and insert rows with Core executemany for speed"""
+    from app.database import Base
+    from app.models import Client, Employee, Timesheet, TimesheetDetail, TimesheetStatus, UserRole
+    from app.services.packed_hours import pack_days
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    rng = random.Random(7)
+    first_monday = date(2026, 1, 5)
+    with engine.begin() as conn:
+        conn.execute(Client.__table__.insert(), [{"id": 1, "name": "Bench", "code": "BENCH", "is_active": True}])
+        conn.execute(Employee.__table__.insert(), [
+            {"id": i + 1, "email": f"employee{i}@example.com", "hashed_password": "x",
+             "first_name": "Employee", "last_name": str(i), "role": UserRole.EMPLOYEE, "is_active": True}
+            for i in range(employees)
+        ])
+
+        timesheet_id = 0
+        for employee_id in range(1, employees + 1):
+            timesheets, details = [], []
+            for week in range(weeks):
+                timesheet_id += 1
+                period_start = first_monday + timedelta(weeks=week)
+                days = [(period_start + timedelta(days=d), rng.choice([7.5, 8.0, 8.25, 9.0]), rng.choice([0.0, 0.0, 1.0]))
+                        for d in range(5)]
+                row = {
+                    "id": timesheet_id, "employee_id": employee_id, "client_id": 1,
+                    "period_start": period_start, "period_end": period_start + timedelta(days=6),
+                    "status": TimesheetStatus.APPROVED,
+                    "total_hours": sum(hours for _, hours, _ in days),
+                    "total_overtime": sum(overtime for _, _, overtime in days),
+                }
+                if packed:
+                    row["packed_hours"], row["packed_overtime"] = pack_days(row["period_start"], row["period_end"], days)
+                else:
+                    details.extend(
+                        {"timesheet_id": timesheet_id, "work_date": work_date, "hours": hours,
+                         "overtime_hours": overtime, "is_holiday": False}
+                        for work_date, hours, overtime in days
+                    )
+                timesheets.append(row)
+            conn.execute(Timesheet.__table__.insert(), timesheets)
+            if details:
+                conn.execute(TimesheetDetail.__table__.insert(), details)
+
+
+def scan(engine) -> tuple:
+    """Time one pass over every worked day; returns (seconds, days, hours)"""
+    from sqlalchemy.orm import Session
+
+    from app.services.packed_hours import iter_daily_hours
+
+    with Session(engine) as db:
+        started = time.perf_counter()
+        days = 0
+        hours = 0.0
+        for day in iter_daily_hours(db, date(2026, 1, 1), date(2026, 12, 31)):
+            days += 1
+            hours += day.hours
+        return time.perf_counter() - started, days, hours
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark packed daily hours against detail rows")
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--weeks", type=int, default=52)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+
+    print(f"{args.employees * args.weeks:,} timesheets, {args.employees * args.weeks * 5:,} worked days")
+    print(f"{'storage':>8} {'size MB':>9} {'scan s':>8} {'days/s':>11}")
+    results = {}
+    for name, packed in (("details", False), ("packed", True)):
+        path = BACKEND_DIR / f"bench_packed_{name}.db"
+        if path.exists():
+            path.unlink()
+        engine = create_engine(f"sqlite:///{path}")
+        seed(engine, args.employees, args.weeks, packed)
+        with engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+        seconds, days, hours = scan(engine)
+        results[name] = hours
+        engine.dispose()
+        print(f"{name:>8} {os.path.getsize(path) / 1e6:>9.1f} {seconds:>8.2f} {days / seconds:>11,.0f}")
+        path.unlink()
+
+    assert abs(results["details"] - results["packed"]) < 0.01 * args.employees, "scans disagree"
+
+
+if __name__ == "__main__":
+    main()
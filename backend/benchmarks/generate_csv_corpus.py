@@ -0,0 +1,69 @@
+"""
+Generate synthetic timesheet CSV exports for benchmarking.
+
+Each file looks like a payroll/ATS export: one row per employee, client and
+work day, with a few entries split across the day and mixed description text.
+
+Usage:
+    uv run python benchmarks/generate_csv_corpus.py --out benchmarks/corpus --rows 10000 100000 1000000
+"""
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+
+DESCRIPTIONS = ["Development", "Code review", "Meetings", "Support", "Testing", "Documentation", ""]
+
+# Header and date layouts seen in real exports
+LAYOUTS = {
+    "iso": (["employee_email", "client_code", "work_date", "hours", "overtime_hours", "description"], "%Y-%m-%d", ","),
+    "us": (["Employee", "Client", "Date", "Hours Worked", "OT", "Notes"], "%m/%d/%Y", ","),
+    "eu": (["email", "client", "date", "hours", "overtime", "task"], "%d.%m.%Y", ";"),
+}
+
+
+def generate(path: Path, rows: int, employees: int = 2000, clients: int = 25, layout: str = "iso", seed: int = 7):
+    """Write a synthetic export with the given number of data rows"""
+    rng = random.Random(seed)
+    header, date_format, delimiter = LAYOUTS[layout]
+    start = date(2025, 1, 6)
+
+    employee_clients = [f"C{rng.randrange(clients):03d}" for _ in range(employees)]
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(header)
+        for i in range(rows):
+            employee = i % employees
+            day = start + timedelta(days=(i // employees) % 365)
+            hours = rng.choice((2, 4, 4, 6, 8, 8, 8))
+            overtime = rng.choice((0, 0, 0, 0, 1, 2))
+            writer.writerow([
+                f"emp{employee:05d}@example.com",
+                employee_clients[employee],
+                day.strftime(date_format),
+                hours,
+                overtime,
+                rng.choice(DESCRIPTIONS)
+            ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", default="benchmarks/corpus")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), default="iso")
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    for rows in args.rows:
+        path = out / f"export_{args.layout}_{rows}.csv"
+        generate(path, rows, layout=args.layout)
+        print(f"Wrote {path} ({path.stat().st_size / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
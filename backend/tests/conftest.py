@@ -1,13 +1,22 @@
+import email
+import os
+import socketserver
+import threading
+
+# Before the app is imported: no background jobs during tests
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timedelta
 
-from app.database import Base, get_db
+from app.database import Base, SyncSessionAdapter, get_async_db, get_db
 from app.main import app
 from app.models import Employee, Client, Calendar, UserRole, SubmissionFrequency
-from app.auth import get_password_hash
+from app.services import file_storage
+from app.auth import get_current_employee, get_current_employee_async, get_password_hash
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
@@ -34,12 +43,43 @@ def client(db_session):
         finally:
             pass
 
+    async def override_get_async_db():
+        yield SyncSessionAdapter(db_session)
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def api(db_session):
+    """
+    Factory for clients signed in as the given employee, skipping token
+    checks; api() gives a client with no employee override.
+    """
+    async def override_get_async_db():
+        yield SyncSessionAdapter(db_session)
+
+    def client_for(employee=None, **kwargs):
+        if employee is not None:
+            app.dependency_overrides[get_current_employee] = lambda: employee
+            app.dependency_overrides[get_current_employee_async] = lambda: employee
+        return TestClient(app, **kwargs)
+
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    yield client_for
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def blob_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_storage, "BLOB_DIR", tmp_path / "blobs")
+    return tmp_path / "blobs"
+
+
 @pytest.fixture
 def test_employee(db_session):
     employee = Employee(
@@ -142,3 +182,79 @@ def admin_auth_headers(client, test_admin):
     )
     token = response.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """
+    Local debugging SMTP server: accepts every message and keeps it.
+    fail_data replies 451 to that many DATA commands, reject refuses those recipients.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self.fail_data = 0
+        self.reject = set()
+        self.lock = threading.Lock()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 sink ready")
+        recipients = []
+        for raw in self.rfile:
+            command = raw.decode().strip()
+            verb = command[:4].upper()
+            if verb == "EHLO":
+                self.reply("250-sink")
+                self.reply("250 8BITMIME")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip("<> ")
+                if address in server.reject:
+                    self.reply("550 no such user")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                with server.lock:
+                    failing = server.fail_data > 0
+                    server.fail_data -= failing
+                if failing:
+                    self.reply("451 try again later")
+                    continue
+                self.reply("354 go ahead")
+                lines = []
+                for data in self.rfile:
+                    if data == b".\r\n":
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                with server.lock:
+                    server.messages.append(email.message_from_bytes(b"".join(lines)))
+                self.reply("250 queued")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPSink()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
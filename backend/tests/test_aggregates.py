@@ -0,0 +1,113 @@
+from datetime import date
+
+import pytest
+
+from app.models import (
+    Approval, ApprovalStatus, Client, EmployeeClientAssignment, Timesheet, TimesheetPeriodTotal, TimesheetStatus
+)
+from app.services.aggregates import payroll_by_employee_month, refresh_period_totals, revenue_by_client_month
+
+
+@pytest.fixture
+def acme(db_session, test_employee):
+    test_employee.pay_rate = 20.0
+    client = Client(name="Acme", code="ACME", bill_rate=100.0, overtime_multiplier=2.0)
+    db_session.add(client)
+    db_session.flush()
+    db_session.add(EmployeeClientAssignment(employee_id=test_employee.id, client_id=client.id, pay_rate=30.0))
+    db_session.commit()
+    return client
+
+
+def add_timesheet(db_session, employee, client, period_start, status, total_hours, total_overtime=0.0):
+    timesheet = Timesheet(employee_id=employee.id, client_id=client.id, period_start=period_start,
+                          period_end=date.fromordinal(period_start.toordinal() + 6), status=status,
+                          total_hours=total_hours, total_overtime=total_overtime)
+    db_session.add(timesheet)
+    db_session.commit()
+    return timesheet
+
+
+class TestPeriodTotals:
+    def test_approval_computes_totals(self, api, db_session, test_admin, test_employee, acme):
+        timesheet = add_timesheet(db_session, test_employee, acme, date(2026, 10, 5), TimesheetStatus.SUBMITTED, 45, 5)
+        approval = Approval(timesheet_id=timesheet.id, approver_id=test_admin.id)
+        db_session.add(approval)
+        db_session.commit()
+
+        assert api(test_admin).put(f"/approvals/{approval.id}", json={"status": "approved"}).status_code == 200
+
+        total = db_session.query(TimesheetPeriodTotal).one()
+        assert (total.regular_hours, total.overtime_hours, total.pay_rate, total.bill_rate) == (40, 5, 30.0, 100.0)
+        assert (total.regular_pay, total.overtime_pay) == (1200.0, 300.0)
+        assert total.billable_amount == 40 * 100.0 + 5 * 100.0 * 2.0
+
+    def test_rate_changes_keep_approved_periods_frozen(self, api, db_session, test_admin, test_employee, acme):
+        add_timesheet(db_session, test_employee, acme, date(2026, 10, 5), TimesheetStatus.APPROVED, 10)
+        refresh_period_totals(db_session)
+        db_session.commit()
+
+        assert api(test_admin).put(f"/clients/{acme.id}", json={"bill_rate": 120.0}).status_code == 200
+        # A later approval in the same period keeps the period's rates
+        add_timesheet(db_session, test_employee, acme, date(2026, 10, 5), TimesheetStatus.APPROVED, 5)
+        refresh_period_totals(db_session, test_employee.id, acme.id, date(2026, 10, 5), date(2026, 10, 11))
+        # A period approved after the change gets the new rate
+        add_timesheet(db_session, test_employee, acme, date(2026, 10, 12), TimesheetStatus.APPROVED, 10)
+        refresh_period_totals(db_session, period_start=date(2026, 10, 12))
+        db_session.commit()
+
+        totals = db_session.query(TimesheetPeriodTotal).order_by(TimesheetPeriodTotal.period_start).all()
+        assert [(total.bill_rate, total.billable_amount) for total in totals] == [(100.0, 1500.0), (120.0, 1200.0)]
+
+    def test_backfill_reprices_explicitly(self, db_session, test_employee, acme):
+        add_timesheet(db_session, test_employee, acme, date(2026, 10, 5), TimesheetStatus.APPROVED, 10)
+        refresh_period_totals(db_session)
+        acme.bill_rate = 120.0
+        db_session.commit()
+
+        refresh_period_totals(db_session, client_id=acme.id)
+        assert db_session.query(TimesheetPeriodTotal).one().billable_amount == 1000.0
+
+        refresh_period_totals(db_session, client_id=acme.id, reprice=True)
+        assert db_session.query(TimesheetPeriodTotal).one().billable_amount == 1200.0
+
+    def test_unknown_rates_leave_amounts_empty(self, db_session, test_employee):
+        client = Client(name="Globex", code="GLOBEX")
+        db_session.add(client)
+        db_session.commit()
+        add_timesheet(db_session, test_employee, client, date(2026, 10, 5), TimesheetStatus.APPROVED, 8)
+
+        refresh_period_totals(db_session)
+        total = db_session.query(TimesheetPeriodTotal).one()
+        assert (total.pay_rate, total.regular_pay, total.billable_amount) == (None, None, None)
+
+    def test_only_approved_timesheets_count(self, db_session, test_employee, acme):
+        add_timesheet(db_session, test_employee, acme, date(2026, 10, 5), TimesheetStatus.APPROVED, 8)
+        add_timesheet(db_session, test_employee, acme, date(2026, 10, 5), TimesheetStatus.APPROVED, 4)
+        add_timesheet(db_session, test_employee, acme, date(2026, 10, 12), TimesheetStatus.REJECTED, 40)
+
+        assert refresh_period_totals(db_session) == 1
+        total = db_session.query(TimesheetPeriodTotal).one()
+        assert (total.timesheets, total.regular_hours, total.regular_pay) == (2, 12, 360.0)
+
+
+class TestFinanceQueries:
+    def test_revenue_and_payroll_by_month(self, api, db_session, test_admin, test_employee, acme):
+        add_timesheet(db_session, test_employee, acme, date(2026, 9, 28), TimesheetStatus.APPROVED, 10)
+        add_timesheet(db_session, test_employee, acme, date(2026, 10, 5), TimesheetStatus.APPROVED, 12, 2)
+        add_timesheet(db_session, test_employee, acme, date(2025, 10, 5), TimesheetStatus.APPROVED, 99)
+        refresh_period_totals(db_session)
+        db_session.commit()
+
+        revenue = revenue_by_client_month(db_session, 2026)
+        assert [(row["month"], row["revenue"], row["payroll_cost"]) for row in revenue] == [
+            (9, 1000.0, 300.0), (10, 1400.0, 420.0)
+        ]
+        assert revenue[1]["margin"] == 980.0
+
+        payroll = payroll_by_employee_month(db_session, 2026, employee_id=test_employee.id)
+        assert [(row["month"], row["overtime_pay"], row["total_pay"]) for row in payroll] == [(9, 0.0, 300.0), (10, 120.0, 420.0)]
+
+        response = api(test_admin).get("/finance/revenue", params={"year": 2026, "client_id": acme.id})
+        assert response.status_code == 200
+        assert response.json()[0]["client_name"] == "Acme"
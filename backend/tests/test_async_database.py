@@ -0,0 +1,124 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import NullPool
+
+from app import database
+from app.auth import get_current_employee, get_current_employee_async
+from app.config import settings
+from app.database import async_database_url, get_async_db, get_db
+from app.main import app
+from app.models import EmployeeClientAssignment, Timesheet, TimesheetStatus
+from app.services.period_calendar import client_calendar
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+
+@pytest.fixture
+def month_data(db_session, test_employee, test_client_entity):
+    # First whole pay period of the month, so it counts towards the month's stats
+    month = date.today().replace(day=1)
+    period = client_calendar(test_client_entity).period_for(month + timedelta(days=6))
+    db_session.add(EmployeeClientAssignment(employee_id=test_employee.id, client_id=test_client_entity.id))
+    db_session.add(Timesheet(
+        employee_id=test_employee.id, client_id=test_client_entity.id,
+        period_start=period.start, period_end=period.end, status=TimesheetStatus.SUBMITTED
+    ))
+    db_session.commit()
+    return month, period
+
+
+@pytest.fixture
+def sync_mode(api, test_admin):
+    return api(test_admin)
+
+
+@pytest.fixture
+def async_mode(db_session, test_admin, monkeypatch):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    # NullPool: each TestClient request runs on its own event loop
+    engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+    monkeypatch.setattr(settings, "database_async", True)
+    monkeypatch.setattr(database, "_async_engine", engine)
+    monkeypatch.setattr(database, "_async_sessionmaker", async_sessionmaker(engine, expire_on_commit=False))
+    app.dependency_overrides[get_current_employee] = lambda: test_admin
+    app.dependency_overrides[get_current_employee_async] = lambda: test_admin
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+class TestAsyncDatabaseUrl:
+    @pytest.mark.parametrize("url, expected", [
+        ("postgresql://u:p@db:5432/app", "postgresql+asyncpg://u:p@db:5432/app"),
+        ("postgresql+psycopg2://u@db/app", "postgresql+asyncpg://u@db/app"),
+        ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+        ("postgresql+asyncpg://u@db/app", "postgresql+asyncpg://u@db/app"),
+    ])
+    def test_driver_is_swapped(self, url, expected):
+        assert async_database_url(url) == expected
+
+
+@pytest.mark.parametrize("mode", ["sync_mode", "async_mode"])
+class TestAsyncReadEndpoints:
+    def test_dashboard(self, request, mode, month_data, test_employee):
+        client = request.getfixturevalue(mode)
+
+        month, period = month_data
+
+        response = client.get("/dashboard/", params={"year": month.year, "month": month.month})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["stats"]["pending_timesheets"] == 1
+        periods = data["clients_with_employees"][0]["employees"][0]["periods"]
+        submitted = [p for p in periods if p["status"] == "submitted"]
+        assert [p["period_start"] for p in submitted] == [period.start.isoformat()]
+        assert data["stats"]["missing_timesheets"] == len(periods) - 1
+
+    def test_dashboard_stats(self, request, mode, month_data):
+        client = request.getfixturevalue(mode)
+
+        data = client.get("/dashboard/stats").json()
+
+        assert data == {"total_clients": 1, "total_employees": 1, "pending_timesheets": 1, "approved_timesheets": 0}
+
+    def test_timesheet_list_and_detail(self, request, mode, month_data, test_employee):
+        client = request.getfixturevalue(mode)
+
+        listed = client.get("/timesheets/", params={"status": "submitted"})
+        detail = client.get(f"/timesheets/{listed.json()[0]['id']}")
+
+        assert listed.status_code == 200 and len(listed.json()) == 1
+        assert detail.json()["employee_id"] == test_employee.id
+        assert client.get("/timesheets/999").status_code == 404
+
+
+class TestAuthenticationSessions:
+    @pytest.mark.parametrize("path", ["/employees/", "/dashboard/missing-timesheets"])
+    def test_sync_route_authenticates_on_its_own_session(self, db_session, test_admin, path):
+        from app.auth import create_access_token
+
+        sessions = []
+
+        def counting_get_db():
+            sessions.append(db_session)
+            yield db_session
+
+        async def unexpected_get_async_db():
+            raise AssertionError("sync routes must not open an async session")
+            yield
+
+        app.dependency_overrides[get_db] = counting_get_db
+        app.dependency_overrides[get_async_db] = unexpected_get_async_db
+        try:
+            response = TestClient(app).get(
+                path, headers={"Authorization": f"Bearer {create_access_token({'sub': test_admin.email})}"}
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert len(sessions) == 1
@@ -0,0 +1,75 @@
+import io
+import json
+import zipfile
+import pytest
+
+from app.models import TimesheetUpload
+from app.services.batch_upload import ingest_batch, employee_key_for
+
+
+def make_zip(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in entries.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+class TestBatchUpload:
+    def test_employee_key_resolution(self):
+        manifest = {"scan.pdf": "42"}
+
+        assert employee_key_for("scan.pdf", manifest, None) == "42"
+        assert employee_key_for("folder/scan.pdf", manifest, None) == "42"
+        assert employee_key_for("other.pdf", {}, "7") == "7"
+        assert employee_key_for("jane@acme.com/week1.pdf", {}, None) == "jane@acme.com"
+        assert employee_key_for("jane@acme.com__week1.pdf", {}, None) == "jane@acme.com"
+        assert employee_key_for("week1.pdf", {}, None) is None
+
+    def test_zip_and_plain_files_in_one_transaction(self, db_session, test_employee, test_manager, test_admin, blob_dir):
+        archive = make_zip({
+            "test@example.com/week1.csv": "date,hours\n2026-01-05,8\n",
+            "manager@example.com/week1.pdf": "%PDF-1.4 manager",
+            "nobody@example.com/week1.pdf": "%PDF-1.4 nobody",
+            "test@example.com/notes.txt": "not a timesheet",
+        })
+        files = [
+            ("batch.zip", archive),
+            (f"{test_employee.id}__scan.jpg", io.BytesIO(b"\xff\xd8\xff\xe0 jpeg")),
+        ]
+
+        results = ingest_batch(db_session, files, uploaded_by=test_admin.id)
+        db_session.commit()
+
+        by_name = {item["file_name"]: item for item in results}
+        assert by_name["test@example.com/week1.csv"]["upload"].employee_id == test_employee.id
+        assert by_name["manager@example.com/week1.pdf"]["upload"].employee_id == test_manager.id
+        assert by_name[f"{test_employee.id}__scan.jpg"]["created"]
+        assert "No active employee" in by_name["nobody@example.com/week1.pdf"]["error"]
+        assert "Invalid file format" in by_name["test@example.com/notes.txt"]["error"]
+        assert db_session.query(TimesheetUpload).count() == 3
+
+        upload = by_name["test@example.com/week1.csv"]["upload"]
+        assert upload.uploaded_by == test_admin.id
+        assert json.loads(upload.upload_metadata)["archive"] == "batch.zip"
+
+    def test_duplicates_within_batch(self, db_session, test_employee, test_admin, blob_dir):
+        files = [
+            ("a.pdf", io.BytesIO(b"%PDF-1.4 same")),
+            ("b.pdf", io.BytesIO(b"%PDF-1.4 same")),
+            ("c.pdf", io.BytesIO(b"GIF89a")),
+        ]
+
+        results = ingest_batch(db_session, files, uploaded_by=test_admin.id, default_employee_id=test_employee.id)
+        db_session.commit()
+
+        assert [item["created"] for item in results] == [True, False, False]
+        assert results[0]["upload"].id == results[1]["upload"].id
+        assert results[2]["error"] == "File content is not a valid PDF"
+
+    def test_too_many_files(self, db_session, test_admin, blob_dir):
+        files = [(f"{i}.pdf", io.BytesIO(b"%PDF-")) for i in range(3)]
+
+        with pytest.raises(ValueError):
+            ingest_batch(db_session, files, uploaded_by=test_admin.id, max_entries=2)
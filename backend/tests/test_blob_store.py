@@ -0,0 +1,97 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+from app.models import StoredBlob, TimesheetUpload, UploadSource
+from app.services.blob_store import (
+    PendingUpload, acquire_blobs, delete_upload_file, ingest_upload, sweep_unreferenced_blobs
+)
+from app.services.file_storage import write_blob
+
+
+def age(path, seconds=7200):
+    """Backdate a blob file as if it was written seconds ago"""
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+class TestBlobStore:
+    def test_same_content_is_stored_once(self, db_session, test_employee, test_manager, blob_dir):
+        first, created_first = ingest_upload(
+            db_session, test_employee.id, "week1.csv", [b"date,hours\n", b"2026-01-05,8\n"], "csv", UploadSource.EMAIL
+        )
+        other, created_other = ingest_upload(
+            db_session, test_manager.id, "copy.csv", [b"date,hours\n2026-01-05,8\n"], "csv", UploadSource.DRIVE
+        )
+        db_session.commit()
+
+        assert created_first and created_other
+        assert first.content_hash == other.content_hash
+        assert first.file_path == other.file_path
+        assert first.file_size == 24
+
+        blob = db_session.query(StoredBlob).filter(StoredBlob.digest == first.content_hash).one()
+        assert blob.ref_count == 2
+        assert len([p for p in blob_dir.rglob("*") if p.is_file()]) == 1
+
+    def test_duplicate_from_same_employee_reuses_upload(self, db_session, test_employee, blob_dir):
+        first, _ = ingest_upload(db_session, test_employee.id, "scan.pdf", [b"%PDF-1.4 body"], "pdf", UploadSource.EMAIL)
+        second, created = ingest_upload(db_session, test_employee.id, "resent.pdf", [b"%PDF-1.4 body"], "pdf", UploadSource.MANUAL)
+        db_session.commit()
+
+        assert not created
+        assert second.id == first.id
+        assert db_session.query(TimesheetUpload).count() == 1
+
+    def test_file_removed_by_sweep_after_last_reference(self, db_session, test_employee, test_manager, blob_dir):
+        first, _ = ingest_upload(db_session, test_employee.id, "a.csv", [b"x"], "csv", UploadSource.MANUAL)
+        second, _ = ingest_upload(db_session, test_manager.id, "b.csv", [b"x"], "csv", UploadSource.MANUAL)
+        db_session.commit()
+        path = first.file_path
+
+        for upload in (first, second):
+            assert delete_upload_file(db_session, upload) is None
+            db_session.delete(upload)
+            db_session.commit()
+
+        blob = db_session.query(StoredBlob).one()
+        assert blob.ref_count == 0 and os.path.exists(path)
+        # Still within the grace period
+        assert sweep_unreferenced_blobs(db_session) == 0
+
+        age(path)
+        assert sweep_unreferenced_blobs(db_session, grace_seconds=0) == 1
+        assert not os.path.exists(path)
+        assert db_session.query(StoredBlob).count() == 0
+
+    def test_reupload_during_sweep_keeps_content(self, db_session, test_employee, test_manager, blob_dir):
+        first, _ = ingest_upload(db_session, test_employee.id, "a.csv", [b"x"], "csv", UploadSource.MANUAL)
+        db_session.commit()
+        delete_upload_file(db_session, first)
+        db_session.delete(first)
+        db_session.commit()
+        db_session.query(StoredBlob).update({"updated_at": datetime.utcnow() - timedelta(hours=2)})
+        db_session.commit()
+        age(first.file_path)
+
+        # A new upload of the same content has written its file but not yet referenced the blob
+        digest, path, size = write_blob([b"x"])
+        assert sweep_unreferenced_blobs(db_session, grace_seconds=3600) == 1
+        acquire_blobs(db_session, [PendingUpload(test_manager.id, "b.csv", "csv", UploadSource.MANUAL, digest, path, size)])
+        db_session.commit()
+
+        assert os.path.exists(path)
+        assert db_session.query(StoredBlob).one().ref_count == 1
+
+    def test_acquire_adds_to_an_existing_row(self, db_session, test_employee, blob_dir):
+        digest, path, size = write_blob([b"x"])
+        db_session.add(StoredBlob(digest=digest, file_path=path, size=size, ref_count=1))
+        db_session.commit()
+
+        acquire_blobs(db_session, [
+            PendingUpload(test_employee.id, "a.csv", "csv", UploadSource.MANUAL, digest, path, size)
+            for _ in range(2)
+        ])
+        db_session.commit()
+
+        assert db_session.query(StoredBlob).one().ref_count == 3
@@ -0,0 +1,101 @@
+import asyncio
+
+from app.main import app
+from app.routers.timesheets_upload import upload_body_limits
+from app.utils.upload_sniff import NOT_FOUND, file_part_head
+
+CHUNK = 64 * 1024
+
+
+def post_upload(headers, chunks, path="/timesheets/uploads/"):
+    """Drive the app directly; returns (status, chunks the app consumed)"""
+    pending = list(chunks)
+    sent = []
+
+    async def receive():
+        if pending:
+            body = pending.pop(0)
+            return {"type": "http.request", "body": body, "more_body": bool(pending)}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "client": ("test", 1), "server": ("test", 80),
+        "headers": [(b"content-type", b"multipart/form-data; boundary=xyz"), *headers],
+    }
+    asyncio.run(app(scope, receive, send))
+    start = next(message for message in sent if message["type"] == "http.response.start")
+    return start["status"], len(chunks) - len(pending)
+
+
+class TestBodySizeLimit:
+    def test_rejects_from_content_length_without_reading(self):
+        limit = upload_body_limits()["/timesheets/uploads/"]
+        chunks = [b"x" * CHUNK] * 4
+
+        status, consumed = post_upload([(b"content-length", str(limit + 1).encode())], chunks)
+
+        assert status == 413
+        assert consumed == 0
+
+    def test_stops_reading_chunked_body_at_limit(self):
+        limit = upload_body_limits()["/timesheets/uploads/"]
+        count = limit // CHUNK + 10
+        chunks = [b"--xyz\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.csv\"\r\n\r\n"]
+        chunks += [b"x" * CHUNK] * count
+
+        status, consumed = post_upload([(b"transfer-encoding", b"chunked")], chunks)
+
+        assert status == 413
+        assert consumed <= limit // CHUNK + 2
+
+    def test_caps_batch_uploads(self):
+        limit = upload_body_limits()["/timesheets/uploads/batch"]
+        chunks = [b"x" * CHUNK] * 4
+
+        status, consumed = post_upload(
+            [(b"content-length", str(limit + 1).encode())], chunks, path="/timesheets/uploads/batch"
+        )
+
+        assert status == 413
+        assert consumed == 0
+
+
+def multipart(filename, content_chunks):
+    """Body chunks of a form with employee_id and one file part"""
+    return [
+        b"--xyz\r\nContent-Disposition: form-data; name=\"employee_id\"\r\n\r\n1\r\n"
+        b"--xyz\r\nContent-Disposition: form-data; name=\"file\"; filename=\"" + filename.encode() + b"\"\r\n"
+        b"Content-Type: application/octet-stream\r\n\r\n",
+        *content_chunks,
+        b"\r\n--xyz--\r\n",
+    ]
+
+
+class TestUploadSniffing:
+    def test_rejects_mismatched_content_before_the_body_is_read(self):
+        chunks = multipart("scan.pdf", [b"MZ" + b"x" * (CHUNK - 2)] + [b"x" * CHUNK] * 30)
+
+        status, consumed = post_upload([(b"transfer-encoding", b"chunked")], chunks)
+
+        assert status == 400
+        assert consumed <= 2
+
+    def test_matching_content_streams_through(self):
+        chunks = multipart("scan.pdf", [b"%PDF-1.7\n" + b"x" * CHUNK, b"x" * CHUNK])
+
+        status, consumed = post_upload([(b"transfer-encoding", b"chunked")], chunks)
+
+        assert status != 400
+        assert consumed == len(chunks)
+
+    def test_finds_the_file_part_across_chunks(self):
+        body = b"".join(multipart("a.jpg", [b"\xff\xd8\xff\xe0", b"rest"]))
+        assert file_part_head(body, b"xyz", "file") == ("a.jpg", b"\xff\xd8\xff\xe0rest")
+        # The closing delimiter may be split across chunks: wait for more bytes
+        assert file_part_head(body[:body.index(b"rest") + 6], b"xyz", "file") is None
+        assert file_part_head(b"--xyz--\r\n", b"xyz", "file") == NOT_FOUND
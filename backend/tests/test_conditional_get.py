@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+
+import pytest
+from starlette.requests import Request
+
+from app.models import EmployeeClientAssignment, Timesheet, TimesheetStatus
+from app.routers import dashboard
+from app.utils.cache import LRUCache
+from app.utils.conditional import compute_etag, etag_matches
+
+
+@pytest.fixture(autouse=True)
+def empty_dashboard_cache():
+    dashboard._dashboard_cache.invalidate()
+
+
+def add_timesheet(db_session, employee, client, period_start, status=TimesheetStatus.SUBMITTED):
+    timesheet = Timesheet(employee_id=employee.id, client_id=client.id, period_start=period_start,
+                          period_end=period_start + timedelta(days=6), status=status)
+    db_session.add(timesheet)
+    db_session.commit()
+    return timesheet
+
+
+def request_with(if_none_match):
+    return Request({"type": "http", "headers": [(b"if-none-match", if_none_match.encode())]})
+
+
+class TestETags:
+    def test_matching(self):
+        etag = compute_etag("admin", {"month": 10}, (3, None))
+        assert etag.startswith('W/"')
+        assert etag != compute_etag("admin", {"month": 11}, (3, None))
+        assert etag_matches(request_with(f'"x", {etag}'), etag)
+        assert etag_matches(request_with(etag.removeprefix("W/")), etag)
+        assert etag_matches(request_with("*"), etag)
+        assert not etag_matches(request_with('"x"'), etag)
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+class TestDashboardCaching:
+    def test_not_modified_until_data_changes(self, api, db_session, test_admin, test_employee, test_client_entity):
+        db_session.add(EmployeeClientAssignment(employee_id=test_employee.id, client_id=test_client_entity.id))
+        db_session.commit()
+        client = api(test_admin)
+        params = {"year": 2026, "month": 10}
+
+        first = client.get("/dashboard/", params=params)
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        assert first.headers["cache-control"] == "private, no-cache"
+
+        repeat = client.get("/dashboard/", params=params, headers={"If-None-Match": etag})
+        assert repeat.status_code == 304 and repeat.content == b""
+        assert client.get("/dashboard/", params={"year": 2026, "month": 9},
+                          headers={"If-None-Match": etag}).status_code == 200
+
+        add_timesheet(db_session, test_employee, test_client_entity, date(2026, 10, 5))
+        changed = client.get("/dashboard/", params=params, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert changed.json()["stats"]["pending_timesheets"] == first.json()["stats"]["pending_timesheets"] + 1
+
+    def test_other_months_do_not_change_the_etag(self, api, db_session, test_admin, test_employee, test_client_entity):
+        client = api(test_admin)
+        params = {"year": 2026, "month": 10}
+        etag = client.get("/dashboard/", params=params).headers["etag"]
+
+        add_timesheet(db_session, test_employee, test_client_entity, date(2026, 6, 1))
+        assert client.get("/dashboard/", params=params, headers={"If-None-Match": etag}).status_code == 304
+        # A week crossing into the month is part of its window
+        add_timesheet(db_session, test_employee, test_client_entity, date(2026, 9, 28))
+        assert client.get("/dashboard/", params=params, headers={"If-None-Match": etag}).status_code == 200
+
+    def test_repeat_polls_skip_the_build(self, api, test_admin, monkeypatch):
+        client = api(test_admin)
+        first = client.get("/dashboard/", params={"year": 2026, "month": 10})
+
+        async def fail(*args):
+            raise AssertionError("dashboard rebuilt")
+        monkeypatch.setattr(dashboard, "build_dashboard", fail)
+
+        repeat = client.get("/dashboard/", params={"year": 2026, "month": 10})
+        assert repeat.content == first.content
+        assert repeat.json()["clients_with_employees"] == []
+
+
+class TestTimesheetListETag:
+    def test_timesheet_edits_change_the_etag(self, api, db_session, test_employee, test_client_entity):
+        timesheet = add_timesheet(db_session, test_employee, test_client_entity, date(2026, 10, 5), TimesheetStatus.DRAFT)
+        client = api(test_employee)
+
+        etag = client.get("/timesheets/").headers["etag"]
+        assert client.get("/timesheets/", headers={"If-None-Match": etag}).status_code == 304
+
+        timesheet.notes = "Corrected"
+        db_session.commit()
+        changed = client.get("/timesheets/", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.json()[0]["notes"] == "Corrected"
+
+    def test_scoped_per_employee(self, api, test_employee, test_manager):
+        assert api(test_employee).get("/timesheets/").headers["etag"] != api(test_manager).get("/timesheets/").headers["etag"]
@@ -0,0 +1,75 @@
+import pytest
+from cryptography.fernet import Fernet
+
+from app.config import settings
+from app.models import IntegrationConfig, IntegrationType
+from app.services import config_secrets
+
+
+@pytest.fixture
+def fresh_cipher(monkeypatch):
+    monkeypatch.setattr(settings, "encryption_key", Fernet.generate_key().decode())
+    monkeypatch.setattr(settings, "encryption_key_fallbacks", "")
+    config_secrets.reset_cipher()
+    yield
+    config_secrets.reset_cipher()
+
+
+class TestConfigSecrets:
+    def test_round_trip(self, fresh_cipher):
+        encrypted = config_secrets.encrypt_config({"email": "a@example.com"})
+        assert config_secrets.decrypt_config(encrypted) == {"email": "a@example.com"}
+
+    def test_cached_until_row_changes(self, fresh_cipher, db_session, monkeypatch):
+        config = IntegrationConfig(
+            type=IntegrationType.EMAIL,
+            config_data=config_secrets.encrypt_config({"email": "a@example.com"})
+        )
+        db_session.add(config)
+        db_session.commit()
+
+        calls = []
+        original = config_secrets.decrypt_config
+        monkeypatch.setattr(config_secrets, "decrypt_config", lambda s: calls.append(s) or original(s))
+
+        assert config_secrets.get_config_data(config)["email"] == "a@example.com"
+        assert config_secrets.get_config_data(config)["email"] == "a@example.com"
+        assert len(calls) == 1
+
+        config_secrets.set_config_data(config, {"email": "b@example.com"})
+        db_session.commit()
+
+        assert config_secrets.get_config_data(config)["email"] == "b@example.com"
+        assert len(calls) == 2
+
+    def test_returned_dict_does_not_leak_into_cache(self, fresh_cipher, db_session):
+        config = IntegrationConfig(
+            type=IntegrationType.DRIVE,
+            config_data=config_secrets.encrypt_config({"folder_id": "abc"})
+        )
+        db_session.add(config)
+        db_session.commit()
+
+        data = config_secrets.get_config_data(config)
+        data["webhook"] = {"channel_id": "x"}
+
+        assert "webhook" not in config_secrets.get_config_data(config)
+
+    def test_key_rotation(self, fresh_cipher, db_session, monkeypatch):
+        old_key = settings.encryption_key
+        config = IntegrationConfig(
+            type=IntegrationType.EMAIL,
+            config_data=config_secrets.encrypt_config({"email": "a@example.com"})
+        )
+        db_session.add(config)
+        db_session.commit()
+
+        new_key = Fernet.generate_key().decode()
+        monkeypatch.setattr(settings, "encryption_key", new_key)
+        monkeypatch.setattr(settings, "encryption_key_fallbacks", old_key)
+        config_secrets.reset_cipher()
+
+        assert config_secrets.rotate_encryption_keys(db_session) == 1
+
+        plain = Fernet(new_key.encode()).decrypt(config.config_data.encode())
+        assert b"a@example.com" in plain
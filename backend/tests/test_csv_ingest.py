@@ -0,0 +1,93 @@
+from datetime import date
+
+import pytest
+
+from app.services.csv_ingest import CsvLayoutError, aggregate_csv, detect_layout, iter_chunks
+
+
+def write(tmp_path, text, name="export.csv"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+class TestDetectLayout:
+    def test_header_aliases(self, tmp_path):
+        layout = detect_layout(write(tmp_path, "Employee Email,Work Date,Hours Worked,Notes\na@x.com,2026-01-05,8,Build\n"))
+
+        assert layout.has_header
+        assert layout.delimiter == ","
+        assert layout.date_format == "%Y-%m-%d"
+        assert layout.columns == {"employee": 0, "date": 1, "hours": 2, "description": 3}
+
+    def test_headerless_semicolon_file(self, tmp_path):
+        layout = detect_layout(write(tmp_path, "a@x.com;25.01.2026;8;1\nb@x.com;26.01.2026;7.5;0\n"))
+
+        assert not layout.has_header
+        assert layout.delimiter == ";"
+        assert layout.date_format == "%d.%m.%Y"
+        assert layout.columns == {"employee": 0, "date": 1, "hours": 2, "overtime": 3}
+
+    def test_day_first_dates(self, tmp_path):
+        layout = detect_layout(write(tmp_path, "date,hours\n05/01/2026,8\n25/01/2026,8\n"))
+
+        assert layout.date_format == "%d/%m/%Y"
+
+    def test_unrecognized_file(self, tmp_path):
+        with pytest.raises(CsvLayoutError):
+            detect_layout(write(tmp_path, "name,value\nx,1\n"))
+
+
+class TestAggregate:
+    def test_weekly_totals_per_employee(self, tmp_path):
+        path = write(tmp_path, (
+            "employee,date,hours,overtime\n"
+            "a@x.com,2026-01-05,8,1\n"
+            "a@x.com,2026-01-09,6,0\n"
+            "a@x.com,2026-01-12,8,0\n"
+            "b@x.com,2026-01-06,4,0\n"
+        ))
+
+        summary = aggregate_csv(path, period="week", week_start=1)
+
+        assert summary.rows == 4 and summary.invalid_rows == 0
+        totals = [(t.employee_key, t.period_start, t.hours, t.overtime_hours, t.rows) for t in summary.totals]
+        assert totals == [
+            ("a@x.com", date(2026, 1, 5), 14.0, 1.0, 2),
+            ("a@x.com", date(2026, 1, 12), 8.0, 0.0, 1),
+            ("b@x.com", date(2026, 1, 5), 4.0, 0.0, 1),
+        ]
+        assert summary.totals[0].first_date == date(2026, 1, 5)
+        assert summary.totals[0].last_date == date(2026, 1, 9)
+
+    def test_sunday_weeks_and_months(self, tmp_path):
+        path = write(tmp_path, "date,hours\n2026-01-03,1\n2026-01-04,2\n2026-02-01,3\n")
+
+        weeks = aggregate_csv(path, period="week", week_start=0)
+        months = aggregate_csv(path, period="month")
+
+        assert [t.period_start for t in weeks.totals] == [date(2025, 12, 28), date(2026, 1, 4), date(2026, 2, 1)]
+        assert [(t.period_start, t.hours) for t in months.totals] == [(date(2026, 1, 1), 3.0), (date(2026, 2, 1), 3.0)]
+
+    def test_invalid_rows_are_reported_and_excluded(self, tmp_path):
+        path = write(tmp_path, "date,hours\n2026-01-05,8\nsoon,8\n2026-01-06,30\n2026-01-07,abc\n")
+
+        summary = aggregate_csv(path, period="day")
+
+        assert summary.rows == 4 and summary.invalid_rows == 3
+        assert summary.errors[0] == "Row 2: unrecognized date 'soon'"
+        assert "between 0 and 24" in summary.errors[1]
+        assert [t.hours for t in summary.totals] == [8.0]
+
+    def test_chunking_does_not_change_totals(self, tmp_path):
+        lines = ["employee,client,date,hours"]
+        for i in range(500):
+            lines.append(f"e{i % 7}@x.com,C{i % 3},2026-01-{1 + i % 28:02d},{(i % 9) / 2}")
+        path = write(tmp_path, "\n".join(lines) + "\n")
+
+        whole = aggregate_csv(path, period="week", chunk_rows=10_000)
+        chunked = aggregate_csv(path, period="week", chunk_rows=37)
+
+        assert len(list(iter_chunks(path, chunk_rows=37))) == 14
+        assert whole.totals == chunked.totals
+        assert sum(t.rows for t in chunked.totals) == 500
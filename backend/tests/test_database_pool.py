@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config import settings
+from app.database import TimedAsyncQueuePool, TimedQueuePool, configure_engine, engine_options
+from app.utils.metrics import metrics
+
+
+@pytest.fixture
+def pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_size", 1)
+    monkeypatch.setattr(settings, "db_max_overflow", 0)
+    monkeypatch.setattr(settings, "db_pool_timeout_seconds", 0.05)
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestEngineOptions:
+    def test_postgres_statement_timeout(self, pool_settings):
+        options = engine_options("postgresql://u@db/app")
+
+        assert options["poolclass"] is TimedQueuePool
+        assert options["pool_size"] == 1 and options["pool_pre_ping"] is True
+        assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    def test_asyncpg_statement_timeout(self, pool_settings):
+        options = engine_options("postgresql+asyncpg://u@db/app")
+
+        assert options["poolclass"] is TimedAsyncQueuePool
+        assert options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+    def test_pgbouncer_disables_prepared_statement_reuse(self, pool_settings, monkeypatch):
+        monkeypatch.setattr(settings, "db_pgbouncer", True)
+
+        connect_args = engine_options("postgresql+asyncpg://u@bouncer/app")["connect_args"]
+
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        assert connect_args["prepared_statement_name_func"]() != connect_args["prepared_statement_name_func"]()
+        assert "server_settings" not in connect_args
+        assert "connect_args" not in engine_options("postgresql+psycopg2://u@bouncer/app")
+
+    @pytest.mark.parametrize("url", ["postgresql+psycopg://u@bouncer/app", "postgresql+psycopg_async://u@bouncer/app"])
+    def test_pgbouncer_disables_psycopg3_prepared_statements(self, pool_settings, monkeypatch, url):
+        monkeypatch.setattr(settings, "db_pgbouncer", True)
+
+        assert engine_options(url)["connect_args"] == {"prepare_threshold": None}
+
+    def test_in_memory_sqlite_keeps_defaults(self, pool_settings):
+        assert engine_options("sqlite://") == {}
+
+
+class TestTimedQueuePool:
+    def test_checkout_metrics_and_timeouts(self, pool_settings, tmp_path):
+        url = f"sqlite:///{tmp_path / 'pool.db'}"
+        engine = configure_engine(create_engine(url, **engine_options(url)), "test")
+
+        connection = engine.connect()
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        snapshot = metrics.snapshot()
+        connection.close()
+
+        assert snapshot["gauges"]["db.test.pool_saturation"] == 1.0
+        assert snapshot["timings"]["db.test.pool_checkout_wait"]["count"] == 2
+        assert snapshot["counters"]["db.test.pool_timeouts"] == 1
+        assert metrics.snapshot()["gauges"]["db.test.pool_checked_out"] == 0
+
+        engine.dispose()
+        assert engine.pool.pool_name == "test"
@@ -0,0 +1,189 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.auth import create_access_token, create_url_ticket, get_stream_employee
+from app.database import SyncSessionAdapter
+from app.main import app
+from app.models import Client, Timesheet, TimesheetStatus
+from app.routers.events import stream_events
+from app.services.events import EventBroker, PgNotifyBridge, broker, publish_after_commit
+
+
+class FakeRequest:
+    """Reports a disconnect after a fixed number of checks"""
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    async def is_disconnected(self):
+        self.checks -= 1
+        return self.checks < 0
+
+
+def add_timesheet(db_session, employee):
+    client = Client(name="Acme", code="ACME")
+    db_session.add(client)
+    db_session.flush()
+    timesheet = Timesheet(employee_id=employee.id, client_id=client.id, period_start=date(2026, 10, 5),
+                          period_end=date(2026, 10, 11), status=TimesheetStatus.DRAFT)
+    db_session.add(timesheet)
+    db_session.commit()
+    return timesheet
+
+
+class TestEventBroker:
+    async def test_fans_out_by_topic_and_employee(self):
+        events = EventBroker()
+        everything = events.subscribe(["uploads", "timesheets"])
+        own = events.subscribe(["uploads"], employee_id=1)
+
+        events.dispatch("uploads", "upload.created", {"id": 10, "employee_id": 2})
+        events.dispatch("uploads", "upload.created", {"id": 11, "employee_id": 1})
+        events.dispatch("integrations", "integration.synced", {"type": "drive"})
+
+        assert [(await everything.get(1)).data["id"] for _ in range(2)] == [10, 11]
+        assert (await own.get(1)).data["id"] == 11
+        assert await own.get(0.05) is None
+        events.unsubscribe(own)
+        assert events.subscriber_count == 1
+
+    async def test_slow_subscriber_is_told_to_resync(self):
+        events = EventBroker()
+        subscription = events.subscribe(["uploads"], queue_size=2)
+
+        for i in range(3):
+            events.dispatch("uploads", "upload.created", {"id": i})
+        await subscription.get(1)
+
+        assert subscription.lagged
+        assert subscription.queue.qsize() == 1
+
+    async def test_resume_replays_missed_events(self):
+        events = EventBroker()
+        first = events.dispatch("timesheets", "timesheet.submitted", {"id": 1})
+        events.dispatch("timesheets", "timesheet.approved", {"id": 1})
+
+        subscription = events.subscribe(["timesheets"], last_event_id=first.id)
+
+        assert (await subscription.get(1)).type == "timesheet.approved"
+        assert await subscription.get(0.05) is None
+        assert not subscription.lagged
+
+    async def test_resume_from_unknown_event_resyncs(self):
+        events = EventBroker(history=2)
+        first = events.dispatch("timesheets", "timesheet.submitted", {"id": 1})
+        for _ in range(2):
+            events.dispatch("timesheets", "timesheet.approved", {"id": 1})
+
+        subscription = events.subscribe(["timesheets"], last_event_id=first.id)
+
+        assert subscription.lagged
+        assert await subscription.get(0.05) is None
+
+    async def test_workers_share_published_ids(self):
+        # With the NOTIFY bridge every worker dispatches the id the publisher assigned
+        worker_a, worker_b = EventBroker(), EventBroker()
+        first_a = worker_a.dispatch("uploads", "upload.created", {"id": 1}, event_id="evt-1")
+        worker_b.dispatch("uploads", "upload.created", {"id": 1}, event_id="evt-1")
+        worker_b.dispatch("uploads", "upload.analyzed", {"id": 1}, event_id="evt-2")
+
+        subscription = worker_b.subscribe(["uploads"], last_event_id=first_a.id)
+
+        assert (await subscription.get(1)).id == "evt-2"
+
+
+class TestPgNotifyBridge:
+    def test_requires_a_listening_driver(self):
+        with pytest.raises(ValueError, match="psycopg2, psycopg"):
+            PgNotifyBridge("sqlite://", "events")
+
+    def test_picks_up_the_url_driver(self):
+        assert PgNotifyBridge("postgresql+psycopg2://localhost/app", "events").engine.dialect.driver == "psycopg2"
+
+
+class TestPublishAfterCommit:
+    async def test_published_on_commit_only(self, db_session):
+        subscription = broker.subscribe(["integrations"])
+        try:
+            publish_after_commit(db_session, "integrations", "integration.synced", {"type": "drive"})
+            db_session.rollback()
+            db_session.commit()
+            assert await subscription.get(0.05) is None
+
+            publish_after_commit(db_session, "integrations", "integration.synced", {"type": "email"})
+            db_session.commit()
+            assert (await subscription.get(1)).data == {"type": "email"}
+        finally:
+            broker.unsubscribe(subscription)
+
+    async def test_submitting_a_timesheet_publishes(self, api, db_session, test_employee):
+        timesheet = add_timesheet(db_session, test_employee)
+        subscription = broker.subscribe(["timesheets"], employee_id=test_employee.id)
+        try:
+            response = api(test_employee).post(f"/timesheets/{timesheet.id}/submit")
+            event = await subscription.get(1)
+        finally:
+            broker.unsubscribe(subscription)
+
+        assert response.status_code == 200
+        assert event.type == "timesheet.submitted"
+        assert event.data == {"id": timesheet.id, "employee_id": test_employee.id,
+                              "client_id": timesheet.client_id, "status": "submitted"}
+
+
+class TestEventStream:
+    async def test_streams_own_events_to_employees(self, test_employee):
+        response = await stream_events(FakeRequest(checks=2), topics=None, last_event_id=None,
+                                       current_employee=test_employee)
+        chunks = response.body_iterator
+        assert await chunks.__anext__() == "retry: 5000\n\n"
+
+        broker.dispatch("integrations", "integration.synced", {"type": "drive"})
+        broker.dispatch("uploads", "upload.created", {"id": 1, "employee_id": test_employee.id + 1})
+        event = broker.dispatch("uploads", "upload.analyzed", {"id": 2, "employee_id": test_employee.id})
+
+        assert await chunks.__anext__() == event.encode()
+        assert response.headers["cache-control"] == "no-cache"
+        await chunks.aclose()
+        assert broker.subscriber_count == 0
+
+    def test_unknown_topic_is_rejected(self, test_admin):
+        app.dependency_overrides[get_stream_employee] = lambda: test_admin
+        try:
+            response = TestClient(app).get("/events/stream", params={"topics": "uploads,weather"})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Unknown topics: weather"
+
+    def test_requires_a_token(self):
+        assert TestClient(app).get("/events/stream").status_code == 401
+
+    async def test_accepts_a_ticket_for_the_stream_only(self, db_session, test_employee):
+        def authenticate(ticket):
+            request = Request({"type": "http", "method": "GET", "path": "/events/stream", "headers": []})
+            return get_stream_employee(request, None, ticket, SyncSessionAdapter(db_session))
+
+        assert (await authenticate(create_url_ticket(test_employee.email, "/events/stream"))).id == test_employee.id
+        for ticket in (create_url_ticket(test_employee.email, "/timesheets/uploads/1/content"),
+                       create_access_token({"sub": test_employee.email})):
+            with pytest.raises(HTTPException) as error:
+                await authenticate(ticket)
+            assert error.value.status_code == 401
+
+    def test_access_token_in_query_is_rejected(self, test_employee):
+        access_token = create_access_token({"sub": test_employee.email})
+        assert TestClient(app).get("/events/stream", params={"access_token": access_token}).status_code == 401
+
+    async def test_unknown_last_event_id_starts_with_resync(self, test_employee):
+        response = await stream_events(FakeRequest(checks=1), topics=None, last_event_id="gone",
+                                       current_employee=test_employee)
+        chunks = response.body_iterator
+        assert await chunks.__anext__() == "retry: 5000\n\n"
+        assert await chunks.__anext__() == "event: resync\ndata: {}\n\n"
+        await chunks.aclose()
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+
+from app.models import Client, EmployeeClientAssignment, Timesheet, TimesheetStatus
+from app.services.exports import EXPORT_COLUMNS, iter_export_lines
+
+START, END = date(2026, 1, 1), date(2026, 12, 31)
+
+
+@pytest.fixture
+def export_data(db_session, test_employee):
+    test_employee.pay_rate = 20.0
+    acme = Client(name="Acme", code="ACME", bill_rate=100.0, overtime_multiplier=1.5)
+    unbilled = Client(name="Internal", code="INT")
+    db_session.add_all([acme, unbilled])
+    db_session.flush()
+    db_session.add_all([
+        EmployeeClientAssignment(employee_id=test_employee.id, client_id=acme.id, pay_rate=30.0),
+        # Two approved timesheets for one period are summed into one line
+        Timesheet(employee_id=test_employee.id, client_id=acme.id, period_start=date(2026, 10, 5),
+                  period_end=date(2026, 10, 11), status=TimesheetStatus.APPROVED, total_hours=30, total_overtime=5),
+        Timesheet(employee_id=test_employee.id, client_id=acme.id, period_start=date(2026, 10, 5),
+                  period_end=date(2026, 10, 11), status=TimesheetStatus.APPROVED, total_hours=15, total_overtime=0),
+        Timesheet(employee_id=test_employee.id, client_id=acme.id, period_start=date(2026, 10, 12),
+                  period_end=date(2026, 10, 18), status=TimesheetStatus.SUBMITTED, total_hours=40),
+        Timesheet(employee_id=test_employee.id, client_id=unbilled.id, period_start=date(2026, 10, 12),
+                  period_end=date(2026, 10, 18), status=TimesheetStatus.APPROVED, total_hours=8, total_overtime=0),
+    ])
+    db_session.commit()
+    return acme, unbilled
+
+
+class TestExportLines:
+    def test_payroll_uses_assignment_then_employee_rate(self, db_session, export_data):
+        acme, unbilled = export_data
+
+        first, second = iter_export_lines(db_session, "payroll", START, END)
+
+        assert (first.client_id, first.timesheets) == (acme.id, 2)
+        assert (first.regular_hours, first.overtime_hours, first.rate) == (40, 5, 30.0)
+        assert first.amount == 40 * 30.0 + 5 * 30.0 * 1.5
+        assert (second.client_id, second.rate, second.amount) == (unbilled.id, 20.0, 160.0)
+
+    def test_billing_without_a_rate_has_no_amount(self, db_session, export_data):
+        first, second = iter_export_lines(db_session, "billing", START, END)
+
+        assert first.amount == 40 * 100.0 + 5 * 100.0 * 1.5
+        assert second.rate is None and second.amount is None
+
+    def test_unknown_kind(self, db_session):
+        with pytest.raises(ValueError):
+            next(iter_export_lines(db_session, "bonus", START, END))
+
+
+class TestExportEndpoints:
+    def test_payroll_ndjson(self, api, export_data, test_admin):
+        response = api(test_admin).get("/exports/payroll", params={"start": START, "end": END})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["amount"] for line in lines] == [1425.0, 160.0]
+        assert lines[0]["period_start"] == "2026-10-05"
+
+    def test_billing_csv(self, api, export_data, test_admin):
+        acme, _ = export_data
+        response = api(test_admin).get(
+            "/exports/billing", params={"start": START, "end": END, "client_id": acme.id, "format": "csv"}
+        )
+
+        assert response.status_code == 200
+        assert 'filename="billing-2026-01-01-2026-12-31.csv"' in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert list(rows[0]) == EXPORT_COLUMNS
+        assert [(row["client_code"], row["amount"]) for row in rows] == [("ACME", "4750.0")]
+
+    def test_employees_cannot_export(self, api, test_employee):
+        assert api(test_employee).get("/exports/payroll").status_code == 403
+
+    def test_rejects_bad_parameters(self, api, test_admin):
+        client = api(test_admin)
+        assert client.get("/exports/billing", params={"format": "xlsx"}).status_code == 422
+        assert client.get("/exports/billing", params={"start": "2026-02-01", "end": "2026-01-01"}).status_code == 400
@@ -0,0 +1,46 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.models import SubmissionFrequency, TimesheetStatus
+from app.routers.dashboard import DashboardResponse
+from app.utils import fast_json
+
+ROWS = {
+    "stats": {"total_clients": 1, "total_employees": 1, "pending_timesheets": 0,
+              "approved_timesheets": 0, "missing_timesheets": 1},
+    "clients_with_employees": [{
+        "client_id": 1, "client_name": "Acmé", "client_code": "ACME", "bill_rate": None,
+        "submission_frequency": SubmissionFrequency.BIWEEKLY,
+        "employees": [{
+            "employee_id": 2, "employee_name": "Test Employee", "employee_email": "test@example.com",
+            "pay_rate": 42.5, "overtime_allowed": True,
+            "periods": [{"period_start": date(2026, 10, 5), "period_end": date(2026, 10, 18),
+                         "status": "missing", "timesheet_id": None}]
+        }]
+    }]
+}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(fast_json, "orjson", None)
+
+
+class TestFastJSON:
+    def test_matches_the_response_model(self, encoder):
+        expected = DashboardResponse.model_validate(ROWS).model_dump_json()
+        assert json.loads(fast_json.dumps(ROWS)) == json.loads(expected)
+
+    def test_encodes_values(self, encoder):
+        body = fast_json.dumps({"at": datetime(2026, 10, 5, 9, 30), "status": TimesheetStatus.APPROVED, "rate": Decimal("1.5")})
+        assert json.loads(body) == {"at": "2026-10-05T09:30:00", "status": "approved", "rate": 1.5}
+
+    def test_rejects_unknown_types(self, encoder):
+        with pytest.raises(TypeError):
+            fast_json.dumps({"value": object()})
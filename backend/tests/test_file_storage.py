@@ -0,0 +1,43 @@
+import io
+import pytest
+
+from app.services.file_storage import (
+    iter_upload_chunks, matches_file_format, FileTooLargeError, FileContentMismatchError
+)
+
+
+class TestFileStorage:
+    def test_magic_bytes(self):
+        assert matches_file_format(b"%PDF-1.7\n...", "pdf")
+        assert matches_file_format(b"\xff\xd8\xff\xe0\x00\x10JFIF", "jpg")
+        assert matches_file_format(b"date,hours\n2026-01-05,8\n", "csv")
+        assert not matches_file_format(b"\x89PNG\r\n\x1a\n", "jpg")
+        assert not matches_file_format(b"MZ\x90\x00\x03\x00", "pdf")
+        assert not matches_file_format(b"PK\x03\x04\x00\x00", "csv")
+
+    def test_streams_in_chunks(self):
+        data = b"%PDF-1.4\n" + b"x" * 1000
+        chunks = list(iter_upload_chunks(io.BytesIO(data), "pdf", max_size=2000, chunk_size=256))
+
+        assert len(chunks) == 4
+        assert b"".join(chunks) == data
+
+    def test_rejects_bad_magic_before_reading_rest(self):
+        stream = io.BytesIO(b"not a pdf" + b"x" * 10000)
+
+        with pytest.raises(FileContentMismatchError):
+            next(iter_upload_chunks(stream, "pdf", chunk_size=64))
+
+        assert stream.tell() == 64
+
+    def test_rejects_oversized_upload(self):
+        stream = io.BytesIO(b"date,hours\n" + b"2026-01-05,8\n" * 1000)
+
+        with pytest.raises(FileTooLargeError):
+            list(iter_upload_chunks(stream, "csv", max_size=1024, chunk_size=512))
+
+        assert stream.tell() < 2048
+
+    def test_rejects_empty_file(self):
+        with pytest.raises(FileContentMismatchError):
+            list(iter_upload_chunks(io.BytesIO(b""), "csv"))
@@ -0,0 +1,123 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import Client, Employee, EmployeeClientAssignment, SubmissionFrequency, Timesheet, TimesheetStatus, UserRole
+from app.services.missing_timesheets import MissingTimesheet, count_missing_timesheets, iter_missing_timesheets
+
+
+# October 2026: Mondays are the 5th, 12th, 19th and 26th
+START, END = date(2026, 10, 1), date(2026, 10, 31)
+
+
+def add_employee(db_session, email, **kwargs):
+    employee = Employee(email=email, hashed_password="x", first_name="E", last_name=email, role=UserRole.EMPLOYEE, **kwargs)
+    db_session.add(employee)
+    db_session.flush()
+    return employee
+
+
+@pytest.fixture
+def clients(db_session):
+    weekly = Client(name="Weekly", code="WK", default_submission_frequency=SubmissionFrequency.WEEKLY, week_start_day=1)
+    monthly = Client(name="Monthly", code="MO", default_submission_frequency=SubmissionFrequency.MONTHLY)
+    db_session.add_all([weekly, monthly])
+    db_session.flush()
+    return weekly, monthly
+
+
+class TestMissingTimesheets:
+    def test_expected_periods_minus_timesheets(self, db_session, clients):
+        weekly, monthly = clients
+        alice = add_employee(db_session, "alice@example.com")
+        bob = add_employee(db_session, "bob@example.com")
+        db_session.add_all([
+            EmployeeClientAssignment(employee_id=alice.id, client_id=weekly.id),
+            EmployeeClientAssignment(employee_id=bob.id, client_id=monthly.id),
+            # Partial-period timesheets still count for the period they overlap
+            Timesheet(employee_id=alice.id, client_id=weekly.id, period_start=date(2026, 10, 5),
+                      period_end=date(2026, 10, 7), status=TimesheetStatus.SUBMITTED),
+        ])
+        db_session.commit()
+
+        missing = list(iter_missing_timesheets(db_session, START, END))
+
+        alice_weeks = [m.period_start for m in missing if m.employee_id == alice.id]
+        assert alice_weeks == [date(2026, 9, 28), date(2026, 10, 12), date(2026, 10, 19), date(2026, 10, 26)]
+        assert MissingTimesheet(bob.id, monthly.id, date(2026, 10, 1), date(2026, 10, 31)) in missing
+        assert count_missing_timesheets(db_session, START, END) == len(missing) == 5
+
+    def test_assignment_dates_and_inactive_rows(self, db_session, clients):
+        weekly, _ = clients
+        joiner = add_employee(db_session, "joiner@example.com")
+        leaver = add_employee(db_session, "leaver@example.com", is_active=False)
+        db_session.add_all([
+            EmployeeClientAssignment(employee_id=joiner.id, client_id=weekly.id, start_date=date(2026, 10, 20)),
+            EmployeeClientAssignment(employee_id=leaver.id, client_id=weekly.id),
+        ])
+        db_session.commit()
+
+        missing = list(iter_missing_timesheets(db_session, START, END))
+
+        assert [(m.employee_id, m.period_start) for m in missing] == [
+            (joiner.id, date(2026, 10, 19)), (joiner.id, date(2026, 10, 26))
+        ]
+
+    def test_drafts_count_as_missing_when_submitted_only(self, db_session, clients):
+        weekly, _ = clients
+        alice = add_employee(db_session, "alice@example.com")
+        db_session.add_all([
+            EmployeeClientAssignment(employee_id=alice.id, client_id=weekly.id),
+            Timesheet(employee_id=alice.id, client_id=weekly.id, period_start=date(2026, 10, 19),
+                      period_end=date(2026, 10, 25), status=TimesheetStatus.DRAFT),
+        ])
+        db_session.commit()
+        week = (date(2026, 10, 19), date(2026, 10, 25))
+
+        assert count_missing_timesheets(db_session, *week) == 0
+        assert count_missing_timesheets(db_session, *week, submitted_only=True) == 1
+
+    def test_streaming_endpoint(self, api, db_session, clients, test_admin):
+        weekly, _ = clients
+        alice = add_employee(db_session, "alice@example.com")
+        db_session.add(EmployeeClientAssignment(employee_id=alice.id, client_id=weekly.id))
+        db_session.commit()
+        response = api(test_admin).get("/dashboard/missing-timesheets", params={
+            "start": "2026-10-19", "end": "2026-11-01", "client_id": weekly.id
+        })
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["period_start"] for row in rows] == ["2026-10-19", "2026-10-26"]
+
+    def test_dashboard_agrees_with_engine(self, api, db_session, clients, test_admin):
+        from app.routers.dashboard import _dashboard_cache
+
+        weekly, monthly = clients
+        alice = add_employee(db_session, "alice@example.com")
+        joiner = add_employee(db_session, "joiner@example.com")
+        db_session.add_all([
+            EmployeeClientAssignment(employee_id=alice.id, client_id=weekly.id),
+            EmployeeClientAssignment(employee_id=joiner.id, client_id=weekly.id, start_date=date(2026, 10, 20)),
+            # Partial-period parser draft, and one starting before the month's first week
+            Timesheet(employee_id=alice.id, client_id=weekly.id, period_start=date(2026, 10, 5),
+                      period_end=date(2026, 10, 7), status=TimesheetStatus.DRAFT),
+            Timesheet(employee_id=alice.id, client_id=weekly.id, period_start=date(2026, 9, 25),
+                      period_end=date(2026, 9, 29), status=TimesheetStatus.SUBMITTED),
+        ])
+        db_session.commit()
+
+        _dashboard_cache.invalidate()
+        data = api(test_admin).get("/dashboard/", params={"year": 2026, "month": 10}).json()
+
+        statuses = {
+            (employee["employee_id"], period["period_start"]): period["status"]
+            for client in data["clients_with_employees"] for employee in client["employees"]
+            for period in employee["periods"]
+        }
+        assert statuses[(alice.id, "2026-09-28")] == "submitted"
+        assert statuses[(alice.id, "2026-10-05")] == "draft"
+        assert (joiner.id, "2026-10-12") not in statuses
+        assert data["stats"]["missing_timesheets"] == count_missing_timesheets(db_session, START, END) == 5
@@ -0,0 +1,85 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.models import (
+    Client, Employee, EmployeeClientAssignment, Notification, NotificationStatus, SubmissionFrequency,
+    Timesheet, TimesheetStatus, UserRole
+)
+from app.services.notifications import RecipientSelector, resolve_recipients
+
+
+WEEK = (date(2026, 10, 12), date(2026, 10, 18))
+
+
+@pytest.fixture
+def staff(db_session):
+    client = Client(name="Acme", code="ACME", default_submission_frequency=SubmissionFrequency.WEEKLY, week_start_day=1)
+    other = Client(name="Other", code="OTHER")
+    db_session.add_all([client, other])
+    db_session.flush()
+    employees = [
+        Employee(email=f"e{i}@example.com", hashed_password="x", first_name="E", last_name=str(i), role=UserRole.EMPLOYEE)
+        for i in range(4)
+    ]
+    db_session.add_all(employees)
+    db_session.flush()
+    db_session.add_all([
+        EmployeeClientAssignment(employee_id=employees[0].id, client_id=client.id),
+        EmployeeClientAssignment(employee_id=employees[1].id, client_id=client.id),
+        EmployeeClientAssignment(employee_id=employees[2].id, client_id=other.id),
+        Timesheet(employee_id=employees[1].id, client_id=client.id, period_start=WEEK[0],
+                  period_end=WEEK[1], status=TimesheetStatus.SUBMITTED),
+    ])
+    db_session.commit()
+    return client, employees
+
+
+class TestResolveRecipients:
+    def test_ids_and_selectors(self, db_session, staff):
+        client, employees = staff
+        ids = [e.id for e in employees]
+
+        assert resolve_recipients(db_session, [ids[0], ids[0], 99999]) == [ids[0]]
+        assert resolve_recipients(db_session, selector=RecipientSelector(client_id=client.id)) == ids[:2]
+        missing = RecipientSelector(client_id=client.id, missing_timesheets=True, start=WEEK[0], end=WEEK[1])
+        assert resolve_recipients(db_session, selector=missing) == [ids[0]]
+        assert resolve_recipients(db_session, [ids[3]], missing) == [ids[0], ids[3]]
+
+
+class TestSendBulk:
+    def test_statement_count_is_constant(self, db_session, staff, api, test_admin):
+        _, employees = staff
+        client = api(test_admin)
+        ids = [e.id for e in employees]
+        statements = []
+        engine = db_session.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            response = client.post("/notifications/send-bulk", json={
+                "employee_ids": ids + [99999], "subject": "Hi", "message": "Body"
+            })
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert response.status_code == 201
+        body = response.json()
+        assert [n["employee_id"] for n in body] == ids
+        assert all(n["status"] == "pending" and n["id"] for n in body)
+        assert len(statements) == 2
+        assert db_session.query(Notification).count() == 4
+
+    def test_selector_targeting(self, db_session, staff, api, test_admin):
+        client, employees = staff
+        response = api(test_admin).post("/notifications/send-bulk", json={
+            "selector": {"client_id": client.id, "missing_timesheets": True, "start": "2026-10-12", "end": "2026-10-18"}
+        })
+
+        assert response.status_code == 201
+        assert [n["employee_id"] for n in response.json()] == [employees[0].id]
+        assert db_session.query(Notification).one().status == NotificationStatus.PENDING
+
+    def test_recipients_required(self, api, test_admin):
+        assert api(test_admin).post("/notifications/send-bulk", json={"subject": "Hi"}).status_code == 422
@@ -0,0 +1,271 @@
+import json
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Employee, Notification, NotificationStatus, UserRole
+from app.services import outbox
+from app.services.mailer import SMTPPool
+from app.services.outbox import (
+    EmailChannel, NotificationChannel, OutboxWorker, RateLimiter, WebhookChannel, parse_rate_limits
+)
+from app.utils.rate_limit import TokenBucket
+
+
+class FakeChannel(NotificationChannel):
+    name = "fake"
+
+    def __init__(self, error=None, transient=True):
+        self.error = error
+        self.transient = transient
+        self.delivered = []
+
+    def deliver(self, message):
+        if self.error:
+            raise self.error
+        self.delivered.append(message.id)
+
+    def is_transient(self, error):
+        return self.transient
+
+
+class WebhookSink(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), WebhookHandler)
+        self.requests = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/hook"
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.headers["Idempotency-Key"], body))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def webhook_server():
+    server = WebhookSink()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_worker(db_session):
+    workers = []
+
+    def make(channels, rate_limiter=None, batch_size=50):
+        worker = OutboxWorker(
+            sessionmaker(bind=db_session.get_bind()), channels, threads=4, batch_size=batch_size,
+            rate_limiter=rate_limiter or RateLimiter({}, 0)
+        )
+        workers.append(worker)
+        return worker
+
+    yield make
+    for worker in workers:
+        worker.close()
+
+
+def queue(db_session, employee, count=1, channel="fake"):
+    rows = [
+        Notification(employee_id=employee.id, channel=channel, notification_type="custom",
+                     subject=f"Message {i}", message="Body", status=NotificationStatus.PENDING)
+        for i in range(count)
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    return [row.id for row in rows]
+
+
+def state(db_session):
+    db_session.expire_all()
+    return db_session.query(Notification).order_by(Notification.id).all()
+
+
+class TestTokenBucket:
+    def test_refills_at_rate(self):
+        bucket = TokenBucket(rate=1000, capacity=2)
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == 0
+        assert 0 < bucket.try_acquire() <= 0.001
+        assert bucket.acquire(timeout=0.1) == 0
+
+    def test_parse_rate_limits(self):
+        assert parse_rate_limits("email=50, webhook=2.5") == {"email": 50.0, "webhook": 2.5}
+
+    def test_rate_limits_are_split_across_processes(self):
+        limiter = RateLimiter({"email": 50}, domain_rate=2, processes=4)
+        assert limiter.channels["email"].rate == 12.5
+        assert limiter.domains.rate == 0.5
+
+    def test_channels_must_implement_deliver(self):
+        class Incomplete(NotificationChannel):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class FakeSMTP:
+    def __init__(self, rset_error=None):
+        self.rset_error = rset_error
+        self.resets = 0
+        self.closed = False
+
+    def rset(self):
+        if self.rset_error:
+            raise self.rset_error
+        self.resets += 1
+
+    def close(self):
+        self.closed = True
+
+
+class TestSMTPPool:
+    def make_pool(self, monkeypatch, smtp):
+        pool = SMTPPool("127.0.0.1", 25, size=1, timeout=5)
+        monkeypatch.setattr(pool, "_connect", lambda: smtp)
+        return pool
+
+    def test_refused_message_resets_and_returns_session(self, monkeypatch):
+        smtp = FakeSMTP()
+        pool = self.make_pool(monkeypatch, smtp)
+
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            with pool.session():
+                raise smtplib.SMTPRecipientsRefused({"x@example.com": (550, b"No such user")})
+
+        assert smtp.resets == 1 and not smtp.closed
+        assert pool._idle.get_nowait() is smtp
+
+    def test_failed_reset_closes_session(self, monkeypatch):
+        smtp = FakeSMTP(rset_error=smtplib.SMTPServerDisconnected())
+        pool = self.make_pool(monkeypatch, smtp)
+
+        with pytest.raises(smtplib.SMTPDataError):
+            with pool.session():
+                raise smtplib.SMTPDataError(554, b"Rejected")
+
+        assert smtp.closed
+        assert pool._idle.empty()
+
+    def test_broken_connection_closes_session(self, monkeypatch):
+        smtp = FakeSMTP()
+        pool = self.make_pool(monkeypatch, smtp)
+
+        with pytest.raises(smtplib.SMTPServerDisconnected):
+            with pool.session():
+                raise smtplib.SMTPServerDisconnected()
+
+        assert smtp.closed and smtp.resets == 0
+        assert pool._idle.empty()
+
+
+class TestOutboxWorker:
+    def test_email_over_smtp(self, db_session, test_employee, make_worker, smtp_server):
+        pool = SMTPPool("127.0.0.1", smtp_server.server_address[1], size=2, timeout=5)
+        queue(db_session, test_employee, 10, channel="email")
+
+        summary = make_worker({"email": EmailChannel(pool)}, batch_size=4).drain()
+
+        assert summary["sent"] == 10
+        assert sorted(m["Subject"] for m in smtp_server.messages) == sorted(f"Message {i}" for i in range(10))
+        assert smtp_server.connections <= 2
+        rows = state(db_session)
+        assert {row.status for row in rows} == {NotificationStatus.SENT}
+        assert all(row.sent_at and row.attempts == 1 and row.locked_until is None for row in rows)
+
+    def test_webhook(self, db_session, test_employee, make_worker, webhook_server):
+        [notification_id] = queue(db_session, test_employee, channel="webhook")
+
+        assert make_worker({"webhook": WebhookChannel(webhook_server.url)}).drain()["sent"] == 1
+        key, body = webhook_server.requests[0]
+        assert key == f"notification-{notification_id}"
+        assert body["recipient"] == test_employee.email
+
+    def test_transient_failure_backs_off_then_fails(self, db_session, test_employee, make_worker, monkeypatch):
+        monkeypatch.setattr(outbox.settings, "notification_max_attempts", 2)
+        queue(db_session, test_employee)
+        worker = make_worker({"fake": FakeChannel(ConnectionError("refused"))})
+
+        assert worker.run_once()["retried"] == 1
+        [row] = state(db_session)
+        assert row.status == NotificationStatus.PENDING and row.attempts == 1
+        assert row.next_attempt_at > datetime.utcnow()
+        assert row.last_error == "ConnectionError: refused"
+        assert worker.run_once()["claimed"] == 0
+
+        row.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db_session.commit()
+        assert worker.run_once()["failed"] == 1
+        assert state(db_session)[0].status == NotificationStatus.FAILED
+
+    def test_permanent_failure_is_not_retried(self, db_session, test_employee, make_worker):
+        queue(db_session, test_employee)
+
+        make_worker({"fake": FakeChannel(ValueError("bad address"), transient=False)}).run_once()
+
+        [row] = state(db_session)
+        assert row.status == NotificationStatus.FAILED and row.attempts == 1
+
+    def test_claims_are_exclusive_until_the_lease_expires(self, db_session, test_employee, make_worker):
+        queue(db_session, test_employee, 3)
+        first, second = make_worker({"fake": FakeChannel()}), make_worker({"fake": FakeChannel()})
+
+        claimed = first.claim(first.session_factory())
+        assert len(claimed) == 3
+        assert second.claim(second.session_factory()) == []
+
+        for row in state(db_session):
+            row.locked_until = datetime.utcnow() - timedelta(seconds=1)
+        db_session.commit()
+        assert len(second.claim(second.session_factory())) == 3
+
+    def test_rate_limited_messages_are_deferred(self, db_session, test_employee, make_worker):
+        queue(db_session, test_employee, 2)
+        channel = FakeChannel()
+
+        summary = make_worker({"fake": channel}, RateLimiter({}, domain_rate=0.01)).run_once()
+
+        assert summary["sent"] == 1 and len(channel.delivered) == 1
+        deferred = [row for row in state(db_session) if row.status == NotificationStatus.PENDING]
+        assert len(deferred) == 1
+        assert deferred[0].attempts == 0 and deferred[0].next_attempt_at > datetime.utcnow()
+
+    def test_unconfigured_channels_are_skipped(self, db_session, test_employee, monkeypatch):
+        monkeypatch.setattr(outbox.settings, "smtp_host", None)
+        monkeypatch.setattr(outbox.settings, "notification_webhook_url", None)
+        queue(db_session, test_employee, channel="email")
+        worker = OutboxWorker(sessionmaker(bind=db_session.get_bind()), threads=1)
+        try:
+            assert worker.channels == {}
+            assert worker.run_once()["claimed"] == 0
+        finally:
+            worker.close()
+
+
+class TestNotificationChannels:
+    def test_unknown_channel_is_rejected(self, api, test_admin, test_employee):
+        client = api(test_admin)
+        rejected = client.post("/notifications/send", json={"employee_id": test_employee.id, "channel": "pigeon"})
+        queued = client.post("/notifications/send", json={"employee_id": test_employee.id, "channel": "webhook"})
+
+        assert rejected.status_code == 400
+        assert queued.status_code == 201
+        assert queued.json()["channel"] == "webhook" and queued.json()["attempts"] == 0
@@ -0,0 +1,86 @@
+import csv
+import io
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import Client, Timesheet, TimesheetDetail, TimesheetStatus
+from app.services.packed_hours import (
+    backfill_packed_hours, iter_daily_hours, pack, pack_days, pack_timesheet, unpack
+)
+
+MONDAY = date(2026, 10, 5)
+SUNDAY = MONDAY + timedelta(days=6)
+
+
+@pytest.fixture
+def acme(db_session):
+    client = Client(name="Acme", code="ACME")
+    db_session.add(client)
+    db_session.commit()
+    return client
+
+
+def add_timesheet(db_session, employee, client, period_start, days, packed):
+    timesheet = Timesheet(employee_id=employee.id, client_id=client.id, period_start=period_start,
+                          period_end=period_start + timedelta(days=6), status=TimesheetStatus.APPROVED)
+    timesheet.details = [
+        TimesheetDetail(work_date=period_start + timedelta(days=offset), hours=hours, overtime_hours=overtime)
+        for offset, hours, overtime in days
+    ]
+    if packed:
+        pack_timesheet(timesheet)
+    db_session.add(timesheet)
+    db_session.commit()
+    return timesheet
+
+
+class TestPacking:
+    def test_round_trip(self):
+        blob = pack([0, 750, 65535])
+        assert blob == b"\x00\x00\xee\x02\xff\xff"
+        assert list(unpack(blob)) == [0, 750, 65535]
+
+    def test_days_are_indexed_from_period_start(self):
+        hours, overtime = pack_days(MONDAY, SUNDAY, [
+            (MONDAY, 4.0, 0.0), (MONDAY, 4.25, 0.5), (MONDAY + timedelta(days=2), 7.5, None)
+        ])
+        assert list(unpack(hours)) == [825, 0, 750, 0, 0, 0, 0]
+        assert list(unpack(overtime)) == [50, 0, 0, 0, 0, 0, 0]
+
+    def test_unpackable_days(self):
+        assert pack_days(MONDAY, SUNDAY, [(SUNDAY + timedelta(days=1), 8.0, 0.0)]) is None
+        assert pack_days(MONDAY, SUNDAY, [(MONDAY, -1.0, 0.0)]) is None
+
+
+class TestDailyHours:
+    def test_reads_packed_and_detail_timesheets(self, db_session, test_employee, acme):
+        packed = add_timesheet(db_session, test_employee, acme, MONDAY, [(0, 8.0, 1.0), (3, 6.0, 0.0)], packed=True)
+        rows_only = add_timesheet(db_session, test_employee, acme, MONDAY + timedelta(weeks=1), [(1, 5.0, 0.0)], packed=False)
+
+        days = list(iter_daily_hours(db_session, MONDAY, MONDAY + timedelta(weeks=2)))
+
+        assert [(d.timesheet_id, d.work_date, d.hours, d.overtime_hours) for d in days] == [
+            (packed.id, MONDAY, 8.0, 1.0),
+            (packed.id, MONDAY + timedelta(days=3), 6.0, 0.0),
+            (rows_only.id, MONDAY + timedelta(days=8), 5.0, 0.0),
+        ]
+
+    def test_backfill(self, db_session, test_employee, acme):
+        timesheet = add_timesheet(db_session, test_employee, acme, MONDAY, [(2, 9.0, 1.0)], packed=False)
+        assert timesheet.packed_hours is None
+
+        assert backfill_packed_hours(db_session, batch_size=1) == (1, 0)
+        backfilled = db_session.get(Timesheet, timesheet.id)
+        assert list(unpack(backfilled.packed_hours)) == [0, 0, 900, 0, 0, 0, 0]
+        assert list(unpack(backfilled.packed_overtime)) == [0, 0, 100, 0, 0, 0, 0]
+
+    def test_export(self, api, db_session, test_admin, test_employee, acme):
+        add_timesheet(db_session, test_employee, acme, MONDAY, [(0, 8.0, 0.0)], packed=True)
+        response = api(test_admin).get(
+            "/exports/daily-hours", params={"start": MONDAY, "end": SUNDAY, "format": "csv"}
+        )
+
+        assert response.status_code == 200
+        [row] = csv.DictReader(io.StringIO(response.text))
+        assert (row["work_date"], row["hours"]) == ("2026-10-05", "8.0")
@@ -0,0 +1,93 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import SubmissionFrequency
+from app.services.period_calendar import Period, PeriodCalendar, get_period_calendar
+
+
+ANCHOR = date(2024, 1, 1)  # a Monday
+TODAY = date(2026, 10, 19)
+
+
+def calendar(frequency, week_start_day=1):
+    return PeriodCalendar(frequency, week_start_day, ANCHOR, today=TODAY)
+
+
+class TestPeriodCalendar:
+    def test_weekly_honours_week_start_day(self):
+        monday = calendar(SubmissionFrequency.WEEKLY, 1).period_for(date(2026, 10, 15))
+        sunday = calendar(SubmissionFrequency.WEEKLY, 0).period_for(date(2026, 10, 15))
+
+        assert monday == Period(date(2026, 10, 12), date(2026, 10, 18))
+        assert sunday == Period(date(2026, 10, 11), date(2026, 10, 17))
+
+    def test_biweekly_runs_across_month_boundaries(self):
+        periods = calendar(SubmissionFrequency.BIWEEKLY).periods_in(date(2026, 10, 1), date(2026, 11, 30))
+
+        assert all((b.start - a.start).days == 14 for a, b in zip(periods, periods[1:]))
+        assert all((p.start - ANCHOR).days % 14 == 0 for p in periods)
+        assert periods[0].start < date(2026, 10, 1) and periods[-1].end >= date(2026, 11, 30)
+
+    def test_monthly_periods_are_calendar_months(self):
+        periods = calendar(SubmissionFrequency.MONTHLY).periods_in(date(2028, 1, 15), date(2028, 3, 1))
+
+        assert periods == [
+            Period(date(2028, 1, 1), date(2028, 1, 31)),
+            Period(date(2028, 2, 1), date(2028, 2, 29)),
+            Period(date(2028, 3, 1), date(2028, 3, 31)),
+        ]
+
+    def test_periods_tile_the_window(self):
+        cal = calendar(SubmissionFrequency.WEEKLY)
+        window = cal.window
+        periods = cal.periods_in(window.start, window.end)
+
+        assert periods[0].start == window.start and periods[-1].end == window.end
+        assert all(a.end + timedelta(days=1) == b.start for a, b in zip(periods, periods[1:]))
+
+    def test_lookups_outside_the_window_extend_it(self):
+        cal = calendar(SubmissionFrequency.WEEKLY)
+
+        assert date(1999, 6, 1) in cal.period_for(date(1999, 6, 1))
+        assert date(2040, 6, 1) in cal.period_for(date(2040, 6, 1))
+        assert cal.window.start <= date(1999, 6, 1) and cal.window.end >= date(2040, 6, 1)
+
+    def test_empty_and_canonical_ranges(self):
+        cal = calendar(SubmissionFrequency.WEEKLY)
+
+        assert cal.periods_in(date(2026, 10, 20), date(2026, 10, 19)) == []
+        assert cal.is_canonical(date(2026, 10, 19), date(2026, 10, 25))
+        assert not cal.is_canonical(date(2026, 10, 20), date(2026, 10, 26))
+
+    def test_calendars_are_shared(self):
+        assert get_period_calendar("weekly", 8) is get_period_calendar(SubmissionFrequency.WEEKLY, 1)
+
+
+class TestDuplicateTimesheetCheck:
+    @pytest.fixture
+    def employee_client(self, api, test_employee, test_client_entity):
+        return api(test_employee)
+
+    def post(self, client, client_id, start, end):
+        return client.post("/timesheets/", json={
+            "client_id": client_id, "period_start": str(start), "period_end": str(end), "details": []
+        })
+
+    def test_overlap_within_a_pay_period_is_rejected(self, employee_client, test_client_entity, db_session):
+        from app.models import Client
+
+        monday = date(2026, 10, 19)
+        assert self.post(employee_client, test_client_entity.id, monday, monday + timedelta(days=2)).status_code == 201
+
+        later_same_week = self.post(employee_client, test_client_entity.id, monday + timedelta(days=3), monday + timedelta(days=6))
+        next_week = self.post(employee_client, test_client_entity.id, monday + timedelta(days=7), monday + timedelta(days=13))
+
+        other = Client(name="Other", code="OTHER")
+        db_session.add(other)
+        db_session.commit()
+        other_client = self.post(employee_client, other.id, monday, monday + timedelta(days=6))
+
+        assert later_same_week.status_code == 400
+        assert next_week.status_code == 201
+        assert other_client.status_code == 201
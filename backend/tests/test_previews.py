@@ -0,0 +1,87 @@
+import io
+import os
+import time
+
+import pytest
+
+from app.models import UploadSource
+from app.services import previews
+from app.services.blob_store import ingest_upload
+from app.services.previews import PreviewCache, PreviewService, PreviewUnavailableError
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def jpeg_bytes(width=2000, height=1500, color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    service = PreviewService(PreviewCache(str(tmp_path / "previews"), 10 * 1024 * 1024), workers=0)
+    monkeypatch.setattr(previews, "_service", service)
+    return service
+
+
+class TestPreviewService:
+    def test_jpeg_thumbnail_is_cached(self, service, tmp_path):
+        source = tmp_path / "scan.jpg"
+        source.write_bytes(jpeg_bytes())
+
+        path = service.get_preview("ab" * 32, str(source), "jpg", "thumb")
+
+        with Image.open(path) as image:
+            assert max(image.size) == 256
+        assert service.get_preview("ab" * 32, "/does/not/exist", "jpg", "thumb") == path
+
+    def test_pdf_first_page(self, service, tmp_path):
+        pymupdf = pytest.importorskip("pymupdf")
+        source = tmp_path / "scan.pdf"
+        document = pymupdf.open()
+        document.new_page(width=612, height=792)
+        document.save(str(source))
+
+        path = service.get_preview("cd" * 32, str(source), "pdf", "preview")
+
+        with Image.open(path) as image:
+            assert image.size[1] == 1024
+
+    def test_csv_has_no_preview(self, service, tmp_path):
+        with pytest.raises(PreviewUnavailableError):
+            service.get_preview("ef" * 32, str(tmp_path / "x.csv"), "csv")
+
+    def test_least_recently_used_previews_are_evicted(self, tmp_path):
+        cache = PreviewCache(str(tmp_path / "previews"), max_bytes=2500)
+        paths = []
+        for i in range(3):
+            path = cache.path_for(f"{i:02d}" * 32, "thumb")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x" * 1000)
+            os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+            paths.append(path)
+
+        cache.get(f"{0:02d}" * 32, "thumb")
+        cache.added(1000)
+
+        assert paths[0].exists()
+        assert not paths[1].exists()
+        assert paths[2].exists()
+
+
+class TestPreviewEndpoint:
+    def test_preview_and_conditional_get(self, api, db_session, test_admin, test_employee, blob_dir, service):
+        upload, _ = ingest_upload(db_session, test_employee.id, "scan.jpg", [jpeg_bytes()], "jpg", UploadSource.MANUAL)
+        db_session.commit()
+        client = api(test_admin)
+        response = client.get(f"/timesheets/uploads/{upload.id}/preview")
+        cached = client.get(
+            f"/timesheets/uploads/{upload.id}/preview",
+            headers={"If-None-Match": response.headers["etag"]}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        assert "immutable" in response.headers["cache-control"]
+        assert cached.status_code == 304
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import database
+from app.config import settings
+from app.database import (
+    LAST_WRITE_COOKIE, LAST_WRITE_HEADER, READ_PRIMARY_HEADER, Base, ReadYourWritesMiddleware
+)
+from app.main import app
+from app.models import Employee, UserRole
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """A second SQLite file standing in for a replica, holding different rows than the primary"""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(Employee(
+            email="replica@example.com", hashed_password="x", first_name="Replica",
+            last_name="Only", role=UserRole.EMPLOYEE
+        ))
+        db.commit()
+    engine.dispose()
+
+    monkeypatch.setattr(settings, "database_replica_urls", url)
+    yield url
+    asyncio.run(database.dispose_replicas())
+
+
+def emails(response):
+    assert response.status_code == 200
+    return {employee["email"] for employee in response.json()}
+
+
+class TestReplicaRouting:
+    def test_reads_use_primary_without_replicas(self, api, test_admin):
+        assert emails(api(test_admin).get("/employees/")) == {"admin@example.com"}
+
+    def test_reads_go_to_replica(self, api, test_admin, replica):
+        client = api(test_admin)
+
+        assert emails(client.get("/employees/")) == {"replica@example.com"}
+        assert client.get("/dashboard/stats").json()["total_employees"] == 1
+
+    def test_read_primary_header(self, api, test_admin, replica):
+        response = api(test_admin).get("/employees/", headers={READ_PRIMARY_HEADER: "1"})
+
+        assert emails(response) == {"admin@example.com"}
+
+    def test_recent_write_reads_primary(self, api, test_admin, replica):
+        client = api(test_admin)
+        client.cookies.set(LAST_WRITE_COOKIE, str(time.time()))
+        assert emails(client.get("/employees/")) == {"admin@example.com"}
+
+        client.cookies.set(LAST_WRITE_COOKIE, str(time.time() - settings.replica_read_your_writes_seconds - 1))
+        assert emails(client.get("/employees/")) == {"replica@example.com"}
+
+    def test_echoed_last_write_header_reads_primary(self, api, test_admin, replica):
+        response = api(test_admin).get("/employees/", headers={LAST_WRITE_HEADER: str(time.time())})
+
+        assert emails(response) == {"admin@example.com"}
+
+
+class TestReadYourWritesMiddleware:
+    @pytest.fixture
+    def client(self):
+        test_app = FastAPI()
+        test_app.add_middleware(ReadYourWritesMiddleware)
+
+        @test_app.get("/items")
+        def read():
+            return []
+
+        @test_app.post("/items")
+        def write(fail: bool = False):
+            if fail:
+                raise HTTPException(status_code=400, detail="bad")
+            return {}
+
+        return TestClient(test_app)
+
+    def test_successful_write_sets_cookie(self, client):
+        response = client.post("/items")
+
+        assert LAST_WRITE_COOKIE in response.cookies
+        assert f"Max-Age={settings.replica_read_your_writes_seconds}" in response.headers["set-cookie"]
+        assert response.headers[LAST_WRITE_HEADER] == response.cookies[LAST_WRITE_COOKIE]
+
+    def test_reads_and_failed_writes_do_not(self, client):
+        assert "set-cookie" not in client.get("/items").headers
+        assert "set-cookie" not in client.post("/items", params={"fail": True}).headers
+        assert LAST_WRITE_HEADER not in client.get("/items").headers
+
+    def test_header_is_exposed_to_the_frontend(self):
+        response = TestClient(app).get("/health", headers={"Origin": "http://localhost:5173"})
+
+        assert LAST_WRITE_HEADER.lower() in response.headers["access-control-expose-headers"].lower()
@@ -0,0 +1,69 @@
+from datetime import date
+
+from app.models import Client, Employee, EmployeeClientAssignment, Notification, SubmissionFrequency, UserRole
+from app.services.reminders import REMINDER_LOCK_ID, REMINDER_TYPE, create_overdue_reminders, lock_reminder_run
+
+
+# Wednesday; the last fully overdue Monday week is 2026-10-12..18
+TODAY = date(2026, 10, 21)
+
+
+def add_employee(db_session, email_address, **kwargs):
+    employee = Employee(email=email_address, hashed_password="x", first_name="E", last_name="X", role=UserRole.EMPLOYEE, **kwargs)
+    db_session.add(employee)
+    db_session.flush()
+    return employee
+
+
+class TestOverdueReminders:
+    def test_one_reminder_per_overdue_employee(self, db_session):
+        client = Client(name="Acme", code="ACME", default_submission_frequency=SubmissionFrequency.WEEKLY, week_start_day=1)
+        db_session.add(client)
+        db_session.flush()
+        late = add_employee(db_session, "late@example.com")
+        new = add_employee(db_session, "new@example.com")
+        db_session.add_all([
+            EmployeeClientAssignment(employee_id=late.id, client_id=client.id),
+            # Only the current, not yet overdue week falls in this assignment
+            EmployeeClientAssignment(employee_id=new.id, client_id=client.id, start_date=date(2026, 10, 19)),
+        ])
+        db_session.commit()
+
+        assert create_overdue_reminders(db_session, TODAY) == 1
+        assert create_overdue_reminders(db_session, TODAY) == 0
+
+        reminder = db_session.query(Notification).one()
+        assert reminder.employee_id == late.id
+        assert reminder.notification_type == REMINDER_TYPE
+        assert "Acme: 2026-10-12 to 2026-10-18" in reminder.message
+        assert "2026-10-19" not in reminder.message
+
+
+class RecordingSession:
+    """Stands in for a PostgreSQL session and records the statements run"""
+
+    def __init__(self, dialect_name):
+        self.dialect = type("Dialect", (), {"name": dialect_name})()
+        self.statements = []
+
+    def get_bind(self):
+        return self
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+
+
+class TestReminderLock:
+    def test_takes_an_advisory_lock_on_postgresql(self):
+        db = RecordingSession("postgresql")
+
+        lock_reminder_run(db)
+
+        assert db.statements == [("SELECT pg_advisory_xact_lock(:lock_id)", {"lock_id": REMINDER_LOCK_ID})]
+
+    def test_no_lock_on_sqlite(self):
+        db = RecordingSession("sqlite")
+
+        lock_reminder_run(db)
+
+        assert db.statements == []
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from app import scheduler as app_scheduler
+from app.config import settings
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Heavy optional dependencies that must only load when first used
+DEFERRED_MODULES = {"numpy", "PIL", "pymupdf", "fitz", "googleapiclient", "google.oauth2"}
+
+# Cumulative import time allowed for app.main, override for slow machines
+IMPORT_BUDGET_MS = int(os.environ.get("IMPORT_BUDGET_MS", "3000"))
+
+
+def import_app(tmp_path):
+    """Import app.main in a fresh interpreter with -X importtime, Google settings unset"""
+    env = {k: v for k, v in os.environ.items() if not k.startswith("GOOGLE_")}
+    env["DATABASE_URL"] = f"sqlite:///{tmp_path / 'boot.db'}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative) / 1000
+    return timings
+
+
+class TestColdStart:
+    def test_import_is_lazy_and_fast(self, tmp_path):
+        timings = import_app(tmp_path)
+
+        loaded = {name for name in timings if name.split(".")[0] in DEFERRED_MODULES or name in DEFERRED_MODULES}
+        assert not loaded
+        assert timings["app.main"] < IMPORT_BUDGET_MS
+
+    def test_import_does_not_touch_the_database(self, tmp_path):
+        import_app(tmp_path)
+
+        assert not (tmp_path / "boot.db").exists()
+
+
+class TestScheduler:
+    def test_start_is_idempotent(self, monkeypatch):
+        monkeypatch.setattr(settings, "scheduler_enabled", True)
+        monkeypatch.setattr(app_scheduler, "scheduler", BackgroundScheduler())
+
+        app_scheduler.start_scheduler()
+        app_scheduler.start_scheduler()
+        assert app_scheduler.scheduler.running
+
+        app_scheduler.shutdown_scheduler()
+        assert not app_scheduler.scheduler.running
+
+    def test_disabled_scheduler_does_not_start(self, monkeypatch):
+        monkeypatch.setattr(settings, "scheduler_enabled", False)
+        monkeypatch.setattr(app_scheduler, "scheduler", BackgroundScheduler())
+
+        app_scheduler.start_scheduler()
+
+        assert not app_scheduler.scheduler.running
@@ -0,0 +1,97 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import StoredBlob, StorageTier, TimesheetUpload, UploadSource
+from app.services import file_storage, storage_tiering
+from app.services.archive_backend import LocalDirectoryArchive, set_archive_backend
+from app.services.blob_store import ingest_upload
+from app.services.storage_tiering import adopt_legacy_uploads, archive_cold_blobs, open_stored_file, prune_restored_copies
+
+
+CONTENT = b"date,hours\n" + b"2026-01-05,8\n" * 500
+
+
+@pytest.fixture
+def archive(tmp_path):
+    backend = LocalDirectoryArchive(str(tmp_path / "archive"))
+    set_archive_backend(backend)
+    yield backend
+    set_archive_backend(None)
+
+
+def old_upload(db_session, employee, content=CONTENT, age_days=250):
+    upload, _ = ingest_upload(db_session, employee.id, "old.csv", [content], "csv", UploadSource.EMAIL)
+    blob = db_session.query(StoredBlob).filter(StoredBlob.digest == upload.content_hash).one()
+    blob.created_at = datetime.utcnow() - timedelta(days=age_days)
+    db_session.commit()
+    return upload, blob
+
+
+class TestStorageTiering:
+    def test_old_blobs_are_packed_and_removed_from_disk(self, db_session, test_employee, blob_dir, archive):
+        upload, blob = old_upload(db_session, test_employee)
+        recent, _ = ingest_upload(db_session, test_employee.id, "new.csv", [b"date,hours\n"], "csv", UploadSource.EMAIL)
+        db_session.commit()
+
+        summary = archive_cold_blobs(db_session, older_than_months=6)
+
+        db_session.refresh(blob)
+        assert summary["archived"] == 1 and summary["packs"] == 1
+        assert summary["bytes_after"] < summary["bytes_before"]
+        assert blob.tier == StorageTier.COLD
+        assert blob.archive_key.startswith(blob.created_at.strftime("%Y-%m") + "/")
+        assert not os.path.exists(upload.file_path)
+        assert os.path.exists(recent.file_path)
+
+        index = json.loads((archive.root / (blob.archive_key + ".idx")).read_text())
+        assert index["blobs"][0]["digest"] == blob.digest
+
+    def test_cold_blob_streams_and_restores(self, db_session, test_employee, blob_dir, archive):
+        upload, _ = old_upload(db_session, test_employee)
+        archive_cold_blobs(db_session, older_than_months=6)
+
+        with open_stored_file(upload.file_path, db_session) as stream:
+            assert stream.read() == CONTENT
+        assert not os.path.exists(upload.file_path)
+
+        restored = file_storage.get_file_path(upload.file_path, db_session)
+        assert restored.read_bytes() == CONTENT
+
+    def test_zlib_fallback(self, db_session, test_employee, blob_dir, archive, monkeypatch):
+        monkeypatch.setattr(storage_tiering, "zstandard", None)
+        upload, blob = old_upload(db_session, test_employee)
+
+        archive_cold_blobs(db_session, older_than_months=6)
+
+        db_session.refresh(blob)
+        assert blob.compression == "zlib"
+        assert file_storage.get_file_path(upload.file_path, db_session).read_bytes() == CONTENT
+
+    def test_restored_copies_expire(self, db_session, test_employee, blob_dir, archive):
+        upload, _ = old_upload(db_session, test_employee)
+        archive_cold_blobs(db_session, older_than_months=6)
+        file_storage.get_file_path(upload.file_path, db_session)
+
+        assert prune_restored_copies(db_session) == 0
+        assert prune_restored_copies(db_session, now=datetime.utcnow() + timedelta(days=2)) == 1
+        assert not os.path.exists(upload.file_path)
+
+    def test_legacy_uploads_are_adopted(self, db_session, test_employee, blob_dir, tmp_path):
+        legacy_file = tmp_path / "legacy" / "sheet.csv"
+        legacy_file.parent.mkdir()
+        legacy_file.write_bytes(CONTENT)
+        db_session.add(TimesheetUpload(
+            employee_id=test_employee.id, file_path=str(legacy_file), file_name="sheet.csv",
+            file_format="csv", source=UploadSource.MANUAL
+        ))
+        db_session.commit()
+
+        assert adopt_legacy_uploads(db_session) == 1
+
+        upload = db_session.query(TimesheetUpload).one()
+        assert upload.content_hash and upload.file_size == len(CONTENT)
+        assert db_session.query(StoredBlob).one().ref_count == 1
+        assert not legacy_file.exists()
@@ -0,0 +1,154 @@
+import json
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from app.models import EmployeeClientAssignment, Timesheet, TimesheetStatus, UploadSource, UploadStatus
+from app.services import timesheet_parser
+from app.services.blob_store import ingest_upload
+from app.services.timesheet_parser import ExtractionError, ParsedRow, parse_csv, process_pending_uploads
+
+
+def stub_document_extractor(file_path):
+    """Reports a standard 8-hour day for each weekday of the current week"""
+    today = date.today()
+    monday = today - timedelta(days=today.weekday())
+    return [
+        ParsedRow(work_date=monday + timedelta(days=offset), hours=8.0, description="Stub extraction")
+        for offset in range(5)
+    ]
+
+
+@pytest.fixture
+def assigned_employee(db_session, test_employee, test_client_entity):
+    db_session.add(EmployeeClientAssignment(employee_id=test_employee.id, client_id=test_client_entity.id))
+    db_session.commit()
+    return test_employee
+
+
+def add_upload(db_session, employee, content, file_format="csv", name="week.csv"):
+    upload, _ = ingest_upload(db_session, employee.id, name, [content], file_format, UploadSource.MANUAL)
+    db_session.commit()
+    return upload
+
+
+class TestParseCsv:
+    def test_header_aliases_and_date_formats(self, tmp_path):
+        path = tmp_path / "sheet.csv"
+        path.write_text("Work Date,Hours Worked,OT,Notes\n01/05/2026,8,1.5,Build\n2026-01-06,7.5,,\n,,,\n")
+
+        rows = parse_csv(str(path))
+
+        assert [row.work_date for row in rows] == [date(2026, 1, 5), date(2026, 1, 6)]
+        assert rows[0].overtime_hours == 1.5
+        assert rows[0].description == "Build"
+        assert rows[1].description is None
+
+    def test_missing_columns(self, tmp_path):
+        path = tmp_path / "sheet.csv"
+        path.write_text("name,value\nx,1\n")
+
+        with pytest.raises(ExtractionError):
+            parse_csv(str(path))
+
+
+class TestPipeline:
+    def test_csv_upload_becomes_draft_timesheet(self, db_session, assigned_employee, blob_dir):
+        upload = add_upload(db_session, assigned_employee, b"date,hours,overtime\n2026-01-05,8,1\n2026-01-07,9,0\n")
+
+        summary = process_pending_uploads(db_session, executor=None)
+
+        db_session.refresh(upload)
+        assert summary["analyzed"] == 1 and summary["rows"] == 2
+        assert upload.status == UploadStatus.ANALYZED
+
+        timesheet = db_session.query(Timesheet).one()
+        assert timesheet.status == TimesheetStatus.DRAFT
+        # Drafts cover the client's canonical week, not just the dates present
+        assert (timesheet.period_start, timesheet.period_end) == (date(2026, 1, 5), date(2026, 1, 11))
+        assert timesheet.total_hours == 17 and timesheet.total_overtime == 1
+        assert len(timesheet.details) == 2
+        assert json.loads(upload.upload_metadata)["timesheet_ids"] == [timesheet.id]
+
+    def test_bad_file_marks_upload_failed(self, db_session, assigned_employee, blob_dir):
+        upload = add_upload(db_session, assigned_employee, b"date,hours\nnot-a-date,8\n")
+
+        summary = process_pending_uploads(db_session, executor=None)
+
+        db_session.refresh(upload)
+        assert summary["failed"] == 1
+        assert upload.status == UploadStatus.FAILED
+        assert "not-a-date" in upload.error_message
+        assert db_session.query(Timesheet).count() == 0
+
+    def test_pdf_without_extractor_fails(self, db_session, assigned_employee, blob_dir):
+        upload = add_upload(db_session, assigned_employee, b"%PDF-1.4 scan", "pdf", "scan.pdf")
+
+        process_pending_uploads(db_session, executor=None)
+
+        db_session.refresh(upload)
+        assert upload.status == UploadStatus.FAILED
+        assert "extractor" in upload.error_message
+
+    def test_configured_document_extractor(self, db_session, assigned_employee, blob_dir, monkeypatch):
+        monkeypatch.setattr(
+            timesheet_parser.settings, "document_extractor",
+            "tests.test_timesheet_parser:stub_document_extractor"
+        )
+        upload = add_upload(db_session, assigned_employee, b"%PDF-1.4 scan", "pdf", "scan.pdf")
+
+        process_pending_uploads(db_session, executor=None)
+
+        db_session.refresh(upload)
+        assert upload.status == UploadStatus.ANALYZED
+        assert db_session.query(Timesheet).one().total_hours == 40
+
+    def test_process_pool(self, db_session, assigned_employee, blob_dir):
+        for day in (5, 12, 19):
+            add_upload(db_session, assigned_employee, f"date,hours\n2026-01-{day:02d},8\n".encode())
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            summary = process_pending_uploads(db_session, batch_size=2, executor=executor)
+
+        assert summary == {**summary, "claimed": 3, "analyzed": 3, "failed": 0}
+        assert db_session.query(Timesheet).count() == 3
+
+    def test_export_for_several_employees(self, db_session, assigned_employee, test_manager, test_client_entity, blob_dir):
+        upload = add_upload(db_session, assigned_employee, (
+            "employee,client,date,hours\n"
+            f"test@example.com,{test_client_entity.code},2026-01-05,4\n"
+            f"test@example.com,{test_client_entity.code},2026-01-05,4\n"
+            f"manager@example.com,{test_client_entity.code},2026-01-06,6\n"
+        ).encode())
+
+        process_pending_uploads(db_session, executor=None)
+
+        db_session.refresh(upload)
+        assert upload.status == UploadStatus.ANALYZED
+        totals = {t.employee_id: (t.total_hours, len(t.details)) for t in db_session.query(Timesheet).all()}
+        assert totals == {assigned_employee.id: (8.0, 1), test_manager.id: (6.0, 1)}
+
+    def test_rows_split_by_calendar_period(self, db_session, assigned_employee, blob_dir):
+        add_upload(db_session, assigned_employee, b"date,hours\n2026-01-09,8\n2026-01-12,7\n2026-01-13,6\n")
+
+        process_pending_uploads(db_session, executor=None)
+
+        periods = {
+            (t.period_start, t.period_end): t.total_hours
+            for t in db_session.query(Timesheet).order_by(Timesheet.period_start)
+        }
+        assert periods == {
+            (date(2026, 1, 5), date(2026, 1, 11)): 8.0,
+            (date(2026, 1, 12), date(2026, 1, 18)): 13.0,
+        }
+
+    def test_reimport_matches_existing_period(self, db_session, assigned_employee, blob_dir):
+        add_upload(db_session, assigned_employee, b"date,hours\n2026-01-06,8\n", name="a.csv")
+        process_pending_uploads(db_session, executor=None)
+        upload = add_upload(db_session, assigned_employee, b"date,hours\n2026-01-08,8\n", name="b.csv")
+
+        process_pending_uploads(db_session, executor=None)
+
+        db_session.refresh(upload)
+        timesheet = db_session.query(Timesheet).one()
+        assert json.loads(upload.upload_metadata)["existing_timesheet_ids"] == [timesheet.id]
@@ -0,0 +1,109 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.auth import create_access_token, create_url_ticket
+from app.models import StoredBlob, UploadSource
+from app.services.archive_backend import LocalDirectoryArchive, set_archive_backend
+from app.services.blob_store import ingest_upload
+from app.services.storage_tiering import archive_cold_blobs
+
+
+CONTENT = b"%PDF-1.4\n" + bytes(range(256)) * 64
+
+
+@pytest.fixture
+def admin_client(api, test_admin):
+    # The content endpoint also accepts tickets, so it authenticates itself
+    return api(test_admin, headers={"Authorization": f"Bearer {create_access_token({'sub': test_admin.email})}"})
+
+
+@pytest.fixture
+def upload(db_session, test_employee, blob_dir):
+    upload, _ = ingest_upload(db_session, test_employee.id, "scan.pdf", [CONTENT], "pdf", UploadSource.MANUAL)
+    db_session.commit()
+    return upload
+
+
+@pytest.fixture
+def anonymous_client(api):
+    return api()
+
+
+class TestUploadContent:
+    def test_full_download(self, admin_client, upload):
+        response = admin_client.get(f"/timesheets/uploads/{upload.id}/content")
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.headers["etag"] == f'"{upload.content_hash}"'
+        assert response.headers["accept-ranges"] == "bytes"
+        assert 'inline; filename="scan.pdf"' in response.headers["content-disposition"]
+
+    def test_range_request(self, admin_client, upload):
+        response = admin_client.get(f"/timesheets/uploads/{upload.id}/content", headers={"Range": "bytes=9-18"})
+
+        assert response.status_code == 206
+        assert response.content == CONTENT[9:19]
+        assert response.headers["content-range"] == f"bytes 9-18/{len(CONTENT)}"
+
+    def test_conditional_get(self, admin_client, upload):
+        response = admin_client.get(
+            f"/timesheets/uploads/{upload.id}/content",
+            headers={"If-None-Match": f'W/"other", "{upload.content_hash}"'}
+        )
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_missing_upload(self, admin_client, blob_dir):
+        assert admin_client.get("/timesheets/uploads/999/content").status_code == 404
+
+    def test_cold_upload_streams_without_restoring(self, admin_client, db_session, upload, tmp_path):
+        blob = db_session.query(StoredBlob).filter(StoredBlob.digest == upload.content_hash).one()
+        blob.created_at = datetime.utcnow() - timedelta(days=250)
+        db_session.commit()
+        set_archive_backend(LocalDirectoryArchive(str(tmp_path / "archive")))
+        try:
+            archive_cold_blobs(db_session, older_than_months=6)
+            response = admin_client.get(f"/timesheets/uploads/{upload.id}/content")
+        finally:
+            set_archive_backend(None)
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["content-length"] == str(len(CONTENT))
+        assert 'inline; filename="scan.pdf"' in response.headers["content-disposition"]
+        assert not os.path.exists(upload.file_path)
+
+
+class TestContentTickets:
+    def test_ticket_opens_its_url(self, anonymous_client, upload, test_admin):
+        path = f"/timesheets/uploads/{upload.id}/content"
+        bearer = {"Authorization": f"Bearer {create_access_token({'sub': test_admin.email})}"}
+
+        issued = anonymous_client.post("/auth/ticket", params={"path": path}, headers=bearer)
+        response = anonymous_client.get(path, params={"ticket": issued.json()["ticket"]}, headers={"Range": "bytes=0-8"})
+
+        assert issued.status_code == 200
+        assert response.status_code == 206
+        assert response.content == CONTENT[:9]
+
+    def test_ticket_is_bound_to_path_and_not_a_bearer_token(self, anonymous_client, upload, test_admin):
+        ticket = create_url_ticket(test_admin.email, "/timesheets/uploads/999/content")
+
+        assert anonymous_client.get(
+            f"/timesheets/uploads/{upload.id}/content", params={"ticket": ticket}
+        ).status_code == 401
+        assert anonymous_client.get(
+            "/employees/", headers={"Authorization": f"Bearer {ticket}"}
+        ).status_code == 401
+
+    def test_ticket_still_checks_role(self, anonymous_client, upload, test_employee):
+        path = f"/timesheets/uploads/{upload.id}/content"
+
+        response = anonymous_client.get(path, params={"ticket": create_url_ticket(test_employee.email, path)})
+
+        assert response.status_code == 403
@@ -0,0 +1,64 @@
+import pytest
+
+from app.models import TimesheetUpload, UploadSource, UploadStatus
+from app.services import upload_stats
+from app.utils.cache import TTLCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(upload_stats, "_stats_cache", TTLCache(ttl_seconds=60))
+
+
+def add(db_session, employee, source, upload_status):
+    db_session.add(TimesheetUpload(
+        employee_id=employee.id, file_path="/tmp/x", file_name="x.csv", file_format="csv",
+        source=source, status=upload_status
+    ))
+    db_session.commit()
+
+
+class TestUploadStats:
+    def test_counts_by_source_and_status(self, db_session, test_employee):
+        add(db_session, test_employee, UploadSource.MANUAL, UploadStatus.PENDING)
+        add(db_session, test_employee, UploadSource.EMAIL, UploadStatus.PENDING)
+        add(db_session, test_employee, UploadSource.EMAIL, UploadStatus.FAILED)
+
+        stats = upload_stats.compute_upload_stats(db_session)
+
+        assert stats == {
+            "total": 3,
+            "by_source": {"manual": 1, "email": 2, "drive": 0},
+            "by_status": {"pending": 2, "processing": 0, "analyzed": 0, "failed": 1}
+        }
+
+    def test_cached_until_invalidated(self, db_session, test_employee):
+        add(db_session, test_employee, UploadSource.DRIVE, UploadStatus.PENDING)
+        assert upload_stats.get_upload_stats(db_session)["total"] == 1
+
+        add(db_session, test_employee, UploadSource.DRIVE, UploadStatus.PENDING)
+        assert upload_stats.get_upload_stats(db_session)["total"] == 1
+
+        upload_stats.invalidate_upload_stats()
+        assert upload_stats.get_upload_stats(db_session)["total"] == 2
+
+    def test_invalidated_only_after_commit(self, db_session, test_employee):
+        assert upload_stats.get_upload_stats(db_session)["total"] == 0
+
+        db_session.add(TimesheetUpload(
+            employee_id=test_employee.id, file_path="/tmp/x", file_name="x.csv", file_format="csv",
+            source=UploadSource.MANUAL, status=UploadStatus.PENDING
+        ))
+        db_session.flush()
+        upload_stats.invalidate_upload_stats_after_commit(db_session)
+        # A poll before commit must not be the one that refills the cache
+        assert upload_stats.get_upload_stats(db_session)["total"] == 0
+
+        db_session.commit()
+        assert upload_stats.get_upload_stats(db_session)["total"] == 1
+
+    def test_rollback_keeps_cache(self, db_session, test_employee):
+        upload_stats.get_upload_stats(db_session)
+        upload_stats.invalidate_upload_stats_after_commit(db_session)
+        db_session.rollback()
+        assert "invalidate_upload_stats" not in db_session.info
@@ -1,6 +1,10 @@
 import axios from 'axios';
 
-const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+export const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+
+// Echoed after writes so the API serves this tab's next reads from the primary
+// instead of a lagging replica; a cookie would need credentialed CORS requests.
+const LAST_WRITE_HEADER = 'X-Last-Write';
 
 const apiClient = axios.create({
   baseURL: API_BASE_URL,
@@ -15,13 +19,23 @@ apiClient.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    const lastWrite = sessionStorage.getItem('last_write');
+    if (lastWrite) {
+      config.headers[LAST_WRITE_HEADER] = lastWrite;
+    }
     return config;
   },
   (error) => Promise.reject(error)
 );
 
 apiClient.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const lastWrite = response.headers[LAST_WRITE_HEADER.toLowerCase()];
+    if (lastWrite) {
+      sessionStorage.setItem('last_write', lastWrite);
+    }
+    return response;
+  },
   async (error) => {
     const originalRequest = error.config;
 
@@ -60,6 +74,8 @@ export const authAPI = {
   register: (data) => apiClient.post('/auth/register', data),
   login: (data) => apiClient.post('/auth/login', data),
   getCurrentUser: () => apiClient.get('/auth/me'),
+  // Short-lived ticket for a URL the browser opens itself, e.g. a file viewer
+  createTicket: (path) => apiClient.post('/auth/ticket', null, { params: { path } }),
 };
 
 export const employeesAPI = {
@@ -101,6 +117,14 @@ export const timesheetsAPI = {
   // Upload endpoints
   getUploads: (params) => apiClient.get('/timesheets/uploads/', { params }),
   upload: (formData) => apiClient.post('/timesheets/uploads/', formData),
+  uploadBatch: (formData) => apiClient.post('/timesheets/uploads/batch', formData),
+  // URL the browser can open directly, so it streams the file and uses Range requests
+  getUploadContentUrl: async (id) => {
+    const path = `/timesheets/uploads/${id}/content`;
+    const { data } = await authAPI.createTicket(path);
+    return `${API_BASE_URL}${path}?${new URLSearchParams({ ticket: data.ticket })}`;
+  },
+  getUploadPreview: (id, size = 'thumb') => apiClient.get(`/timesheets/uploads/${id}/preview`, { params: { size }, responseType: 'blob' }),
 };
 
 export const approvalsAPI = {
@@ -133,7 +157,6 @@ export const notificationsAPI = {
   sendBulk: (data) => apiClient.post('/notifications/send-bulk', data),
   getAll: (params) => apiClient.get('/notifications/', { params }),
   getById: (id) => apiClient.get(`/notifications/${id}`),
-  markSent: (id) => apiClient.put(`/notifications/${id}/mark-sent`),
 };
 
 export const dashboardAPI = {
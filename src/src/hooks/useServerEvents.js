@@ -0,0 +1,66 @@
+import { useEffect, useRef } from 'react';
+import { API_BASE_URL, authAPI } from '../api/client';
+
+const STREAM_PATH = '/events/stream';
+const RECONNECT_DELAY = 5000;
+
+// Calls onChange (debounced) whenever the server announces a change on one of
+// the given topics. Events only carry ids, so callers refetch what they show.
+// The stream authenticates with a short-lived ticket; once the browser gives
+// up reconnecting (the ticket expired), a new ticket opens a new stream.
+export const useServerEvents = (topics, onChange, delay = 500) => {
+  const callback = useRef(onChange);
+  callback.current = onChange;
+  const topicList = topics.join(',');
+
+  useEffect(() => {
+    if (!localStorage.getItem('access_token') || typeof EventSource === 'undefined') return undefined;
+
+    let source = null;
+    let timer = null;
+    let retry = null;
+    let closed = false;
+
+    const schedule = (event) => {
+      clearTimeout(timer);
+      timer = setTimeout(() => callback.current(event), delay);
+    };
+
+    const types = [
+      'resync', 'timesheet.submitted', 'timesheet.approved', 'timesheet.rejected',
+      'upload.created', 'upload.processing', 'upload.analyzed', 'upload.failed', 'upload.deleted',
+      'integration.synced',
+    ];
+
+    const connect = async (reconnecting) => {
+      try {
+        const { data } = await authAPI.createTicket(STREAM_PATH);
+        if (closed) return;
+        const params = new URLSearchParams({ topics: topicList, ticket: data.ticket });
+        source = new EventSource(`${API_BASE_URL}${STREAM_PATH}?${params}`);
+      } catch (error) {
+        if (!closed) retry = setTimeout(() => connect(reconnecting), RECONNECT_DELAY);
+        return;
+      }
+      source.onmessage = schedule;
+      types.forEach((type) => source.addEventListener(type, schedule));
+      source.onerror = () => {
+        if (source.readyState !== EventSource.CLOSED || closed) return;
+        retry = setTimeout(() => connect(true), RECONNECT_DELAY);
+      };
+      // A new stream can't resume from Last-Event-ID, so refetch once
+      if (reconnecting) schedule({ type: 'resync' });
+    };
+
+    connect(false);
+
+    return () => {
+      closed = true;
+      clearTimeout(timer);
+      clearTimeout(retry);
+      if (source) source.close();
+    };
+  }, [topicList, delay]);
+};
+
+export default useServerEvents;
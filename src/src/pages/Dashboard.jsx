@@ -2,6 +2,7 @@ import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 import { dashboardAPI, notificationsAPI } from '../api/client';
+import { useServerEvents } from '../hooks/useServerEvents';
 import {
   Clock, CheckCircle, Users, Building2, DollarSign, AlertCircle,
   Bell, Calendar, ChevronDown, ChevronRight, Mail, AlertTriangle
@@ -21,6 +22,8 @@ const Dashboard = () => {
     fetchDashboardData();
   }, [selectedMonth, selectedYear]);
 
+  useServerEvents(['timesheets'], () => fetchDashboardData());
+
   const fetchDashboardData = async () => {
     try {
       setLoading(true);
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { FileText, Filter, Download, Trash2, RefreshCw } from 'lucide-react';
 import axios from 'axios';
+import { useServerEvents } from '../hooks/useServerEvents';
 
 const API_BASE = 'http://localhost:8000';
 
@@ -19,6 +20,8 @@ const TimesheetDashboard = () => {
         fetchData();
     }, [filters]);
 
+    useServerEvents(['uploads'], () => fetchData());
+
     const fetchData = async () => {
         setLoading(true);
         try {
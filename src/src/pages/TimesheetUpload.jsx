@@ -1,6 +1,36 @@
 import { useState, useEffect } from 'react';
 import { Upload, FileText, AlertCircle, CheckCircle } from 'lucide-react';
 import { employeesAPI, timesheetsAPI } from '../api/client';
+import { useServerEvents } from '../hooks/useServerEvents';
+
+const UploadThumbnail = ({ upload }) => {
+    const [src, setSrc] = useState(null);
+
+    useEffect(() => {
+        if (!['pdf', 'jpg'].includes(upload.file_format)) {
+            return undefined;
+        }
+        let url = null;
+        let cancelled = false;
+        timesheetsAPI.getUploadPreview(upload.id)
+            .then((response) => {
+                if (!cancelled) {
+                    url = URL.createObjectURL(response.data);
+                    setSrc(url);
+                }
+            })
+            .catch(() => setSrc(null));
+        return () => {
+            cancelled = true;
+            if (url) URL.revokeObjectURL(url);
+        };
+    }, [upload.id, upload.file_format]);
+
+    if (!src) {
+        return <FileText className="h-8 w-8 text-gray-400" />;
+    }
+    return <img src={src} alt={upload.file_name} loading="lazy" className="h-12 w-12 object-cover rounded border" />;
+};
 
 const TimesheetUpload = () => {
     const [employees, setEmployees] = useState([]);
@@ -15,6 +45,8 @@ const TimesheetUpload = () => {
         fetchRecentUploads();
     }, []);
 
+    useServerEvents(['uploads'], () => fetchRecentUploads());
+
     const fetchEmployees = async () => {
         try {
             const response = await employeesAPI.getAll();
@@ -33,6 +65,22 @@ const TimesheetUpload = () => {
         }
     };
 
+    const openUpload = async (upload) => {
+        // Open the tab within the click so popup blockers allow it, then point it at the file
+        const viewer = window.open('', '_blank');
+        try {
+            const url = await timesheetsAPI.getUploadContentUrl(upload.id);
+            if (viewer) {
+                viewer.location.href = url;
+            } else {
+                window.open(url, '_blank');
+            }
+        } catch (error) {
+            if (viewer) viewer.close();
+            console.error('Failed to open upload:', error);
+        }
+    };
+
     const handleFileChange = (e) => {
         const file = e.target.files[0];
         if (file) {
@@ -232,6 +280,7 @@ const TimesheetUpload = () => {
                         <table className="table">
                             <thead>
                                 <tr>
+                                    <th></th>
                                     <th>Employee</th>
                                     <th>File Name</th>
                                     <th>Format</th>
@@ -245,10 +294,21 @@ const TimesheetUpload = () => {
                                     const employee = employees.find(e => e.id === upload.employee_id);
                                     return (
                                         <tr key={upload.id}>
+                                            <td>
+                                                <UploadThumbnail upload={upload} />
+                                            </td>
                                             <td className="font-medium">
                                                 {employee ? `${employee.first_name} ${employee.last_name}` : `ID: ${upload.employee_id}`}
                                             </td>
-                                            <td className="text-sm font-mono">{upload.file_name}</td>
+                                            <td className="text-sm font-mono">
+                                                <button
+                                                    type="button"
+                                                    onClick={() => openUpload(upload)}
+                                                    className="text-primary-600 hover:underline"
+                                                >
+                                                    {upload.file_name}
+                                                </button>
+                                            </td>
                                             <td>
                                                 <span className="badge-gray uppercase">{upload.file_format}</span>
                                             </td>